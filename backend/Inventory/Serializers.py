@@ -6,3 +6,19 @@ class InventorySerializer(serializers.ModelSerializer):
         model = Inventory
         fields = '__all__'
         read_only_fields = ['id', 'codigo_articulo']  # Proteger los campos id y codigo_articulo para que no se puedan modificar
+
+
+class InventoryBulkOperationSerializer(serializers.Serializer):
+    """
+    Una operación dentro de una petición bulk: create, update o delete.
+    """
+    OPERATION_CHOICES = ['create', 'update', 'delete']
+
+    op = serializers.ChoiceField(choices=OPERATION_CHOICES)
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs['op'] in ('update', 'delete') and 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'Este campo es requerido para update y delete.'})
+        return attrs
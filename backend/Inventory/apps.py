@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Inventory'
+
+    def ready(self):
+        # Registrar los receivers que mantienen InventorySummary
+        from . import signals  # noqa: F401
+        from core.cache import invalidate_on_change
+        from .models import Inventory
+
+        invalidate_on_change(Inventory, 'inventory')
@@ -0,0 +1,24 @@
+from core.async_views import json_response, paginate
+from core.cache import acached_response
+
+from .filters import filter_inventory
+from .models import Inventory
+from .pagination import InventoryCursorPagination
+from .Serializers import InventorySerializer
+from .views import PAGINATION_PARAMS
+
+
+async def inventory_list(request):
+    """
+    GET of Create_Consult for the ASGI path: same filters, pagination and cache
+    """
+    async def build():
+        try:
+            items = filter_inventory(Inventory.objects.all(), request.GET)
+            if any(param in request.GET for param in PAGINATION_PARAMS):
+                return await paginate(InventoryCursorPagination(), items, request, InventorySerializer)
+            return InventorySerializer([item async for item in items], many=True).data
+        except Exception as e:
+            return json_response({'error': str(e)}, status=500)
+
+    return await acached_response(request, ['inventory'], build)
@@ -0,0 +1,124 @@
+from core.cache import invalidate
+from core.db import write_transaction
+
+from .models import Inventory
+from .Serializers import InventoryBulkOperationSerializer, InventorySerializer
+from .sequences import allocate_codigos
+from .summary import SummaryDelta, signals_suspended
+
+# Número máximo de operaciones aceptadas en una sola petición
+MAX_BULK_OPERATIONS = 1000
+
+
+class BulkValidationError(Exception):
+    """
+    Raised when at least one operation is invalid. Carries the per-item results.
+    """
+    def __init__(self, results):
+        super().__init__('Invalid bulk operations')
+        self.results = results
+
+
+def _validate_operations(operations):
+    """
+    Validate every operation with InventorySerializer before touching the database.
+    Returns (results, creates, updates, deletes); results has one entry per operation.
+    """
+    envelopes = [InventoryBulkOperationSerializer(data=operation) for operation in operations]
+    valid = [envelope.is_valid() for envelope in envelopes]
+
+    # Una sola consulta para todas las filas referenciadas por update/delete
+    referenced_ids = {
+        envelope.validated_data['id']
+        for envelope, is_valid in zip(envelopes, valid)
+        if is_valid and envelope.validated_data['op'] in ('update', 'delete')
+    }
+    instances = Inventory.objects.in_bulk(referenced_ids)
+
+    results = []
+    creates, updates, deletes = [], [], []
+    for index, (envelope, is_valid) in enumerate(zip(envelopes, valid)):
+        if not is_valid:
+            results.append({'index': index, 'status': 'error', 'errors': envelope.errors})
+            continue
+
+        op = envelope.validated_data['op']
+        pk = envelope.validated_data.get('id')
+        data = envelope.validated_data['data']
+        result = {'index': index, 'op': op}
+
+        if op in ('update', 'delete') and pk not in instances:
+            result.update({'id': pk, 'status': 'error', 'errors': {'id': 'Inventory item not found'}})
+        elif op == 'delete':
+            result.update({'id': pk, 'status': 'ok'})
+            deletes.append((result, instances[pk]))
+        else:
+            serializer = InventorySerializer(instances.get(pk), data=data, partial=(op == 'update'))
+            if serializer.is_valid():
+                result['status'] = 'ok'
+                if op == 'create':
+                    creates.append((result, serializer.validated_data))
+                else:
+                    result['id'] = pk
+                    updates.append((result, instances[pk], serializer.validated_data))
+            else:
+                result.update({'status': 'error', 'errors': serializer.errors})
+        results.append(result)
+
+    return results, creates, updates, deletes
+
+
+def apply_bulk_operations(operations):
+    """
+    Validate and apply a list of create/update/delete operations in one transaction.
+
+    Creates go through a single bulk_create with codigo_articulo values reserved
+    as one block from the sequence, updates through a single bulk_update and
+    deletes through a single DELETE ... WHERE id IN (...). InventorySummary is
+    updated once per affected group instead of once per row. If any operation
+    is invalid nothing is written and BulkValidationError is raised.
+    """
+    results, creates, updates, deletes = _validate_operations(operations)
+    if any(result['status'] == 'error' for result in results):
+        raise BulkValidationError(results)
+
+    delta = SummaryDelta()
+    with write_transaction():
+        if creates:
+            codigos = allocate_codigos(len(creates))
+            new_items = [
+                Inventory(codigo_articulo=codigo, **validated_data)
+                for codigo, (_, validated_data) in zip(codigos, creates)
+            ]
+            Inventory.objects.bulk_create(new_items)
+            # Releer las filas creadas para devolver los valores tal como quedaron en la base de datos
+            created = Inventory.objects.in_bulk([item.pk for item in new_items])
+            for (result, _), item in zip(creates, new_items):
+                result.update({'status': 'created', 'id': item.pk, 'data': InventorySerializer(created[item.pk]).data})
+                delta.add(item)
+
+        if updates:
+            fields = set()
+            for _, instance, validated_data in updates:
+                delta.remove(instance)
+                for attr, value in validated_data.items():
+                    setattr(instance, attr, value)
+                fields.update(validated_data)
+                delta.add(instance)
+            if fields:
+                Inventory.objects.bulk_update([instance for _, instance, _ in updates], list(fields))
+            for result, instance, _ in updates:
+                result.update({'status': 'updated', 'data': InventorySerializer(instance).data})
+
+        if deletes:
+            with signals_suspended():
+                Inventory.objects.filter(pk__in=[instance.pk for _, instance in deletes]).delete()
+            for result, instance in deletes:
+                result['status'] = 'deleted'
+                delta.remove(instance)
+
+        delta.apply()
+
+    # bulk_create/bulk_update no envían señales: invalidar la caché explícitamente
+    invalidate('inventory')
+    return results
@@ -0,0 +1,32 @@
+from django.db.models import Q
+
+# Campos por los que se puede filtrar el listado de inventario (coincidencia exacta)
+INVENTORY_FILTER_FIELDS = ('estado', 'categoria', 'tipo_insumo')
+
+# Campos sobre los que se aplica la búsqueda de texto (?search=)
+INVENTORY_SEARCH_FIELDS = ('descripcion', 'codigo_articulo')
+
+
+def filter_inventory(queryset, params):
+    """
+    Apply the list filters found in the query params to an Inventory queryset.
+
+    - estado, categoria, tipo_insumo: exact match
+    - search: case-insensitive match on descripcion or codigo_articulo
+    """
+    filters = {
+        field: params.get(field)
+        for field in INVENTORY_FILTER_FIELDS
+        if params.get(field)
+    }
+    if filters:
+        queryset = queryset.filter(**filters)
+
+    search = (params.get('search') or '').strip()
+    if search:
+        condition = Q()
+        for field in INVENTORY_SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': search})
+        queryset = queryset.filter(condition)
+
+    return queryset
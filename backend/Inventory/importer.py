@@ -0,0 +1,231 @@
+import csv
+import datetime
+import io
+import itertools
+import unicodedata
+import zipfile
+
+from rest_framework import serializers
+
+from core.cache import invalidate
+from core.db import write_transaction
+
+from .models import Inventory
+from .Serializers import InventorySerializer
+from .sequences import allocate_codigos
+from .summary import SummaryDelta
+
+# Tamaño por defecto de cada lote que se valida y se escribe en una transacción
+DEFAULT_CHUNK_SIZE = 2000
+
+# Máximo de errores por fila que se guardan en el reporte (el resto solo se cuenta)
+MAX_REPORTED_ERRORS = 500
+
+# Encabezados aceptados en la hoja de cálculo -> campo del modelo Inventory.
+# Los encabezados se normalizan (minúsculas, sin tildes, espacios como '_') antes de buscarlos.
+COLUMN_ALIASES = {
+    'tipo_insumo': 'tipo_insumo',
+    'tipo_de_insumo': 'tipo_insumo',
+    'insumo': 'tipo_insumo',
+    'descripcion': 'descripcion',
+    'estado': 'estado',
+    'numero_factura': 'numero_factura',
+    'numero_de_factura': 'numero_factura',
+    'n_factura': 'numero_factura',
+    'factura': 'numero_factura',
+    'inventario_total': 'inventario_total',
+    'total': 'inventario_total',
+    'cantidad': 'inventario_total',
+    'inventario_entrega': 'inventario_entrega',
+    'entregado': 'inventario_entrega',
+    'fecha_adquisicion': 'fecha_adquisicion',
+    'fecha_de_adquisicion': 'fecha_adquisicion',
+    'fecha_mantenimiento': 'fecha_mantenimiento',
+    'fecha_de_mantenimiento': 'fecha_mantenimiento',
+    'categoria': 'categoria',
+}
+
+
+def normalize_header(header):
+    """
+    'Fecha de Adquisición ' -> 'fecha_de_adquisicion'
+    """
+    text = unicodedata.normalize('NFKD', str(header or '')).encode('ascii', 'ignore').decode('ascii')
+    text = ''.join(char if char.isalnum() else ' ' for char in text.lower())
+    return '_'.join(text.split())
+
+
+def map_columns(headers):
+    """
+    Return a list with the model field for each column (None for unknown columns)
+    """
+    return [COLUMN_ALIASES.get(normalize_header(header)) for header in headers]
+
+
+def _clean_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        value = value.strip()
+    return value
+
+
+def _rows_to_dicts(rows):
+    """
+    Turn an iterator of raw rows (first one is the header) into dicts keyed by model field.
+    Empty cells are dropped so the model defaults apply.
+    """
+    rows = iter(rows)
+    try:
+        fields = map_columns(next(rows))
+    except StopIteration:
+        return
+    for row in rows:
+        record = {}
+        for field, value in zip(fields, row):
+            value = _clean_value(value)
+            if field and value not in (None, ''):
+                record[field] = value
+        yield record
+
+
+def iter_csv_records(fileobj, encoding='utf-8-sig'):
+    """
+    Stream records from a CSV file (path-like opened in binary mode or an upload).
+    The delimiter (',' or ';') is detected from the first line. A file that is
+    not valid CSV or not valid `encoding` raises ValueError.
+    """
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline='')
+    try:
+        sample = text.readline()
+        delimiter = ';' if sample.count(';') > sample.count(',') else ','
+        # chain() en lugar de un generador propio: no intenta cerrar el wrapper ya separado
+        rows = csv.reader(itertools.chain((sample,), text), delimiter=delimiter)
+        yield from _rows_to_dicts(rows)
+    except UnicodeDecodeError:
+        raise ValueError(f'The CSV file is not valid {encoding} text')
+    except csv.Error as e:
+        raise ValueError(f'Malformed CSV file: {e}')
+    finally:
+        text.detach()
+
+
+def iter_xlsx_records(fileobj):
+    """
+    Stream records from the first sheet of an XLSX file using openpyxl's read-only mode.
+    A file that is not a valid workbook raises ValueError.
+    """
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ImportError('openpyxl is required to import XLSX files (pip install openpyxl)')
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException) as e:
+        raise ValueError(f'Invalid XLSX file: {e}')
+    try:
+        yield from _rows_to_dicts(workbook.active.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def iter_records(fileobj, filename):
+    """
+    Choose the reader from the file extension
+    """
+    if filename.lower().endswith('.xlsx'):
+        return iter_xlsx_records(fileobj)
+    if filename.lower().endswith('.csv'):
+        return iter_csv_records(fileobj)
+    raise ValueError('Unsupported file type, use .csv or .xlsx')
+
+
+class ImportReport:
+    """
+    Progress and result of an import. Only the first MAX_REPORTED_ERRORS row errors are kept.
+    `file_error` is set when the file could not be read past some row.
+    """
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.file_error = None
+
+    def add_error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'file_error': self.file_error,
+        }
+
+
+def _write_chunk(validated_rows):
+    codigos = allocate_codigos(len(validated_rows))
+    items = [Inventory(codigo_articulo=codigo, **data) for codigo, data in zip(codigos, validated_rows)]
+    delta = SummaryDelta()
+    for item in items:
+        delta.add(item)
+    with write_transaction():
+        Inventory.objects.bulk_create(items)
+        delta.apply()
+    invalidate('inventory')
+
+
+def import_inventory(records, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, progress=None):
+    """
+    Validate and insert inventory records in chunks.
+
+    Each record is validated with InventorySerializer; valid rows of a chunk
+    are written with one bulk_create inside one transaction. Only one chunk is
+    held in memory at a time. `progress(report)` is called after every chunk.
+    Row numbers in the report are 1-based and count the header as row 1.
+
+    If the file cannot be read past some row (ValueError from the reader),
+    the valid rows before it are still written and the import stops with
+    report.file_error = {'row': first row not read, 'error': ...}: `created`
+    is then exactly what was saved, and the file can be resumed from that row.
+    """
+    # Un solo serializer reutilizado para todas las filas, como hace ListSerializer
+    validator = InventorySerializer()
+    report = ImportReport()
+    chunk = []
+
+    def flush():
+        if chunk and not dry_run:
+            _write_chunk(chunk)
+        report.created += len(chunk)
+        chunk.clear()
+        if progress:
+            progress(report)
+
+    records = iter(records)
+    row_number = 1
+    while True:
+        row_number += 1
+        try:
+            record = next(records)
+        except StopIteration:
+            break
+        except ValueError as e:
+            report.file_error = {'row': row_number, 'error': str(e)}
+            break
+        report.processed += 1
+        try:
+            chunk.append(validator.run_validation(record))
+        except serializers.ValidationError as e:
+            report.add_error(row_number, e.detail)
+        if report.processed % chunk_size == 0:
+            flush()
+    flush()
+
+    return report
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Inventory.importer import DEFAULT_CHUNK_SIZE, import_inventory, iter_records
+
+
+class Command(BaseCommand):
+    help = 'Importa artículos de inventario desde un archivo CSV o XLSX por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Ruta del archivo .csv o .xlsx')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Filas por lote/transacción')
+        parser.add_argument('--dry-run', action='store_true', help='Solo validar, sin escribir en la base de datos')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.monotonic()
+
+        def progress(report):
+            self.stdout.write(
+                f'{report.processed} filas procesadas, {report.created} válidas, {report.error_count} con errores'
+            )
+
+        try:
+            with open(path, 'rb') as fileobj:
+                report = import_inventory(
+                    iter_records(fileobj, path),
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                    progress=progress,
+                )
+        except (OSError, ValueError, ImportError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"Fila {error['row']}: {error['errors']}"))
+        if report.error_count > len(report.errors):
+            self.stdout.write(self.style.WARNING(
+                f'... y {report.error_count - len(report.errors)} errores más'
+            ))
+
+        action = 'validadas' if options['dry_run'] else 'importadas'
+        if report.file_error:
+            raise CommandError(
+                f"Fila {report.file_error['row']}: {report.file_error['error']} "
+                f"({report.created} filas {action} antes del error; reanudar desde esa fila)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Proceso completado: {report.created} filas {action}, {report.error_count} con errores '
+            f'en {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Inventory.summary import check_summary, rebuild_summary
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla de resumen del inventario o verifica su consistencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Solo comparar el resumen con los datos de Inventory, sin modificarlo'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = check_summary()
+            for mismatch in mismatches:
+                self.stdout.write(self.style.WARNING(
+                    f"{mismatch['group']}: esperado {mismatch['expected']}, guardado {mismatch['stored']}"
+                ))
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} grupos inconsistentes; ejecute el comando sin --check')
+            self.stdout.write(self.style.SUCCESS('El resumen del inventario es consistente'))
+            return
+
+        groups = rebuild_summary()
+        self.stdout.write(self.style.SUCCESS(f'Resumen reconstruido: {groups} grupos'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+def seed_codigo_sequence(apps, schema_editor):
+    Inventory = apps.get_model('Inventory', 'Inventory')
+    InventorySequence = apps.get_model('Inventory', 'InventorySequence')
+    codes = Inventory.objects.values_list('codigo_articulo', flat=True)
+    last_value = max((int(code) for code in codes if code and code.isdigit()), default=0)
+    InventorySequence.objects.get_or_create(name='codigo_articulo', defaults={'last_value': last_value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0004_alter_inventory_codigo_articulo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'Inventory_Sequence',
+                'managed': True,
+            },
+        ),
+        migrations.RunPython(seed_codigo_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 08:12
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_inventory_summary(apps, schema_editor):
+    Inventory = apps.get_model('Inventory', 'Inventory')
+    InventorySummary = apps.get_model('Inventory', 'InventorySummary')
+    groups = {}
+    rows = Inventory.objects.values('tipo_insumo', 'categoria', 'estado').annotate(
+        item_count=Count('id'), total=Sum('inventario_total'), entrega=Sum('inventario_entrega')
+    ).order_by()
+    for row in rows:
+        key = (row['tipo_insumo'], row['categoria'] or '', row['estado'])
+        count, total, entrega = groups.get(key, (0, 0, 0))
+        groups[key] = (count + row['item_count'], total + (row['total'] or 0), entrega + (row['entrega'] or 0))
+    InventorySummary.objects.bulk_create([
+        InventorySummary(tipo_insumo=tipo, categoria=categoria, estado=estado,
+                         item_count=count, total=total, entrega=entrega)
+        for (tipo, categoria, estado), (count, total, entrega) in groups.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0005_inventorysequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_insumo', models.CharField(max_length=250)),
+                ('categoria', models.CharField(blank=True, default='', max_length=70)),
+                ('estado', models.CharField(max_length=50)),
+                ('item_count', models.IntegerField(default=0)),
+                ('total', models.BigIntegerField(default=0)),
+                ('entrega', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'Inventory_Summary',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('tipo_insumo', 'categoria', 'estado'), name='inventory_summary_group')],
+            },
+        ),
+        migrations.RunPython(build_inventory_summary, migrations.RunPython.noop),
+    ]
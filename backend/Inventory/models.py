@@ -21,25 +21,20 @@ class Inventory(models.Model):
     class Meta:
         managed = True
         db_table = 'Inventory'
+        indexes = [
+            # Filtro por tipo_insumo del listado y agrupación del resumen
+            models.Index(fields=['tipo_insumo', 'categoria', 'estado'], name='inventory_tipo_cat_estado_idx'),
+            models.Index(fields=['estado'], name='inventory_estado_idx'),
+            models.Index(fields=['categoria'], name='inventory_categoria_idx'),
+        ]
     
     @staticmethod
     def get_next_codigo_articulo():
         """
-        Generate the next 4-digit codigo_articulo
+        Generate the next 4-digit codigo_articulo from the InventorySequence counter
         """
-        last_item = Inventory.objects.all().order_by('-id').first()
-        if not last_item or not last_item.codigo_articulo.isdigit():
-            # Start with 0001 if no records exist or last record has non-numeric codigo_articulo
-            return '0001'
-        
-        try:
-            # Extract numeric value, increment by 1, and format as 4-digit number
-            last_code = int(last_item.codigo_articulo)
-            next_code = last_code + 1
-            return f"{next_code:04d}"  # Format as 4-digit number with leading zeros
-        except (ValueError, TypeError):
-            # Fallback to 0001 if conversion fails
-            return '0001'
+        from .sequences import allocate_codigos
+        return allocate_codigos(1)[0]
     
     def save(self, *args, **kwargs):
         """
@@ -53,3 +48,43 @@ class Inventory(models.Model):
     
     def __str__(self):
         return f"{self.codigo_articulo} - {self.tipo_insumo}"
+
+
+class InventorySequence(models.Model):
+    """
+    Named counter used to hand out codigo_articulo values atomically.
+    last_value holds the last number that was allocated.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = 'Inventory_Sequence'
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+
+class InventorySummary(models.Model):
+    """
+    Precomputed totals per (tipo_insumo, categoria, estado), kept up to date
+    incrementally by Inventory.summary. categoria is stored as '' when the
+    article has none so the unique constraint also covers that group.
+    """
+    tipo_insumo = models.CharField(max_length=250)
+    categoria = models.CharField(max_length=70, blank=True, default='')
+    estado = models.CharField(max_length=50)
+    item_count = models.IntegerField(default=0)
+    total = models.BigIntegerField(default=0)
+    entrega = models.BigIntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = 'Inventory_Summary'
+        constraints = [
+            models.UniqueConstraint(fields=['tipo_insumo', 'categoria', 'estado'], name='inventory_summary_group'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo_insumo} / {self.categoria or '-'} / {self.estado}: {self.total}"
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InventoryCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the inventory list.
+
+    The cursor encodes the position of the last row, so every page is a
+    `WHERE id > ? ORDER BY id LIMIT n` query and page N costs the same as
+    page 1. Ordering is restricted to unique columns: on a column with
+    repeated values DRF's cursor falls back to an offset within each run of
+    equal values, and that cost grows with the length of the run.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+    ordering_fields = ('id', 'codigo_articulo')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get('ordering', '').strip()
+        if ordering.lstrip('-') not in self.ordering_fields:
+            return (self.ordering,)
+        return (ordering,)
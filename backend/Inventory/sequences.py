@@ -0,0 +1,55 @@
+from django.db.models import F
+
+from core.db import write_transaction
+
+from .models import Inventory, InventorySequence
+
+# Nombre de la secuencia usada para codigo_articulo
+CODIGO_ARTICULO_SEQUENCE = 'codigo_articulo'
+
+
+def format_codigo(value):
+    """
+    Format a sequence number as a codigo_articulo (4 digits, zero padded)
+    """
+    return f"{value:04d}"
+
+
+def max_numeric_codigo():
+    """
+    Highest numeric codigo_articulo currently stored (0 if there is none).
+    Non-numeric codes are ignored instead of resetting the counter.
+    """
+    codes = Inventory.objects.values_list('codigo_articulo', flat=True).iterator()
+    return max((int(code) for code in codes if code and code.isdigit()), default=0)
+
+
+def reserve_block(count, name=CODIGO_ARTICULO_SEQUENCE):
+    """
+    Atomically reserve `count` consecutive numbers and return them as a range.
+
+    The increment is a single `UPDATE ... SET last_value = last_value + count`,
+    which takes the write lock, so concurrent callers can never get
+    overlapping blocks. The value is read back inside the same transaction.
+    The sequence row is created, seeded with the current max code, only the
+    first time the UPDATE finds no row.
+    """
+    if count < 1:
+        raise ValueError('count must be a positive integer')
+
+    with write_transaction():
+        sequence = InventorySequence.objects.filter(name=name)
+        if not sequence.update(last_value=F('last_value') + count):
+            # Primera reserva: sembrar la secuencia (get_or_create tolera que otro proceso la cree a la vez)
+            InventorySequence.objects.get_or_create(name=name, defaults={'last_value': max_numeric_codigo()})
+            sequence.update(last_value=F('last_value') + count)
+        last_value = sequence.values_list('last_value', flat=True).get()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def allocate_codigos(count=1):
+    """
+    Reserve `count` codigo_articulo values, e.g. for bulk imports
+    """
+    return [format_codigo(value) for value in reserve_block(count)]
+
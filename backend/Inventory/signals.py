@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Inventory
+from .summary import GROUP_FIELDS, VALUE_FIELDS, SummaryDelta, signals_enabled, snapshot
+
+
+@receiver(pre_save, sender=Inventory)
+def remember_previous_summary(sender, instance, raw=False, **kwargs):
+    """
+    Guardar la contribución anterior del artículo para poder restarla en post_save
+    """
+    instance._summary_previous = None
+    if raw or not instance.pk or not signals_enabled():
+        return
+    previous = Inventory.objects.filter(pk=instance.pk).values(*GROUP_FIELDS, *VALUE_FIELDS).first()
+    if previous is not None:
+        instance._summary_previous = snapshot(previous)
+
+
+@receiver(post_save, sender=Inventory)
+def update_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw or not signals_enabled():
+        return
+    delta = SummaryDelta()
+    previous = getattr(instance, '_summary_previous', None)
+    if previous is not None:
+        delta.remove(previous)
+    delta.add(instance)
+    delta.apply()
+
+
+@receiver(post_delete, sender=Inventory)
+def update_summary_on_delete(sender, instance, **kwargs):
+    if not signals_enabled():
+        return
+    delta = SummaryDelta()
+    delta.remove(instance)
+    delta.apply()
@@ -0,0 +1,148 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from core.cache import invalidate
+from core.db import write_transaction
+
+from .models import Inventory, InventorySummary
+
+# Columnas que definen un grupo del resumen y columnas que se suman
+GROUP_FIELDS = ('tipo_insumo', 'categoria', 'estado')
+VALUE_FIELDS = ('inventario_total', 'inventario_entrega')
+
+_state = threading.local()
+
+
+def group_key(values):
+    """
+    (tipo_insumo, categoria, estado) for an Inventory instance or a values() dict
+    """
+    if isinstance(values, dict):
+        get = values.get
+    else:
+        get = lambda field: getattr(values, field)
+    return (get('tipo_insumo'), get('categoria') or '', get('estado'))
+
+
+def snapshot(values):
+    """
+    Contribution of one article to the summary: (key, total, entrega)
+    """
+    if isinstance(values, dict):
+        return group_key(values), values.get('inventario_total') or 0, values.get('inventario_entrega') or 0
+    return group_key(values), values.inventario_total or 0, values.inventario_entrega or 0
+
+
+class SummaryDelta:
+    """
+    Accumulates changes for several articles and writes them with one
+    UPDATE per affected group.
+    """
+    def __init__(self):
+        self.changes = defaultdict(lambda: [0, 0, 0])
+
+    def add(self, item, sign=1):
+        key, total, entrega = item if isinstance(item, tuple) else snapshot(item)
+        change = self.changes[key]
+        change[0] += sign
+        change[1] += sign * total
+        change[2] += sign * entrega
+
+    def remove(self, item):
+        self.add(item, sign=-1)
+
+    def apply(self):
+        changes = {key: change for key, change in self.changes.items() if any(change)}
+        if changes:
+            with write_transaction():
+                for key, (count, total, entrega) in changes.items():
+                    _apply_change(key, count, total, entrega)
+        self.changes.clear()
+
+
+def _apply_change(key, count, total, entrega):
+    lookup = dict(zip(GROUP_FIELDS, key))
+    updated = InventorySummary.objects.filter(**lookup).update(
+        item_count=F('item_count') + count,
+        total=F('total') + total,
+        entrega=F('entrega') + entrega,
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                InventorySummary.objects.create(item_count=count, total=total, entrega=entrega, **lookup)
+        except IntegrityError:
+            # Otro proceso creó el grupo al mismo tiempo: aplicar como UPDATE
+            _apply_change(key, count, total, entrega)
+            return
+    if count < 0:
+        InventorySummary.objects.filter(item_count__lte=0, **lookup).delete()
+
+
+@contextmanager
+def signals_suspended():
+    """
+    Disable the per-row signal handlers while a bulk operation applies its own SummaryDelta
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def signals_enabled():
+    return not getattr(_state, 'suspended', False)
+
+
+def rebuild_summary():
+    """
+    Recompute the whole summary table from Inventory with one GROUP BY
+    """
+    rows = _grouped_totals()
+    with write_transaction():
+        InventorySummary.objects.all().delete()
+        InventorySummary.objects.bulk_create([
+            InventorySummary(item_count=count, total=total, entrega=entrega, **dict(zip(GROUP_FIELDS, key)))
+            for key, (count, total, entrega) in rows.items()
+        ])
+    invalidate('inventory')
+    return len(rows)
+
+
+def check_summary():
+    """
+    Compare the summary table with a fresh GROUP BY over Inventory.
+    Returns a list of mismatches: {'group', 'expected', 'stored'}.
+    """
+    expected = _grouped_totals()
+    stored = {
+        group_key(row): (row['item_count'], row['total'], row['entrega'])
+        for row in InventorySummary.objects.values(*GROUP_FIELDS, 'item_count', 'total', 'entrega')
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key) != stored.get(key):
+            mismatches.append({'group': key, 'expected': expected.get(key), 'stored': stored.get(key)})
+    return mismatches
+
+
+def _grouped_totals():
+    totals = defaultdict(lambda: [0, 0, 0])
+    rows = Inventory.objects.values(*GROUP_FIELDS).annotate(
+        item_count=Count('id'),
+        total=Sum('inventario_total'),
+        entrega=Sum('inventario_entrega'),
+    ).order_by()
+    for row in rows:
+        # NULL y '' en categoria caen en el mismo grupo
+        current = totals[group_key(row)]
+        current[0] += row['item_count']
+        current[1] += row['total'] or 0
+        current[2] += row['entrega'] or 0
+    return {key: tuple(value) for key, value in totals.items()}
@@ -1,3 +1,323 @@
+import csv
+import io
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.query_plans import capture_queries, full_table_scans
+from .importer import DEFAULT_CHUNK_SIZE
+from .models import Inventory, InventorySequence, InventorySummary
+from .sequences import allocate_codigos, max_numeric_codigo, reserve_block
+from .summary import check_summary
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN checks are SQLite specific')
+class InventoryQueryPlanTests(TestCase):
+    """
+    Las consultas de los endpoints de inventario no deben recorrer la tabla completa.
+    La búsqueda de texto (?search=) queda fuera: LIKE '%...%' no puede usar índices.
+    """
+    # Tabla de resumen: pocas filas por diseño, se recorre completa a propósito
+    ALLOWED_SCANS = ('Inventory_Summary',)
+
+    @classmethod
+    def setUpTestData(cls):
+        Inventory.objects.bulk_create([
+            Inventory(
+                codigo_articulo=f'{i:04d}',
+                tipo_insumo='GASA' if i % 2 else 'JERINGA',
+                categoria='Medico' if i % 3 else 'Quirurgico',
+                estado='Disponible' if i % 5 else 'Agotado',
+                inventario_total=i,
+            )
+            for i in range(1, 201)
+        ])
+
+    def setUp(self):
+        # Sin respuestas en caché para que cada petición llegue a la base de datos
+        cache.clear()
+        self.client = APIClient()
+
+    def assertNoFullScans(self, url):
+        with capture_queries() as queries:
+            response = self.client.get(url)
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries)
+        self.assertEqual(full_table_scans(queries, self.ALLOWED_SCANS), [])
+
+    def test_list_filters(self):
+        for params in ('estado=Agotado', 'categoria=Medico', 'tipo_insumo=GASA',
+                       'tipo_insumo=GASA&categoria=Medico&estado=Disponible'):
+            with self.subTest(params=params):
+                self.assertNoFullScans(f'/api/Inventory/?{params}')
+
+    def test_paginated_list_filters(self):
+        for params in ('estado=Agotado', 'categoria=Medico', 'tipo_insumo=GASA'):
+            with self.subTest(params=params):
+                self.assertNoFullScans(f'/api/Inventory/?paginated=1&page_size=10&{params}')
+
+    def test_paginated_list_next_page(self):
+        response = self.client.get('/api/Inventory/?page_size=10')
+        self.assertNoFullScans(response.data['next'])
+
+    def test_detail(self):
+        self.assertNoFullScans(f'/api/Inventory/{Inventory.objects.first().pk}/')
+
+    def test_totals(self):
+        self.assertNoFullScans('/api/Inventory/total/')
+
+    def test_export_filters(self):
+        self.assertNoFullScans('/api/Inventory/export/?tipo_insumo=GASA')
+
+
+class InventoryPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Inventory.objects.bulk_create([
+            Inventory(codigo_articulo=f'{i:04d}', tipo_insumo='GASA', inventario_total=i)
+            for i in range(1, 26)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def collect(self, url):
+        codigos = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            codigos += [item['codigo_articulo'] for item in response.data['results']]
+            url = response.data['next']
+        return codigos
+
+    def test_ordering_walks_every_row_once(self):
+        expected = [f'{i:04d}' for i in range(25, 0, -1)]
+        self.assertEqual(self.collect('/api/Inventory/?page_size=10&ordering=-codigo_articulo'), expected)
+
+    def test_non_unique_ordering_falls_back_to_id(self):
+        response = self.client.get('/api/Inventory/?page_size=5&ordering=-fecha_adquisicion')
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(ids, sorted(ids))
+
+
+class InventoryImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post_csv(self, content):
+        upload = SimpleUploadedFile('inventario.csv', content, content_type='text/csv')
+        return self.client.post('/api/Inventory/import/', {'archivo': upload}, format='multipart')
+
+    def test_import_csv(self):
+        response = self.post_csv('Tipo de Insumo;Cantidad\nGASA;10\nJERINGA;5\n'.encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(Inventory.objects.count(), 2)
+
+    def test_malformed_csv_is_a_bad_request(self):
+        # Campo más largo que csv.field_size_limit() y archivo que no es UTF-8
+        for content in (f'tipo_insumo,descripcion\nGASA,{"x" * (csv.field_size_limit() + 1)}\n'.encode(),
+                        'tipo_insumo,cantidad\nGASA,\xf1\n'.encode('latin-1')):
+            with self.subTest(content=content):
+                response = self.post_csv(content)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+                self.assertEqual(response.data['created'], 0)
+        self.assertFalse(Inventory.objects.exists())
+
+    def test_corrupt_xlsx_is_a_bad_request(self):
+        upload = SimpleUploadedFile('inventario.xlsx', b'no es un zip', content_type='application/octet-stream')
+        response = self.client.post('/api/Inventory/import/', {'archivo': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid XLSX file', response.data['error'])
+
+    def test_unreadable_tail_reports_what_was_saved(self):
+        # Más de un lote (DEFAULT_CHUNK_SIZE) de filas válidas y luego bytes que no son UTF-8
+        rows = DEFAULT_CHUNK_SIZE + 500
+        content = ('tipo_insumo;cantidad\n' + 'GASA;1\n' * rows).encode() + 'GASA;\xf1\n'.encode('latin-1')
+        response = self.post_csv(content)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], Inventory.objects.count())
+        # Todo lo anterior a la fila que falló quedó guardado; se puede reanudar desde ella
+        self.assertGreater(response.data['created'], DEFAULT_CHUNK_SIZE)
+        self.assertEqual(response.data['file_error']['row'], response.data['created'] + 2)
+        self.assertEqual(response.data['error'], response.data['file_error']['error'])
+
+
+class InventoryBulkTests(TestCase):
+    """
+    Operaciones en bloque: resultado por ítem, todo o nada, códigos de un bloque reservado y resumen.
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.gasa = Inventory.objects.create(tipo_insumo='GASA', categoria='Medico', inventario_total=10)
+        self.jeringa = Inventory.objects.create(tipo_insumo='JERINGA', categoria='Medico', inventario_total=4)
+
+    def bulk(self, operations):
+        return self.client.post('/api/Inventory/bulk/', {'operations': operations}, format='json')
+
+    def totals(self):
+        return {row['tipo_insumo']: row['total'] for row in self.client.get('/api/Inventory/total/').data}
+
+    def test_mixed_operations(self):
+        self.assertEqual(self.totals(), {'GASA': 10, 'JERINGA': 4})
+        response = self.bulk([
+            {'op': 'create', 'data': {'tipo_insumo': 'GASA', 'inventario_total': 5}},
+            {'op': 'update', 'id': self.gasa.pk, 'data': {'categoria': 'Quirurgico', 'inventario_total': 7}},
+            {'op': 'delete', 'id': self.jeringa.pk},
+            {'op': 'create', 'data': {'tipo_insumo': 'VENDA', 'inventario_total': 2}},
+        ])
+        self.assertEqual(response.status_code, 200, response.data)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'updated', 'deleted', 'created'])
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3])
+        self.assertEqual(results[1]['data']['categoria'], 'Quirurgico')
+        self.assertEqual(Inventory.objects.get(pk=results[0]['id']).inventario_total, 5)
+        self.assertFalse(Inventory.objects.filter(pk=self.jeringa.pk).exists())
+
+        # Resumen al día y caché de /total/ invalidada por la operación en bloque
+        self.assertEqual(check_summary(), [])
+        self.assertEqual(InventorySummary.objects.get(tipo_insumo='GASA', categoria='Quirurgico').total, 7)
+        self.assertEqual(self.totals(), {'GASA': 12, 'VENDA': 2})
+
+    def test_invalid_item_rolls_back_the_batch(self):
+        last_value = InventorySequence.objects.get().last_value
+        response = self.bulk([
+            {'op': 'create', 'data': {'tipo_insumo': 'VENDA', 'inventario_total': 2}},
+            {'op': 'update', 'id': self.gasa.pk, 'data': {'inventario_total': 'muchos'}},
+            {'op': 'delete', 'id': 999999},
+            {'op': 'delete'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['ok', 'error', 'error', 'error'])
+        self.assertIn('inventario_total', results[1]['errors'])
+        self.assertIn('id', results[2]['errors'])
+        # Nada escrito: ni filas, ni códigos reservados, ni resumen
+        self.assertEqual(Inventory.objects.count(), 2)
+        self.assertEqual(Inventory.objects.get(pk=self.gasa.pk).inventario_total, 10)
+        self.assertEqual(InventorySequence.objects.get().last_value, last_value)
+        self.assertEqual(check_summary(), [])
+
+    def test_codes_come_from_one_reserved_block(self):
+        last_value = InventorySequence.objects.get().last_value
+        response = self.bulk([{'op': 'create', 'data': {'tipo_insumo': 'GASA'}} for _ in range(3)])
+        self.assertEqual(response.status_code, 200)
+        codigos = [result['data']['codigo_articulo'] for result in response.data['results']]
+        self.assertEqual(codigos, [f'{value:04d}' for value in range(last_value + 1, last_value + 4)])
+        self.assertEqual(InventorySequence.objects.get().last_value, last_value + 3)
+
+    def test_request_limits(self):
+        self.assertEqual(self.bulk([]).status_code, 400)
+        with mock.patch('Inventory.views.MAX_BULK_OPERATIONS', 2):
+            self.assertEqual(self.bulk([{'op': 'delete', 'id': self.gasa.pk}] * 3).status_code, 400)
+        self.assertTrue(Inventory.objects.filter(pk=self.gasa.pk).exists())
+
+
+class InventorySummaryTests(TestCase):
+    """
+    InventorySummary sigue cada alta, cambio y baja de artículos; check_summary detecta diferencias.
+    """
+    def summary(self):
+        self.assertEqual(check_summary(), [])
+        return {
+            (row.tipo_insumo, row.categoria, row.estado): (row.item_count, row.total, row.entrega)
+            for row in InventorySummary.objects.all()
+        }
+
+    def test_follows_create_update_delete(self):
+        gasa = Inventory.objects.create(tipo_insumo='GASA', categoria='Medico', inventario_total=10,
+                                        inventario_entrega=2)
+        Inventory.objects.create(tipo_insumo='GASA', categoria='Medico', inventario_total=5)
+        self.assertEqual(self.summary(), {('GASA', 'Medico', 'Disponible'): (2, 15, 2)})
+
+        gasa.inventario_total = 12
+        gasa.save()
+        self.assertEqual(self.summary(), {('GASA', 'Medico', 'Disponible'): (2, 17, 2)})
+
+        # Cambio de categoría: el artículo pasa de un grupo a otro
+        gasa.categoria = 'Quirurgico'
+        gasa.save()
+        self.assertEqual(self.summary(), {
+            ('GASA', 'Medico', 'Disponible'): (1, 5, 0),
+            ('GASA', 'Quirurgico', 'Disponible'): (1, 12, 2),
+        })
+
+        # Cambio de tipo y sin categoría: el grupo queda con categoria ''
+        gasa.tipo_insumo = 'VENDA'
+        gasa.categoria = None
+        gasa.save()
+        self.assertEqual(self.summary(), {
+            ('GASA', 'Medico', 'Disponible'): (1, 5, 0),
+            ('VENDA', '', 'Disponible'): (1, 12, 2),
+        })
+
+        # Al borrar el último artículo de un grupo, el grupo desaparece
+        gasa.delete()
+        self.assertEqual(self.summary(), {('GASA', 'Medico', 'Disponible'): (1, 5, 0)})
+
+    def test_check_reports_drift(self):
+        Inventory.objects.create(tipo_insumo='GASA', categoria='Medico', inventario_total=10)
+        # update() no envía señales: el resumen queda desfasado
+        Inventory.objects.update(inventario_total=3)
+        self.assertEqual(check_summary(), [
+            {'group': ('GASA', 'Medico', 'Disponible'), 'expected': (1, 3, 0), 'stored': (1, 10, 0)},
+        ])
+        with self.assertRaisesMessage(CommandError, '1 grupos inconsistentes'):
+            call_command('rebuild_inventory_summary', check=True, stdout=io.StringIO())
+
+        out = io.StringIO()
+        call_command('rebuild_inventory_summary', stdout=out)
+        self.assertIn('Resumen reconstruido: 1 grupos', out.getvalue())
+        out = io.StringIO()
+        call_command('rebuild_inventory_summary', check=True, stdout=out)
+        self.assertIn('consistente', out.getvalue())
+
+
+class InventorySequenceTests(TestCase):
+    """
+    Reserva de bloques de codigo_articulo y siembra de la secuencia desde los códigos existentes.
+    """
+    def setUp(self):
+        # La migración 0005 crea la fila; sin ella, la primera reserva la siembra
+        InventorySequence.objects.all().delete()
+
+    def test_reserve_block(self):
+        first = reserve_block(3)
+        second = reserve_block(2)
+        self.assertEqual(list(first), [1, 2, 3])
+        self.assertEqual(list(second), [4, 5])
+        self.assertEqual(InventorySequence.objects.get().last_value, 5)
+        with self.assertRaises(ValueError):
+            reserve_block(0)
+
+    def test_reservation_after_seeding_is_one_update_and_one_read(self):
+        reserve_block(1)
+        with capture_queries() as queries:
+            self.assertEqual(list(reserve_block(2)), [2, 3])
+        # Sin contar los SAVEPOINT de la transacción de la prueba
+        statements = [sql for sql, _ in queries if 'SAVEPOINT' not in sql]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith('UPDATE'))
+
+    def test_seed_from_mixed_codes(self):
+        Inventory.objects.bulk_create([
+            Inventory(codigo_articulo=codigo) for codigo in ('0005', 'ABC-1', '0012', 'N/A', '7')
+        ])
+        self.assertEqual(max_numeric_codigo(), 12)
+        self.assertEqual(allocate_codigos(2), ['0013', '0014'])
 
-# Create your tests here.
+    def test_seed_from_non_numeric_codes(self):
+        Inventory.objects.bulk_create([Inventory(codigo_articulo=codigo) for codigo in ('ABC', 'X-9')])
+        self.assertEqual(max_numeric_codigo(), 0)
+        self.assertEqual(allocate_codigos(1), ['0001'])
+        self.assertEqual(Inventory.objects.create(tipo_insumo='GASA').codigo_articulo, '0002')
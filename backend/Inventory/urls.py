@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import Create_Consult, Inventory_Total, inventory_detail
+from core.async_views import read_view
+from .async_views import inventory_list
+from .views import Create_Consult, Inventory_Total, inventory_detail, inventory_bulk, inventory_import, inventory_export
 
 urlpatterns = [
-    path('', Create_Consult, name='Create_Consult'),
+    path('', read_view(Create_Consult, inventory_list), name='Create_Consult'),
     path('total/', Inventory_Total, name='Inventory_Total'),
+    path('bulk/', inventory_bulk, name='inventory_bulk'),
+    path('import/', inventory_import, name='inventory_import'),
+    path('export/', inventory_export, name='inventory_export'),
     path('<int:pk>/', inventory_detail, name='inventory_detail'),
 ]
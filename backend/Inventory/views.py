@@ -3,20 +3,42 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from .Serializers import InventorySerializer
-from .models import Inventory
+from .models import Inventory, InventorySummary
+from .filters import filter_inventory
+from .importer import import_inventory, iter_records
+from .bulk import MAX_BULK_OPERATIONS, BulkValidationError, apply_bulk_operations
+from .pagination import InventoryCursorPagination
 from django.db import connection, models
+from core.cache import cache_response
+from core.streaming import EXPORT_CONTENT_TYPES, export_fields, export_response
 # Create your views here.
 
+# Parámetros que activan el modo paginado del listado de inventario
+PAGINATION_PARAMS = ('paginated', 'cursor', 'page_size')
+
+# Filas que se leen de la base de datos por cada viaje del cursor al exportar
+EXPORT_CHUNK_SIZE = 2000
+
 @api_view(['GET', 'POST'])
 @permission_classes([permissions.AllowAny])
+@cache_response('inventory')
 def Create_Consult(request):
     """
-    GET: List all inventory items
+    GET: List inventory items
+        Filters: ?estado=, ?categoria=, ?tipo_insumo=, ?search= (descripcion/codigo_articulo)
+        Paginated mode (?paginated=1, ?cursor=, ?page_size=): cursor pagination on id,
+        with optional ?ordering=id|codigo_articulo (prefix '-' for desc).
+        Without pagination params the full (filtered) list is returned as before.
     POST: Create a new inventory item
     """
     if request.method == 'GET':
         try:
-            inventory_items = Inventory.objects.all()
+            inventory_items = filter_inventory(Inventory.objects.all(), request.query_params)
+            if any(param in request.query_params for param in PAGINATION_PARAMS):
+                paginator = InventoryCursorPagination()
+                page = paginator.paginate_queryset(inventory_items, request)
+                serializer = InventorySerializer(page, many=True)
+                return paginator.get_paginated_response(serializer.data)
             serializer = InventorySerializer(inventory_items, many=True)
             return Response(serializer.data)
         except Exception as e:
@@ -31,6 +53,7 @@ def Create_Consult(request):
 
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([permissions.AllowAny])
+@cache_response('inventory')
 def inventory_detail(request, pk):
     """
     GET: Retrieve a single inventory item
@@ -57,18 +80,95 @@ def inventory_detail(request, pk):
         inventory.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def inventory_bulk(request):
+    """
+    POST: Apply a batch of create/update/delete operations in one transaction
+        Body: {"operations": [{"op": "create", "data": {...}},
+                              {"op": "update", "id": 1, "data": {...}},
+                              {"op": "delete", "id": 2}]}
+    All operations are validated first; if any is invalid nothing is written
+    and the per-item results are returned with status 400.
+    """
+    operations = request.data.get('operations') if isinstance(request.data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return Response({'error': 'operations must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(operations) > MAX_BULK_OPERATIONS:
+        return Response(
+            {'error': f'A maximum of {MAX_BULK_OPERATIONS} operations is allowed per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        results = apply_bulk_operations(operations)
+    except BulkValidationError as e:
+        return Response({'results': e.results}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def inventory_export(request):
+    """
+    GET: Stream the inventory as CSV (?formato=csv, default) or NDJSON (?formato=ndjson)
+        Accepts the same filters as the list: ?estado=, ?categoria=, ?tipo_insumo=, ?search=
+    Rows are read with a server-side iterator and serialized one by one while streaming.
+    """
+    export_format = request.query_params.get('formato', 'csv')
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return Response(
+            {'error': f"formato must be one of: {', '.join(EXPORT_CONTENT_TYPES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    queryset = filter_inventory(Inventory.objects.order_by('id'), request.query_params)
+    serializer = InventorySerializer()
+    records = (
+        serializer.to_representation(item)
+        for item in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return export_response(records, export_fields(serializer), export_format, 'inventario')
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def inventory_import(request):
+    """
+    POST: Import inventory items from an uploaded CSV/XLSX file (multipart field 'archivo')
+        ?dry_run=1 only validates the file.
+    Rows are validated with InventorySerializer and written in batched transactions.
+    Returns the number of processed/created rows and the row-level errors.
+    If the file is unreadable past some row, the rows before it are kept and the
+    report comes back with status 400 and file_error {'row', 'error'}.
+    """
+    upload = request.FILES.get('archivo')
+    if upload is None:
+        return Response({'error': 'archivo is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = request.query_params.get('dry_run') in ('1', 'true', 'True')
+    try:
+        report = import_inventory(iter_records(upload.file, upload.name), dry_run=dry_run)
+    except (ValueError, ImportError) as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if report.file_error:
+        return Response({'error': report.file_error['error'], **report.as_dict()}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report.as_dict(), status=status.HTTP_200_OK)
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_response('inventory')
 def Inventory_Total(request):
     """
     Get inventory totals grouped by tipo_insumo
+    Reads the precomputed InventorySummary table, so the cost depends on the
+    number of groups, not on the number of articles.
     """
     if request.method == 'GET':
         try:
-            inventory_totals = Inventory.objects.values('tipo_insumo').annotate(
-                total=models.Sum('inventario_total'),
-                entrega=models.Sum('inventario_entrega')
-            )
+            inventory_totals = InventorySummary.objects.values('tipo_insumo').annotate(
+                total=models.Sum('total'),
+                entrega=models.Sum('entrega')
+            ).order_by('tipo_insumo')
             return Response(list(inventory_totals))
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Registrar los receivers que invalidan la caché de autenticación
+        from . import signals  # noqa: F401
+        from core.cache import invalidate_on_change
+        from .models import User
+
+        # Invalidar los perfiles en caché cuando cambia un usuario
+        invalidate_on_change(User, 'users')
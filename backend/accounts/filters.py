@@ -0,0 +1,53 @@
+from django.db.models import Q
+
+from .models import User
+
+# Campos por los que se puede filtrar el directorio de usuarios (coincidencia exacta)
+USER_FILTER_FIELDS = ('status', 'department')
+
+# Campos sobre los que se aplica la búsqueda de texto (?search=)
+USER_SEARCH_FIELDS = ('username', 'cedula', 'first_name', 'last_name')
+
+
+def scope_users(user, queryset=None):
+    """
+    Restrict a User queryset to what `user` may see:
+    - superAdmin ve todos los usuarios
+    - admin ve usuarios de su mismo departamento
+    - coordinador ve usuarios básicos de su departamento (OAC)
+    - usuarios básicos solo se ven a sí mismos
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+    if user.status == 'superAdmin':
+        return queryset
+    elif user.status == 'admin':
+        return queryset.filter(department=user.department)
+    elif user.status == 'coordinador':
+        return queryset.filter(department=user.department, status='basic')
+    return queryset.filter(id=user.id)
+
+
+def filter_users(queryset, params):
+    """
+    Apply the directory filters found in the query params to a User queryset.
+
+    - status, department: exact match
+    - search: case-insensitive match on username, cedula, first_name or last_name
+    """
+    filters = {
+        field: params.get(field)
+        for field in USER_FILTER_FIELDS
+        if params.get(field)
+    }
+    if filters:
+        queryset = queryset.filter(**filters)
+
+    search = (params.get('search') or '').strip()
+    if search:
+        condition = Q()
+        for field in USER_SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': search})
+        queryset = queryset.filter(condition)
+
+    return queryset
@@ -0,0 +1,103 @@
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.views import LoginView
+
+BENCHMARK_PASSWORD = 'benchmark-password-123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el rendimiento de POST /api/login/ (credenciales válidas, contraseña incorrecta '
+        'y cédula inexistente) sobre una base de datos de prueba desechable'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Inicios de sesión por escenario')
+        parser.add_argument('--threads', type=int, default=4, help='Peticiones concurrentes')
+        parser.add_argument('--users', type=int, default=50, help='Usuarios de prueba')
+        parser.add_argument(
+            '--iterations', type=int, default=None,
+            help='PASSWORD_PBKDF2_ITERATIONS para la prueba (por defecto el valor configurado)'
+        )
+        parser.add_argument(
+            '--throttle', action='store_true',
+            help='Mantener los límites de intentos (por defecto se desactivan para medir el hash)'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Base de datos de prueba en archivo: la base en memoria compartida de SQLite
+        # bloquea tablas enteras entre hilos y no representa un despliegue real
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark_login.sqlite3')
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        throttle_classes = LoginView.throttle_classes
+        if not options['throttle']:
+            LoginView.throttle_classes = []
+        try:
+            overrides = {}
+            if options['iterations'] is not None:
+                overrides['PASSWORD_PBKDF2_ITERATIONS'] = options['iterations']
+            with override_settings(**overrides):
+                self.run_benchmark(options)
+        finally:
+            LoginView.throttle_classes = throttle_classes
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def run_benchmark(self, options):
+        users = [
+            User(
+                username=f'bench{i}', email=f'bench{i}@example.com', cedula=f'{90000000 + i}',
+                status='basic', department='oac',
+            )
+            for i in range(options['users'])
+        ]
+        # Un solo hash compartido: crear los usuarios no es lo que se mide
+        users[0].set_password(BENCHMARK_PASSWORD)
+        for user in users[1:]:
+            user.password = users[0].password
+        User.objects.bulk_create(users)
+        cedulas = [user.cedula for user in users]
+
+        scenarios = [
+            ('valid', lambda i: {'cedula': cedulas[i % len(cedulas)], 'password': BENCHMARK_PASSWORD}),
+            ('wrong password', lambda i: {'cedula': cedulas[i % len(cedulas)], 'password': 'incorrecta'}),
+            ('unknown cedula', lambda i: {'cedula': f'{10000000 + i}', 'password': BENCHMARK_PASSWORD}),
+        ]
+        for name, payload in scenarios:
+            self.run_scenario(name, payload, options['requests'], options['threads'])
+
+    def run_scenario(self, name, payload, total, threads):
+        def login(i):
+            client = APIClient()
+            start = time.perf_counter()
+            response = client.post('/api/login/', payload(i), format='json', REMOTE_ADDR=f'10.0.{i % 250}.1')
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(login, range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _ in results)
+        codes = {}
+        for _, code in results:
+            codes[code] = codes.get(code, 0) + 1
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f'{name:<16} {total / elapsed:8.1f} logins/s  '
+            f'p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  '
+            f'status {codes}'
+        )
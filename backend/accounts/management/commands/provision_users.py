@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from accounts.provisioning import DEFAULT_BATCH_SIZE, iter_csv_records, provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea usuarios en bloque desde un CSV con columnas username, email, cedula, password, '
+        'first_name, last_name, phone, status y department'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Ruta del archivo .csv')
+        parser.add_argument(
+            '--department', choices=[choice for choice, _ in User.DEPARTMENT_CHOICES],
+            help='Restringir el archivo a un departamento (se usa cuando la fila no lo indica)'
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Filas por lote')
+        parser.add_argument('--workers', type=int, default=None, help='Procesos para calcular los hashes')
+        parser.add_argument('--dry-run', action='store_true', help='Solo validar, sin crear usuarios')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.monotonic()
+
+        def progress(report):
+            self.stdout.write(
+                f'{report.processed} filas procesadas, {report.created} válidas, {report.error_count} con errores'
+            )
+
+        try:
+            with open(path, 'rb') as fileobj:
+                report = provision_users(
+                    iter_csv_records(fileobj),
+                    department=options['department'],
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    dry_run=options['dry_run'],
+                    progress=progress,
+                )
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"Fila {error['row']}: {error['errors']}"))
+        if report.error_count > len(report.errors):
+            self.stdout.write(self.style.WARNING(
+                f'... y {report.error_count - len(report.errors)} errores más'
+            ))
+
+        action = 'validados' if options['dry_run'] else 'creados'
+        self.stdout.write(self.style.SUCCESS(
+            f'Proceso completado: {report.created} usuarios {action}, {report.error_count} con errores '
+            f'en {time.monotonic() - started:.1f}s'
+        ))
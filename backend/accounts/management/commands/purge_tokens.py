@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from accounts.tokens import PURGE_BATCH_SIZE, purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Elimina los tokens expirados o inactivos (ejecutar periódicamente, p. ej. desde cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH_SIZE,
+            help='Tokens eliminados por consulta'
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Tokens eliminados: {deleted}'))
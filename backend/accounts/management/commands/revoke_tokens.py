@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from accounts.tokens import revoke_tokens
+
+
+class Command(BaseCommand):
+    help = 'Revoca los tokens de los usuarios indicados o de todo un departamento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='+', dest='user_ids', help='Ids de usuario')
+        parser.add_argument(
+            '--department', choices=[choice for choice, _ in User.DEPARTMENT_CHOICES],
+            help='Departamento cuyos usuarios pierden sus tokens'
+        )
+
+    def handle(self, *args, **options):
+        if not options['user_ids'] and not options['department']:
+            raise CommandError('Indique --user y/o --department')
+        revoked = revoke_tokens(user_ids=options['user_ids'], department=options['department'])
+        self.stdout.write(self.style.SUCCESS(f'Tokens revocados: {revoked}'))
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
+from rest_framework.authtoken.models import Token
 
 class UserManager(DjangoUserManager):
     """
@@ -59,6 +60,12 @@ class User(AbstractUser):
     
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email', 'cedula']
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Alcance por rol/departamento de UserUpdateView
+            models.Index(fields=['department', 'status'], name='user_department_status_idx'),
+        ]
     
     def clean(self):
         """
@@ -99,3 +106,15 @@ class User(AbstractUser):
         if self.status == 'superAdmin':
             return f"{self.username} (Super Admin)"
         return f"{self.username} ({self.get_status_display()} - {self.get_department_display()})"
+
+
+class TokenActivity(models.Model):
+    """
+    Última vez que se usó un token. Se escribe de forma diferida (ver accounts.tokens),
+    como máximo una vez por intervalo, para no escribir en cada petición.
+    """
+    token = models.OneToOneField(Token, on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    last_used = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.token_id[:8]}... {self.last_used}"
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Paginación por cursor para el directorio de usuarios, ordenado por username
+    (único e indexado), así cada página es una sola consulta sin COUNT.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = 'username'
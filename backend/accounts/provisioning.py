@@ -0,0 +1,236 @@
+"""
+Alta masiva de usuarios desde un CSV.
+
+Cada lote se valida fila por fila sin consultar la base de datos; la
+unicidad de cédula, email y username se verifica con una sola consulta por
+lote, los hashes de contraseña se calculan en un pool de procesos y los
+usuarios válidos se insertan con bulk_create (fila por fila si otro proceso
+creó alguno de ellos después de la verificación). No se crean tokens: el
+usuario recibe el suyo al iniciar sesión (accounts.tokens.issue_token).
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError
+from django.db.models import Q
+from rest_framework import serializers
+
+from core.cache import invalidate
+from core.db import write_transaction
+from core.hashers import hash_passwords
+
+from .models import User
+
+# Filas que se validan, verifican e insertan juntas
+DEFAULT_BATCH_SIZE = 500
+
+# Máximo de errores por fila que se guardan en el reporte (el resto solo se cuenta)
+MAX_REPORTED_ERRORS = 500
+
+# Campos con restricción de unicidad que se verifican por lote
+UNIQUE_FIELDS = ('cedula', 'email', 'username')
+
+
+class UserProvisionSerializer(serializers.ModelSerializer):
+    """
+    Validación de una fila del CSV. Las validaciones de unicidad se quitan
+    de los campos porque provision_users() las hace por lote.
+    """
+    password = serializers.CharField(write_only=True, required=True)
+
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'cedula', 'password', 'first_name', 'last_name', 'phone', 'status', 'department']
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'required': True, 'validators': []},
+            'cedula': {'validators': []},
+        }
+
+    def validate_cedula(self, value):
+        """
+        Validar que la cédula tenga entre 8 y 10 dígitos
+        """
+        digits_only = ''.join(filter(str.isdigit, value))
+        if len(digits_only) < 8:
+            raise serializers.ValidationError("La cédula debe tener al menos 8 dígitos.")
+        if len(digits_only) > 10:
+            raise serializers.ValidationError("La cédula no debe tener más de 10 dígitos.")
+        return value
+
+    def validate(self, data):
+        # Mismas reglas status/department que User.save() -> clean()
+        user = User(**{key: value for key, value in data.items() if key != 'password'})
+        try:
+            user.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
+        data['department'] = user.department
+        return data
+
+
+def iter_csv_records(fileobj, encoding='utf-8-sig'):
+    """
+    Stream dicts from a CSV file opened in binary mode. Headers are matched
+    case-insensitively; empty cells are dropped so the model defaults apply.
+    The delimiter (',' or ';') is detected from the first line.
+    """
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline='')
+    try:
+        header = text.readline()
+        delimiter = ';' if header.count(';') > header.count(',') else ','
+        fields = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter), [])]
+        for row in csv.reader(text, delimiter=delimiter):
+            yield {
+                field: value.strip()
+                for field, value in zip(fields, row)
+                if field and value.strip()
+            }
+    finally:
+        text.detach()
+
+
+class ProvisionReport:
+    """
+    Result of a provisioning run. Only the first MAX_REPORTED_ERRORS row errors are kept.
+    """
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def _existing_values(rows):
+    """
+    Cédulas, emails y usernames del lote que ya existen, en una sola consulta
+    """
+    condition = Q()
+    for field in UNIQUE_FIELDS:
+        condition |= Q(**{f'{field}__in': [data[field] for _, data in rows]})
+    existing = {field: set() for field in UNIQUE_FIELDS}
+    for values in User.objects.filter(condition).values_list(*UNIQUE_FIELDS):
+        for field, value in zip(UNIQUE_FIELDS, values):
+            existing[field].add(value)
+    return existing
+
+
+def _write_batch(rows, report, seen, executor, dry_run):
+    existing = _existing_values(rows)
+    valid = []
+    for row_number, data in rows:
+        errors = {}
+        for field in UNIQUE_FIELDS:
+            if data[field] in existing[field]:
+                errors[field] = [f'Ya existe un usuario con este {field}.']
+            elif data[field] in seen[field]:
+                errors[field] = [f'{field} repetido en el archivo.']
+        if errors:
+            report.add_error(row_number, errors)
+            continue
+        for field in UNIQUE_FIELDS:
+            seen[field].add(data[field])
+        valid.append((row_number, data))
+
+    if not valid or dry_run:
+        report.created += len(valid)
+        return
+
+    hashes = hash_passwords([data.pop('password') for _, data in valid], executor)
+    users = [(row_number, User(password=password, **data)) for password, (row_number, data) in zip(hashes, valid)]
+    try:
+        with write_transaction():
+            User.objects.bulk_create([user for _, user in users])
+        report.created += len(users)
+    except IntegrityError:
+        # Otro proceso creó un usuario con la misma cédula/email/username
+        # después de la verificación: insertar fila por fila y reportar las que chocan
+        report.created += _create_one_by_one(users, report)
+    # bulk_create no emite post_save
+    invalidate('users')
+
+
+def _create_one_by_one(users, report):
+    """
+    Insert (row_number, user) pairs one per transaction; rows that hit a
+    unique constraint are reported as errors. Returns the number created.
+    """
+    created = 0
+    for row_number, user in users:
+        try:
+            with write_transaction():
+                User.objects.bulk_create([user])
+            created += 1
+        except IntegrityError:
+            data = {field: getattr(user, field) for field in UNIQUE_FIELDS}
+            existing = _existing_values([(row_number, data)])
+            report.add_error(row_number, {
+                field: [f'Ya existe un usuario con este {field}.']
+                for field in UNIQUE_FIELDS if data[field] in existing[field]
+            } or {'non_field_errors': ['No se pudo crear el usuario.']})
+    return created
+
+
+def provision_users(records, department=None, batch_size=DEFAULT_BATCH_SIZE, workers=None,
+                    dry_run=False, progress=None):
+    """
+    Validate and create users in batches.
+
+    With `department`, every row must belong to that department (it is used
+    when the row leaves it empty) and superAdmin rows are rejected; this is
+    the scope of a department admin. `workers` is the size of the hashing
+    process pool (default: one per CPU, 1 hashes in this process).
+    `progress(report)` is called after every batch. Row numbers are 1-based
+    and count the header as row 1.
+    """
+    validator = UserProvisionSerializer()
+    report = ProvisionReport()
+    seen = {field: set() for field in UNIQUE_FIELDS}
+    batch = []
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and not dry_run else None
+
+    def flush():
+        if batch:
+            _write_batch(batch, report, seen, executor, dry_run)
+            batch.clear()
+        if progress:
+            progress(report)
+
+    try:
+        for row_number, record in enumerate(records, start=2):
+            report.processed += 1
+            if department is not None:
+                record.setdefault('department', department)
+                if record['department'] != department or record.get('status') == 'superAdmin':
+                    report.add_error(row_number, {'department': ['Fuera del alcance de su departamento.']})
+                    continue
+            try:
+                batch.append((row_number, validator.run_validation(record)))
+            except serializers.ValidationError as e:
+                report.add_error(row_number, e.detail)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return report
@@ -193,6 +193,20 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Este nombre de usuario ya está en uso.")
         return value
 
+# Columnas del directorio de usuarios: las únicas que carga la consulta (only())
+USER_DIRECTORY_FIELDS = ['id', 'username', 'cedula', 'first_name', 'last_name', 'email', 'phone', 'status', 'department']
+
+class UserDirectorySerializer(serializers.ModelSerializer):
+    """
+    Serializador de solo lectura para el directorio de usuarios.
+    """
+    department_display = serializers.CharField(source='get_department_display', read_only=True)
+
+    class Meta:
+        model = User
+        fields = USER_DIRECTORY_FIELDS + ['department_display']
+        read_only_fields = fields
+
 class LoginSerializer(serializers.Serializer):
     """
     Serializador para inicio de sesión de usuario. Requiere cédula y contraseña.
@@ -205,16 +219,18 @@ class LoginSerializer(serializers.Serializer):
         password = data.get('password')
 
         if cedula and password:
-            # Intentar obtener el usuario por cédula
+            # Intentar obtener el usuario por cédula (campo único, con índice)
             try:
                 user = User.objects.get(cedula=cedula)
-                # Verificar la contraseña
-                if user.check_password(password):
-                    data['user'] = user
-                else:
-                    raise serializers.ValidationError("Credenciales inválidas. Por favor, intente de nuevo.")
             except User.DoesNotExist:
+                # Calcular un hash de todas formas para que una cédula inexistente
+                # tarde lo mismo que una contraseña incorrecta
+                User().set_password(password)
+                raise serializers.ValidationError("Credenciales inválidas. Por favor, intente de nuevo.")
+            # Verificar la contraseña; si el hash usa otro hasher o costo se actualiza aquí
+            if not user.check_password(password):
                 raise serializers.ValidationError("Credenciales inválidas. Por favor, intente de nuevo.")
+            data['user'] = user
         else:
             raise serializers.ValidationError("La cédula y la contraseña son requeridos.")
             
@@ -1,3 +1,410 @@
-from django.test import TestCase
+import datetime
+import io
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import token_users, user_snapshots
+from core.lru import LRUCache
+from core.query_plans import capture_queries, full_table_scans
+from core.session_backend import SessionStore, shared_cache
+from . import provisioning, tokens
+from .models import TokenActivity, User
+from .provisioning import provision_users
+from .throttling import LoginCedulaThrottle
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN checks are SQLite specific')
+class UserQueryPlanTests(TestCase):
+    """
+    El alcance por rol/departamento de UserUpdateView debe resolverse con índices.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(username=f'usuario{i}', email=f'usuario{i}@example.com', cedula=f'{20000000 + i}',
+                 department=department)
+            for i, department in enumerate(['oac', 'farmacia', 'almacen'] * 5)
+        ])
+
+    def assertNoFullScans(self, queryset):
+        with capture_queries() as queries:
+            list(queryset)
+        self.assertEqual(full_table_scans(queries), [])
+
+    def test_role_scopes(self):
+        self.assertNoFullScans(User.objects.filter(department='oac'))
+        self.assertNoFullScans(User.objects.filter(department='oac', status='basic'))
+
+    def test_login_lookup(self):
+        self.assertNoFullScans(User.objects.filter(cedula='20000001'))
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginTests(TestCase):
+    """
+    Inicio de sesión por cédula: límites de intentos y recálculo del hash.
+    """
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='login', email='login@example.com', cedula='12345678',
+            password='clave-segura-123', department='oac',
+        )
+
+    def login(self, cedula='12345678', password='clave-segura-123'):
+        return self.client.post('/api/login/', {'cedula': cedula, 'password': password}, format='json')
+
+    def test_login(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login(password='incorrecta').status_code, 400)
+        self.assertEqual(self.login(cedula='87654321').status_code, 400)
+
+    @mock.patch.object(LoginCedulaThrottle, 'rate', '3/min', create=True)
+    def test_cedula_throttle(self):
+        for _ in range(3):
+            self.assertEqual(self.login(cedula='12.345.678', password='incorrecta').status_code, 400)
+        # El límite es por cédula: el formato no importa y la contraseña correcta tampoco pasa
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.login(cedula='87654321').status_code, 400)
+
+    def test_rehash_on_login(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_session_deleted_elsewhere_is_not_served_from_locmem(self):
+        # Con la caché locmem por proceso, un logout en otro worker (borrar la fila) debe verse de inmediato
+        self.assertFalse(shared_cache('default'))
+        store = SessionStore()
+        store['user'] = self.user.pk
+        store.save()
+        self.assertEqual(SessionStore(store.session_key).load(), {'user': self.user.pk})
+        Session.objects.filter(session_key=store.session_key).delete()
+        self.assertEqual(SessionStore(store.session_key).load(), {})
+
+
+class UserDirectoryTests(TestCase):
+    """
+    El directorio aplica el alcance por rol en una sola consulta.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(username=f'{status}_{department}', email=f'{status}_{department}@example.com',
+                 cedula=f'{30000000 + i}', status=status, department=department)
+            for i, (status, department) in enumerate([
+                ('admin', 'oac'), ('coordinador', 'oac'), ('basic', 'oac'), ('basic', 'farmacia'),
+            ])
+        ])
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+
+    def directory(self, username, query=''):
+        self.client.force_authenticate(User.objects.get(username=username))
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/users/directory/{query}')
+        self.assertEqual(response.status_code, 200)
+        return [user['username'] for user in response.data['results']]
+
+    def test_role_scopes(self):
+        self.assertEqual(self.directory('admin_oac'), ['admin_oac', 'basic_oac', 'coordinador_oac'])
+        self.assertEqual(self.directory('coordinador_oac'), ['basic_oac'])
+        self.assertEqual(self.directory('basic_farmacia'), ['basic_farmacia'])
+
+    def test_search(self):
+        self.assertEqual(self.directory('admin_oac', '?search=BASIC'), ['basic_oac'])
+        self.assertEqual(self.directory('admin_oac', '?search=30000001'), ['coordinador_oac'])
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class ProvisionUsersTests(TestCase):
+    """
+    Alta masiva: unicidad por lote y alcance por departamento.
+    """
+    def record(self, i, **fields):
+        return {
+            'username': f'nuevo{i}', 'email': f'nuevo{i}@example.com', 'cedula': f'{40000000 + i}',
+            'password': 'clave-segura-123', 'department': 'oac', **fields,
+        }
+
+    def test_batches(self):
+        User.objects.create_user(username='nuevo0', email='otro@example.com', cedula='49999999', department='oac')
+        records = [self.record(i) for i in range(5)] + [self.record(9, username='nuevo4')]
+        # Una consulta de unicidad por lote, más la escritura de cada lote
+        with self.assertNumQueries(2 + 2 * 3):
+            report = provision_users(records, batch_size=3, workers=1)
+        self.assertEqual((report.created, report.error_count), (4, 2))
+        self.assertEqual(sorted(error['row'] for error in report.errors), [2, 7])
+        self.assertTrue(User.objects.get(username='nuevo3').check_password('clave-segura-123'))
+
+    def test_concurrent_insert_is_reported(self):
+        # Un usuario creado por otro proceso entre la verificación del lote y el bulk_create
+        check = provisioning._existing_values
+        calls = []
+
+        def stale_check(rows):
+            calls.append(rows)
+            return {field: set() for field in provisioning.UNIQUE_FIELDS} if len(calls) == 1 else check(rows)
+
+        User.objects.create_user(username='otro', email='nuevo2@example.com', cedula='49999999', department='oac')
+        records = [self.record(i) for i in range(1, 4)]
+        with mock.patch.object(provisioning, '_existing_values', side_effect=stale_check):
+            report = provision_users(records, workers=1)
+        self.assertEqual((report.created, report.error_count), (2, 1))
+        self.assertEqual(report.errors, [{'row': 3, 'errors': {'email': ['Ya existe un usuario con este email.']}}])
+        self.assertEqual(sorted(User.objects.filter(username__startswith='nuevo').values_list('username', flat=True)),
+                         ['nuevo1', 'nuevo3'])
+
+    def test_process_pool(self):
+        records = [self.record(i) for i in range(4)]
+        report = provision_users(records, batch_size=2, workers=2)
+        self.assertEqual((report.created, report.error_count), (4, 0))
+        self.assertTrue(all(
+            user.check_password('clave-segura-123') for user in User.objects.filter(username__startswith='nuevo')
+        ))
+
+    def test_view_hashes_in_request_process(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', cedula='39999999',
+                                         department='oac', status='superAdmin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        csv_file = io.BytesIO(
+            b'username,email,cedula,password,department\nnuevo1,nuevo1@example.com,40000001,clave-segura-123,oac\n'
+        )
+        csv_file.name = 'usuarios.csv'
+        with mock.patch('accounts.provisioning.os.cpu_count', return_value=4), \
+                mock.patch('accounts.provisioning.ProcessPoolExecutor') as pool:
+            response = client.post('/api/users/provision/', {'archivo': csv_file}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], 1)
+        pool.assert_not_called()
+
+    def test_department_scope(self):
+        records = [self.record(1), self.record(2, department='farmacia'),
+                   self.record(3, status='superAdmin')]
+        records[0].pop('department')
+        report = provision_users(records, department='oac', workers=1)
+        self.assertEqual(report.created, 1)
+        self.assertEqual(User.objects.get(username='nuevo1').department, 'oac')
+
+
+class TokenActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='token', email='token@example.com', cedula='12345679',
+                                             department='oac')
+        self.token = Token.objects.create(user=self.user)
+        tokens.forget(self.token.key)
+
+    def test_memory_is_bounded(self):
+        with mock.patch.object(tokens, '_activity', LRUCache(2, 60)):
+            for key in ('a', 'b', 'c'):
+                tokens.remember_last_used(key, self.token.created)
+            self.assertIsNone(tokens._activity.get('a'))
+            self.assertIsNotNone(tokens._activity.get('c'))
+
+    def test_loaded_activity_skips_query(self):
+        idle = self.token.created + datetime.timedelta(seconds=settings.AUTH_TOKEN_IDLE_TIMEOUT + 1)
+        with self.assertNumQueries(0):
+            self.assertTrue(tokens.is_expired(self.token.key, self.token.created, idle, stored=None))
+            self.assertFalse(tokens.is_expired(self.token.key, self.token.created, idle, stored=idle))
+        # Sin el valor cargado, el veredicto de inactividad se confirma en TokenActivity
+        tokens.forget(self.token.key)
+        with self.assertNumQueries(1):
+            self.assertTrue(tokens.is_expired(self.token.key, self.token.created, idle))
+
+
+def clear_auth_caches():
+    # Cachés por proceso de core.authentication y accounts.tokens: cada prueba empieza sin estado
+    user_snapshots.clear()
+    token_users.clear()
+    tokens._activity.clear()
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class TokenLifecycleTests(TestCase):
+    """
+    Expiración absoluta e inactividad, rotación al iniciar sesión, purga y revocación.
+    """
+    def setUp(self):
+        clear_auth_caches()
+        caches['ratelimit'].clear()
+        self.client = APIClient()
+        self.user = self.create_user('vida', '12345680')
+
+    def create_user(self, username, cedula, **fields):
+        return User.objects.create_user(username=username, email=f'{username}@example.com', cedula=cedula,
+                                        password='clave-segura-123', department=fields.pop('department', 'oac'),
+                                        **fields)
+
+    def login(self):
+        response = self.client.post('/api/login/', {'cedula': '12345680', 'password': 'clave-segura-123'},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data['token']
+
+    def get_me(self, key):
+        return APIClient().get('/api/users/', HTTP_AUTHORIZATION=f'Token {key}')
+
+    def age(self, key, seconds, last_used=None):
+        # Envejecer el token en la base de datos y olvidar lo que este proceso sabe de él
+        now = datetime.datetime.now(datetime.timezone.utc)
+        Token.objects.filter(key=key).update(created=now - datetime.timedelta(seconds=seconds))
+        if last_used is not None:
+            TokenActivity.objects.update_or_create(
+                token_id=key, defaults={'last_used': now - datetime.timedelta(seconds=last_used)}
+            )
+        clear_auth_caches()
+
+    def test_absolute_expiry(self):
+        key = self.login()
+        self.assertEqual(self.get_me(key).status_code, 200)
+        self.age(key, settings.AUTH_TOKEN_TTL + 1, last_used=0)
+        response = self.get_me(key)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+
+    def test_idle_expiry(self):
+        key = self.login()
+        # Usado hace poco desde otro proceso: TokenActivity lo mantiene vigente
+        self.age(key, settings.AUTH_TOKEN_IDLE_TIMEOUT + 10, last_used=5)
+        self.assertEqual(self.get_me(key).status_code, 200)
+        self.age(key, settings.AUTH_TOKEN_IDLE_TIMEOUT + 10, last_used=settings.AUTH_TOKEN_IDLE_TIMEOUT + 1)
+        self.assertEqual(self.get_me(key).status_code, 401)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+
+    def test_login_reuses_then_rotates(self):
+        key = self.login()
+        self.assertEqual(self.login(), key)
+        self.age(key, settings.AUTH_TOKEN_ROTATE_AFTER + 1, last_used=0)
+        new_key = self.login()
+        self.assertNotEqual(new_key, key)
+        self.assertEqual(self.get_me(key).status_code, 401)
+        self.assertEqual(self.get_me(new_key).status_code, 200)
+
+    def test_purge_tokens(self):
+        keys = {
+            name: Token.objects.create(user=self.create_user(name, cedula)).key
+            for name, cedula in (('nuevo', '20000001'), ('viejo', '20000002'),
+                                 ('inactivo', '20000003'), ('sin_uso', '20000004'))
+        }
+        idle = settings.AUTH_TOKEN_IDLE_TIMEOUT
+        self.age(keys['viejo'], settings.AUTH_TOKEN_TTL + 1, last_used=0)
+        self.age(keys['inactivo'], idle + 10, last_used=idle + 1)
+        self.age(keys['sin_uso'], idle + 1)
+        out = io.StringIO()
+        call_command('purge_tokens', batch_size=1, stdout=out)
+        self.assertIn('Tokens eliminados: 3', out.getvalue())
+        self.assertEqual(list(Token.objects.values_list('key', flat=True)), [keys['nuevo']])
+
+    def test_revoke_tokens_command(self):
+        oac = Token.objects.create(user=self.user).key
+        farmacia = Token.objects.create(user=self.create_user('farma', '20000005', department='farmacia')).key
+        self.assertEqual(self.get_me(farmacia).status_code, 200)
+        out = io.StringIO()
+        call_command('revoke_tokens', department='farmacia', stdout=out)
+        self.assertIn('Tokens revocados: 1', out.getvalue())
+        self.assertEqual(self.get_me(farmacia).status_code, 401)
+        self.assertEqual(self.get_me(oac).status_code, 200)
+        self.assertEqual(tokens.revoke_tokens(user_ids=[self.user.pk]), 1)
+        self.assertEqual(self.get_me(oac).status_code, 401)
+
+    def test_revoke_tokens_view(self):
+        admin = self.create_user('admin', '20000006', status='admin')
+        basic = self.create_user('basico', '20000007')
+        farmacia = self.create_user('farma', '20000008', department='farmacia')
+        keys = {user.username: Token.objects.create(user=user).key for user in (self.user, basic, farmacia)}
+        client = APIClient()
+
+        client.force_authenticate(basic)
+        self.assertEqual(client.post('/api/tokens/revoke/', {'department': 'oac'}, format='json').status_code, 403)
+
+        client.force_authenticate(admin)
+        self.assertEqual(client.post('/api/tokens/revoke/', {}, format='json').status_code, 400)
+        self.assertEqual(client.post('/api/tokens/revoke/', {'user_ids': 'todos'}, format='json').status_code, 400)
+        response = client.post('/api/tokens/revoke/', {'department': 'farmacia'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        # Un admin solo alcanza a los usuarios de su departamento aunque indique otros ids
+        response = client.post('/api/tokens/revoke/', {'user_ids': [basic.pk, farmacia.pk]}, format='json')
+        self.assertEqual(response.data, {'revoked': 1})
+        self.assertEqual(self.get_me(keys['basico']).status_code, 401)
+        self.assertEqual(self.get_me(keys['farma']).status_code, 200)
+
+        client.force_authenticate(self.create_user('super', '20000009', status='superAdmin'))
+        response = client.post('/api/tokens/revoke/', {'department': 'farmacia'}, format='json')
+        self.assertEqual(response.data, {'revoked': 1})
+        self.assertEqual(self.get_me(keys['farma']).status_code, 401)
+        self.assertEqual(self.get_me(keys['vida']).status_code, 200)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class AuthCacheInvalidationTests(TestCase):
+    """
+    Las cachés por proceso de core.authentication no deben servir un usuario o token que ya cambió.
+    """
+    def setUp(self):
+        clear_auth_caches()
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='cache', email='cache@example.com', cedula='12345681',
+                                             password='clave-segura-123', department='oac')
+        self.key = Token.objects.create(user=self.user).key
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    def assertCachedRequest(self, client):
+        # Con la caché llena, la autenticación no consulta las tablas de tokens ni de usuarios
+        with capture_queries() as queries:
+            self.assertEqual(client.get('/api/users/').status_code, 200)
+        tables = ' '.join(sql for sql, _ in queries)
+        self.assertNotIn('"authtoken_token"', tables)
+        self.assertNotIn('FROM "accounts_user"', tables)
+
+    def test_token_request_is_cached(self):
+        self.assertEqual(self.client.get('/api/users/').status_code, 200)
+        self.assertCachedRequest(self.client)
+
+    def test_logout(self):
+        self.assertEqual(self.client.get('/api/users/').status_code, 200)
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/users/').status_code, 401)
+
+    def test_token_deleted(self):
+        self.assertEqual(self.client.get('/api/users/').status_code, 200)
+        Token.objects.filter(key=self.key).delete()
+        self.assertEqual(self.client.get('/api/users/').status_code, 401)
+
+    def test_user_deactivated(self):
+        self.assertEqual(self.client.get('/api/users/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/users/').status_code, 401)
+
+    def test_user_change_is_seen(self):
+        self.assertEqual(self.client.get('/api/users/').data['department'], 'oac')
+        # captureOnCommitCallbacks: la caché de respuestas se invalida al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.department = 'farmacia'
+            self.user.save()
+        self.assertEqual(self.client.get('/api/users/').data['department'], 'farmacia')
+
+    def test_session_user_deactivated(self):
+        client = APIClient()
+        client.force_login(self.user)
+        self.assertEqual(client.get('/api/users/').status_code, 200)
+        self.assertCachedRequest(client)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(client.get('/api/users/').status_code, 401)
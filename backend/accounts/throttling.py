@@ -0,0 +1,39 @@
+"""
+Límites de intentos de inicio de sesión por IP y por cédula.
+
+Los contadores viven en la caché 'ratelimit' (settings.CACHES), en memoria
+del proceso por defecto: con varios workers cada uno cuenta por separado,
+configure RATELIMIT_CACHE_BACKEND='redis' para un límite global. Las
+peticiones limitadas se rechazan con 429 antes de calcular ningún hash.
+"""
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    cache = caches['ratelimit']
+
+
+class LoginIPThrottle(LoginRateThrottle):
+    """
+    Intentos por dirección IP (varias oficinas pueden compartir una IP pública)
+    """
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginCedulaThrottle(LoginRateThrottle):
+    """
+    Intentos por cédula, sin importar desde qué IP llegan
+    """
+    scope = 'login_cedula'
+
+    def get_cache_key(self, request, view):
+        cedula = str(request.data.get('cedula') or '')
+        # '12.345.678' y '12345678' cuentan como la misma cédula
+        ident = ''.join(filter(str.isdigit, cedula)) or cedula.strip()
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -0,0 +1,189 @@
+"""
+Ciclo de vida de los tokens de autenticación: expiración, rotación,
+registro diferido del último uso, purga y revocación masiva.
+
+- Un token expira AUTH_TOKEN_TTL después de creado, o si no se usa durante
+  AUTH_TOKEN_IDLE_TIMEOUT.
+- Al iniciar sesión se reutiliza el token vigente; si tiene más de
+  AUTH_TOKEN_ROTATE_AFTER se reemplaza por uno nuevo.
+- El último uso se guarda en memoria en cada petición y se escribe en
+  TokenActivity como máximo una vez cada AUTH_TOKEN_TOUCH_INTERVAL por token
+  y proceso, para evitar una escritura por petición en SQLite. La memoria es
+  una LRU acotada (AUTH_CACHE_MAX_SIZE) cuyas entradas vencen tras
+  AUTH_TOKEN_IDLE_TIMEOUT sin uso, así los tokens rotados o revocados en otro
+  proceso no se acumulan.
+"""
+import datetime
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.lru import LRUCache
+from .models import TokenActivity
+
+# Tokens expirados que se eliminan por consulta en purge_expired_tokens()
+PURGE_BATCH_SIZE = 500
+
+# key -> (último uso visto por este proceso, último valor escrito en TokenActivity por este proceso)
+_activity = LRUCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_TOKEN_IDLE_TIMEOUT)
+# Las lecturas y escrituras de una misma entrada de _activity van juntas
+_lock = threading.Lock()
+
+# is_expired() sin el último uso ya cargado por quien llama
+UNKNOWN_ACTIVITY = object()
+
+
+def token_ttl():
+    return datetime.timedelta(seconds=settings.AUTH_TOKEN_TTL)
+
+
+def token_idle_timeout():
+    return datetime.timedelta(seconds=settings.AUTH_TOKEN_IDLE_TIMEOUT)
+
+
+def token_expires_at(token):
+    return token.created + token_ttl()
+
+
+def issue_token(user):
+    """
+    Token para un inicio de sesión: reutiliza el vigente o lo rota si es viejo o expiró
+    """
+    now = timezone.now()
+    token = Token.objects.filter(user=user).select_related('activity').first()
+    if token is not None:
+        rotate_after = datetime.timedelta(seconds=settings.AUTH_TOKEN_ROTATE_AFTER)
+        activity = getattr(token, 'activity', None)
+        stored = activity.last_used if activity is not None else None
+        if now - token.created < rotate_after and not is_expired(token.key, token.created, now, stored=stored):
+            return token
+        token.delete()
+    try:
+        token = Token.objects.create(user=user)
+    except IntegrityError:
+        # Otro inicio de sesión simultáneo del mismo usuario ya creó el token
+        token = Token.objects.get(user=user)
+    remember_last_used(token.key, now)
+    return token
+
+
+def remember_last_used(key, last_used):
+    """
+    Seed the in-memory last use of a token (e.g. with the value loaded from TokenActivity)
+    """
+    with _lock:
+        entry = _activity.get(key)
+        if entry is None:
+            _activity.set(key, (last_used, last_used))
+        elif entry[0] < last_used:
+            _activity.set(key, (last_used, entry[1]))
+
+
+def record_use(key, now=None):
+    """
+    Register a request made with the token. Writes to the database at most once
+    per AUTH_TOKEN_TOUCH_INTERVAL for each token.
+    """
+    now = now or timezone.now()
+    interval = datetime.timedelta(seconds=settings.AUTH_TOKEN_TOUCH_INTERVAL)
+    with _lock:
+        entry = _activity.get(key)
+        last_written = entry[1] if entry is not None else None
+        if last_written is not None and now - last_written < interval:
+            _activity.set(key, (now, last_written))
+            return
+        _activity.set(key, (now, now))
+
+    if not TokenActivity.objects.filter(token_id=key).update(last_used=now):
+        try:
+            TokenActivity.objects.create(token_id=key, last_used=now)
+        except IntegrityError:
+            # El token fue eliminado o la fila se creó en paralelo
+            pass
+
+
+def forget(key):
+    _activity.delete(key)
+
+
+def is_expired(key, created, now=None, stored=UNKNOWN_ACTIVITY):
+    """
+    True if the token is older than the TTL or has been idle too long.
+    An idle verdict based on this process' memory is confirmed against
+    TokenActivity, since another worker may have served the token.
+    `stored` is TokenActivity.last_used when the caller already loaded it
+    (None if the token has no activity row); then no query is made.
+    """
+    now = now or timezone.now()
+    if now - created >= token_ttl():
+        return True
+    entry = _activity.get(key)
+    last_used = entry[0] if entry is not None else created
+    if now - last_used < token_idle_timeout():
+        return False
+    if stored is UNKNOWN_ACTIVITY:
+        stored = TokenActivity.objects.filter(token_id=key).values_list('last_used', flat=True).first()
+    if stored is not None:
+        remember_last_used(key, stored)
+        return now - stored >= token_idle_timeout()
+    return True
+
+
+def expire(key):
+    Token.objects.filter(key=key).delete()
+    forget(key)
+
+
+def purge_expired_tokens(now=None, batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete expired and idle tokens in batches. Returns the number of tokens deleted.
+    """
+    now = now or timezone.now()
+    created_before = now - token_ttl()
+    idle_before = now - token_idle_timeout()
+
+    querysets = [
+        # Demasiado viejos
+        Token.objects.filter(created__lt=created_before),
+        # Inactivos según TokenActivity
+        Token.objects.filter(activity__last_used__lt=idle_before),
+        # Nunca usados desde que se crearon
+        Token.objects.filter(activity__isnull=True, created__lt=idle_before),
+    ]
+    deleted = 0
+    for queryset in querysets:
+        while True:
+            keys = list(queryset.values_list('key', flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted += revoke(Token.objects.filter(key__in=keys))
+    return deleted
+
+
+def revoke(queryset):
+    """
+    Delete the tokens in `queryset` and drop them from the in-memory state
+    """
+    keys = list(queryset.values_list('key', flat=True))
+    if not keys:
+        return 0
+    # Las señales post_delete invalidan la caché de autenticación (accounts.signals)
+    Token.objects.filter(key__in=keys).delete()
+    for key in keys:
+        forget(key)
+    return len(keys)
+
+
+def revoke_tokens(user_ids=None, department=None):
+    """
+    Bulk revocation for a list of users and/or a whole department
+    """
+    queryset = Token.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    if department is not None:
+        queryset = queryset.filter(user__department=department)
+    return revoke(queryset)
@@ -1,14 +1,17 @@
 from django.urls import path
-from .views import RegisterView, LoginView, LogoutView, UserUpdateView
+from .views import RegisterView, LoginView, LogoutView, ProvisionUsersView, RevokeTokensView, UserDirectoryView, UserUpdateView
 
 urlpatterns = [
     # Auth endpoints
     path('api/register/', RegisterView.as_view(), name='register'),
     path('api/login/', LoginView.as_view(), name='login'),
     path('api/logout/', LogoutView.as_view(), name='logout'),
+    path('api/tokens/revoke/', RevokeTokensView.as_view(), name='revoke-tokens'),
     
     # User management endpoints
     path('api/users/', UserUpdateView.as_view(), name='user-detail'),  # Get current user data
+    path('api/users/directory/', UserDirectoryView.as_view(), name='user-directory'),  # List users in scope
+    path('api/users/provision/', ProvisionUsersView.as_view(), name='user-provision'),  # Bulk CSV import
     path('api/users/<int:pk>/', UserUpdateView.as_view(), name='user-update'),  # Update specific user
 ]
 
@@ -1,10 +1,18 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
+from core.cache import cached_response
+from .filters import filter_users, scope_users
 from .models import User
-from .serializers import UserSerializer, LoginSerializer, AdminUserUpdateSerializer, UserUpdateSerializer
+from .pagination import UserCursorPagination
+from .provisioning import iter_csv_records, provision_users
+from .serializers import (
+    UserSerializer, LoginSerializer, AdminUserUpdateSerializer, UserUpdateSerializer,
+    UserDirectorySerializer, USER_DIRECTORY_FIELDS,
+)
+from .throttling import LoginCedulaThrottle, LoginIPThrottle
+from .tokens import issue_token, revoke_tokens, token_expires_at
 
 class IsOwnerOrAdmin(permissions.BasePermission):
     """
@@ -59,13 +67,14 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Crear token para el nuevo usuario
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         
         user_data = UserSerializer(user, context=self.get_serializer_context()).data
         
         return Response({
             'user': user_data,
             'token': token.key,
+            'token_expires_at': token_expires_at(token),
             'department': user.department,
             'department_display': user.get_department_display()
         }, status=status.HTTP_201_CREATED)
@@ -76,6 +85,7 @@ class LoginView(APIView):
     """
     permission_classes = [permissions.AllowAny]
     serializer_class = LoginSerializer
+    throttle_classes = [LoginIPThrottle, LoginCedulaThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data, context={'request': request})
@@ -84,13 +94,14 @@ class LoginView(APIView):
         user = serializer.validated_data['user']
         login(request, user)
         
-        # Obtener o crear token
-        token, created = Token.objects.get_or_create(user=user)
+        # Reutilizar el token vigente o emitir uno nuevo si expiró o debe rotarse
+        token = issue_token(user)
         
         return Response({
             'user_id': user.id,
             'username': user.username,
             'token': token.key,
+            'token_expires_at': token_expires_at(token),
             'status': user.status,
             'department': user.department,
             'department_display': user.get_department_display()
@@ -108,6 +119,80 @@ class LogoutView(APIView):
         logout(request)
         return Response({"message": "Sesión cerrada exitosamente."}, status=status.HTTP_200_OK)
 
+class RevokeTokensView(APIView):
+    """
+    Endpoint de la API para revocar en bloque los tokens de varios usuarios o de un departamento.
+
+    - superAdmin puede revocar tokens de cualquier usuario o departamento
+    - admin solo puede revocar tokens de usuarios de su mismo departamento
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.status not in ('superAdmin', 'admin'):
+            return Response(
+                {"error": "No tiene permiso para revocar tokens."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        user_ids = request.data.get('user_ids')
+        department = request.data.get('department')
+        if user_ids is None and not department:
+            return Response(
+                {"error": "Debe indicar 'user_ids' o 'department'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if user_ids is not None:
+            if not isinstance(user_ids, list) or not all(isinstance(user_id, int) for user_id in user_ids):
+                return Response(
+                    {"error": "'user_ids' debe ser una lista de ids."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if request.user.status == 'admin':
+            if department and department != request.user.department:
+                return Response(
+                    {"error": "Solo puede revocar tokens de su departamento."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            department = request.user.department
+
+        revoked = revoke_tokens(user_ids=user_ids, department=department or None)
+        return Response({"revoked": revoked}, status=status.HTTP_200_OK)
+
+class ProvisionUsersView(APIView):
+    """
+    Endpoint de la API para crear usuarios en bloque desde un CSV (campo multipart 'archivo').
+    ?dry_run=1 solo valida el archivo.
+
+    Los hashes se calculan en el proceso de la petición: crear un pool de
+    procesos haría fork del worker web. Para archivos grandes use
+    `manage.py provision_users --workers N`.
+
+    - superAdmin puede crear usuarios de cualquier departamento
+    - admin solo puede crear usuarios de su departamento (y nunca superAdmin)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.status not in ('superAdmin', 'admin'):
+            return Response(
+                {"error": "No tiene permiso para crear usuarios."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        upload = request.FILES.get('archivo')
+        if upload is None:
+            return Response({"error": "Debe adjuntar el archivo CSV en 'archivo'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        department = request.user.department if request.user.status == 'admin' else None
+        dry_run = request.query_params.get('dry_run') in ('1', 'true', 'True')
+        try:
+            report = provision_users(iter_csv_records(upload.file), department=department, dry_run=dry_run, workers=1)
+        except UnicodeDecodeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
 class UserUpdateView(generics.RetrieveUpdateAPIView):
     """
     Endpoint de la API para obtener y actualizar información de usuarios.
@@ -129,18 +214,7 @@ class UserUpdateView(generics.RetrieveUpdateAPIView):
         - coordinador ve usuarios básicos de su departamento (OAC)
         - usuarios básicos solo se ven a sí mismos
         """
-        user = self.request.user
-        if user.status == 'superAdmin':
-            return User.objects.all()
-        elif user.status == 'admin':
-            # Admin solo ve usuarios de su departamento
-            return User.objects.filter(department=user.department)
-        elif user.status == 'coordinador':
-            # Coordinador solo ve usuarios básicos de su departamento (OAC)
-            return User.objects.filter(department=user.department, status='basic')
-        else:
-            # Usuario básico solo se ve a sí mismo
-            return User.objects.filter(id=user.id)
+        return scope_users(self.request.user)
     
     def get_serializer_class(self):
         # Diferentes serializadores basados en el método de la solicitud y el rol del usuario
@@ -166,9 +240,48 @@ class UserUpdateView(generics.RetrieveUpdateAPIView):
         # Para operaciones GET
         return UserSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        # Perfil en caché por usuario solicitante; se invalida cuando cambia cualquier User
+        return cached_response(
+            request, ['users'], lambda: super(UserUpdateView, self).retrieve(request, *args, **kwargs),
+            per_user=True
+        )
+    
     def get_object(self):
+        # update() y get_serializer_class() necesitan el mismo usuario: consultarlo una sola vez
+        if not hasattr(self, '_object'):
+            self._object = self._get_object()
+        return self._object
+
+    def _get_object(self):
         # Si no hay pk en la URL, devolver el usuario actual
         pk = self.kwargs.get('pk')
         if pk is None:
+            if self.request.method in ['PUT', 'PATCH']:
+                # request.user puede venir de la caché de autenticación: actualizar sobre la fila actual
+                return User.objects.get(pk=self.request.user.pk)
             return self.request.user
         return super().get_object()
+
+class UserDirectoryView(generics.ListAPIView):
+    """
+    Endpoint de la API para listar usuarios, con el mismo alcance por rol que UserUpdateView.
+
+    - Paginado por cursor (?cursor=, ?page_size=), ordenado por username
+    - Filtros exactos: ?status=, ?department=
+    - Búsqueda: ?search= en username, cédula, nombres y apellidos
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = UserDirectorySerializer
+    pagination_class = UserCursorPagination
+
+    def get_queryset(self):
+        queryset = User.objects.only(*USER_DIRECTORY_FIELDS)
+        return filter_users(scope_users(self.request.user, queryset), self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        # El resultado depende del rol del solicitante: caché por usuario
+        return cached_response(
+            request, ['users'], lambda: super(UserDirectoryView, self).list(request, *args, **kwargs),
+            per_user=True
+        )
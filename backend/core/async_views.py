@@ -0,0 +1,57 @@
+"""
+Camino asíncrono (ASGI) para los endpoints de lectura.
+
+Bajo ASGI Django ejecuta las vistas síncronas de DRF de a una en un único
+hilo (sync_to_async con thread_sensitive=True), así que una escritura lenta
+en SQLite o una subida de archivo retrasa todas las lecturas. Con
+ASYNC_READ_VIEWS=True los GET de los listados y estadísticas se atienden con
+vistas asíncronas de Django y el ORM asíncrono; el resto de métodos sigue
+usando la vista DRF original, ejecutada en un hilo.
+
+Con WSGI (runserver, gunicorn) deje ASYNC_READ_VIEWS en False: cada vista
+asíncrona necesitaría su propio event loop por petición.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.request import Request
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=DjangoJSONEncoder)
+
+
+def read_view(sync_view, async_view):
+    """
+    View for a URL pattern: `sync_view` unless ASYNC_READ_VIEWS is enabled, in
+    which case GET/HEAD go to `async_view` and other methods to `sync_view`.
+    """
+    if not settings.ASYNC_READ_VIEWS:
+        return sync_view
+
+    run_sync = sync_to_async(sync_view)
+
+    # Igual que las vistas de @api_view: la autenticación de DRF se encarga del CSRF
+    @csrf_exempt
+    @wraps(async_view)
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await run_sync(request, *args, **kwargs)
+
+    return view
+
+
+async def paginate(paginator, queryset, request, serializer_class, context=None):
+    """
+    Data of a DRF paginated response. DRF paginators are synchronous, so the
+    page query runs through sync_to_async like the rest of the async ORM.
+    """
+    drf_request = Request(request)
+    page = await sync_to_async(paginator.paginate_queryset)(queryset, drf_request)
+    serializer = serializer_class(page, many=True, context=context or {'request': drf_request})
+    return paginator.get_paginated_response(serializer.data).data
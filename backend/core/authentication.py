@@ -1,4 +1,13 @@
-from rest_framework.authentication import SessionAuthentication
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from accounts import tokens
+from core.lru import LRUCache
 
 class CSRFExemptSessionAuthentication(SessionAuthentication):
     """
@@ -10,3 +19,109 @@ class CSRFExemptSessionAuthentication(SessionAuthentication):
         # No aplicar verificación CSRF para APIs
         return None
 
+
+# Instantáneas de usuarios por id y relación token -> (id de usuario, fecha de creación del token).
+# Son por proceso: los cambios hechos en otro worker se ven al expirar el TTL.
+user_snapshots = LRUCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL)
+token_users = LRUCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL)
+
+
+def snapshot_user(user):
+    """
+    Copy of the concrete field values of a user (id, status, department, password hash, ...)
+    """
+    return {field.attname: getattr(user, field.attname) for field in user._meta.concrete_fields}
+
+
+def user_from_snapshot(values):
+    """
+    Rebuild a User instance from a snapshot without touching the database
+    """
+    user = get_user_model()(**values)
+    user._state.adding = False
+    user._state.db = 'default'
+    return user
+
+
+def get_cached_user(user_id):
+    """
+    User by id from the snapshot cache, falling back to one query
+    """
+    values = user_snapshots.get(user_id)
+    if values is None:
+        User = get_user_model()
+        try:
+            user = User._default_manager.get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        user_snapshots.set(user_id, snapshot_user(user))
+        return user
+    return user_from_snapshot(values)
+
+
+def forget_user(user_id):
+    """
+    Drop the cached snapshot and tokens of a user (called when the user changes)
+    """
+    user_snapshots.delete(user_id)
+    token_users.delete_where(lambda entry: entry[0] == user_id)
+
+
+def forget_token(key):
+    token_users.delete(key)
+    tokens.forget(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que resuelve token -> usuario desde una caché LRU/TTL en memoria.
+
+    Solo la primera petición de cada token hace el JOIN Token + User; las
+    siguientes no consultan la base de datos. La caché se invalida al borrar
+    el token (LogoutView) o al guardar el usuario.
+
+    Los tokens expiran y registran su último uso según accounts.tokens.
+    """
+    def authenticate_credentials(self, key):
+        entry = token_users.get(key)
+        stored = tokens.UNKNOWN_ACTIVITY
+        if entry is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user', 'activity').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            user = token.user
+            activity = getattr(token, 'activity', None)
+            stored = activity.last_used if activity else None
+            tokens.remember_last_used(key, stored or token.created)
+            token_users.set(key, (user.pk, token.created))
+            user_snapshots.set(user.pk, snapshot_user(user))
+        else:
+            user_id, created = entry
+            user = get_cached_user(user_id)
+            if user is None:
+                forget_token(key)
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            token = Token(key=key, user=user, created=created)
+            token._state.adding = False
+
+        if tokens.is_expired(key, token.created, stored=stored):
+            tokens.expire(key)
+            raise exceptions.AuthenticationFailed(_('Token expired.'))
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        tokens.record_use(key)
+        return (user, token)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend que carga el usuario de la sesión desde la caché de instantáneas,
+    así la autenticación por sesión tampoco consulta la tabla de usuarios en cada petición.
+    """
+    def get_user(self, user_id):
+        user = get_cached_user(get_user_model()._meta.pk.to_python(user_id))
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,236 @@
+"""
+Capa de caché para los endpoints de lectura.
+
+Cada grupo de datos (inventory, entregas, users, ...) tiene un "namespace"
+cuya versión es la marca de tiempo de su último cambio. Las claves de caché
+incluyen esas versiones, así que invalidar un namespace es un solo
+cache.set(): las entradas viejas dejan de usarse y expiran solas. La misma
+marca de tiempo se usa como Last-Modified de las respuestas.
+
+El backend se elige en settings.CACHES (locmem, archivo o Redis). Con
+locmem cada proceso tiene su propia caché: en despliegues con varios
+workers use el backend de archivo o Redis para que la invalidación llegue
+a todos.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+# Segundos que se conserva una respuesta en caché si nada la invalida antes
+DEFAULT_TIMEOUT = 300
+
+KEY_PREFIX = 'core.cache'
+
+_counters = defaultdict(lambda: {'hits': 0, 'misses': 0, 'not_modified': 0})
+_counters_lock = threading.Lock()
+
+
+def _count(namespaces, counter):
+    with _counters_lock:
+        _counters[','.join(namespaces)][counter] += 1
+
+
+def cache_stats():
+    """
+    Hit/miss counters per namespace group for this process
+    """
+    with _counters_lock:
+        return {name: dict(values) for name, values in _counters.items()}
+
+
+def reset_cache_stats():
+    with _counters_lock:
+        _counters.clear()
+
+
+def shared_cache(alias='default'):
+    """
+    True if the cache `alias` is seen by every process (file, redis...), not a per-process locmem
+    """
+    return not settings.CACHES[alias]['BACKEND'].endswith('.LocMemCache')
+
+
+def _namespace_key(namespace):
+    return f'{KEY_PREFIX}:ns:{namespace}'
+
+
+def namespace_version(namespace):
+    """
+    Timestamp of the last change of `namespace` (initialized on first use)
+    """
+    key = _namespace_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+async def anamespace_version(namespace):
+    key = _namespace_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate(*namespaces):
+    """
+    Mark the namespaces as changed: every cached response that depends on them is discarded
+    """
+    now = time.time()
+    cache.set_many({_namespace_key(namespace): now for namespace in namespaces}, None)
+
+
+def invalidate_on_change(model, *namespaces):
+    """
+    Connect post_save/post_delete of `model` so any change invalidates `namespaces`.
+    Bulk operations that bypass signals must call invalidate() themselves.
+    """
+    def receiver(sender, using=None, **kwargs):
+        # Después del commit: invalidar antes dejaría que una lectura
+        # concurrente guarde los datos previos bajo la versión nueva
+        transaction.on_commit(lambda: invalidate(*namespaces), using=using)
+
+    dispatch_uid = f'{KEY_PREFIX}:{model._meta.label}:{",".join(namespaces)}'
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+
+def _versioned_key(prefix, versions, parts):
+    versions = ','.join(repr(version) for version in versions)
+    digest = hashlib.md5(repr((versions, parts)).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{prefix}:{digest}'
+
+
+def versioned_key(prefix, namespaces, *parts):
+    """
+    Cache key that changes whenever one of the namespaces is invalidated
+    """
+    return _versioned_key(prefix, [namespace_version(namespace) for namespace in namespaces], parts)
+
+
+def _response_key_parts(request, per_user):
+    # request.GET también existe en el Request de DRF: las vistas síncronas y
+    # asíncronas de un mismo endpoint comparten las entradas de caché
+    user_id = request.user.pk if per_user and request.user.is_authenticated else None
+    return request.path, sorted(request.GET.lists()), user_id
+
+
+def _new_entry(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return {
+        'data': data,
+        'etag': quote_etag(hashlib.md5(body.encode('utf-8')).hexdigest()),
+    }
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and int(last_modified) <= if_modified_since
+
+
+def _with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_response(request, namespaces, build_response, per_user=False, timeout=DEFAULT_TIMEOUT):
+    """
+    Return a cached DRF Response for a GET request, calling build_response() on a miss.
+
+    The key is built from the path, the query string, the namespace versions and,
+    with per_user=True, the requesting user. Responses carry ETag and
+    Last-Modified headers; matching conditional requests get a 304.
+    Only 200 responses are stored.
+    """
+    key = versioned_key('response', namespaces, *_response_key_parts(request, per_user))
+    last_modified = max(namespace_version(namespace) for namespace in namespaces)
+
+    entry = cache.get(key)
+    response = None
+    if entry is None:
+        _count(namespaces, 'misses')
+        response = build_response()
+        if not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+            return response
+        entry = _new_entry(response.data)
+        cache.set(key, entry, timeout)
+
+    if _not_modified(request, entry['etag'], last_modified):
+        _count(namespaces, 'not_modified')
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    elif response is None:
+        _count(namespaces, 'hits')
+        response = Response(entry['data'])
+    return _with_validators(response, entry['etag'], last_modified)
+
+
+async def acached_response(request, namespaces, build_data, timeout=DEFAULT_TIMEOUT):
+    """
+    Async version of cached_response() for plain Django async views.
+
+    `build_data` is a coroutine function returning the JSON data of the
+    response, or an HttpResponse (e.g. a 400) that is returned as is and not
+    cached. Uses the async cache API and shares the cache entries of the sync
+    view of the same endpoint.
+    """
+    versions = [await anamespace_version(namespace) for namespace in namespaces]
+    key = _versioned_key('response', versions, _response_key_parts(request, False))
+    last_modified = max(versions)
+
+    entry = await cache.aget(key)
+    response = None
+    if entry is None:
+        _count(namespaces, 'misses')
+        data = await build_data()
+        if isinstance(data, HttpResponse):
+            return data
+        entry = _new_entry(data)
+        await cache.aset(key, entry, timeout)
+        response = JsonResponse(data, safe=False, encoder=DjangoJSONEncoder)
+
+    if _not_modified(request, entry['etag'], last_modified):
+        _count(namespaces, 'not_modified')
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    elif response is None:
+        _count(namespaces, 'hits')
+        response = JsonResponse(entry['data'], safe=False, encoder=DjangoJSONEncoder)
+    return _with_validators(response, entry['etag'], last_modified)
+
+
+def cache_response(*namespaces, per_user=False, timeout=DEFAULT_TIMEOUT):
+    """
+    Decorator for DRF function views (place it below @api_view).
+    Only GET requests are cached; other methods go straight to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            return cached_response(
+                request, namespaces, lambda: view(request, *args, **kwargs),
+                per_user=per_user, timeout=timeout,
+            )
+        return wrapped
+    return decorator
@@ -0,0 +1,58 @@
+"""
+Ajustes de concurrencia para SQLite.
+
+La configuración de la conexión (WAL, synchronous, busy_timeout, mmap) se
+aplica con OPTIONS['init_command'] y las transacciones empiezan con
+BEGIN IMMEDIATE (OPTIONS['transaction_mode']); ver settings.DATABASES.
+
+Con BEGIN IMMEDIATE el bloqueo de escritura se pide al abrir la transacción,
+así que un "database is locked" aparece en el BEGIN, antes de ejecutar
+cualquier sentencia. write_transaction() reintenta solo ese BEGIN: el cuerpo
+de la transacción nunca se ejecuta dos veces y no hace falta repetir toda la
+petición.
+"""
+import logging
+import random
+import time
+from contextlib import ContextDecorator
+
+from django.db import transaction
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# Reintentos del BEGIN cuando la base sigue bloqueada después de busy_timeout
+LOCK_RETRIES = 3
+LOCK_RETRY_DELAY = 0.05  # segundos, se multiplica por el número de intento
+
+
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return isinstance(exc, OperationalError) and ('database is locked' in message or 'database is busy' in message)
+
+
+class write_transaction(ContextDecorator):
+    """
+    transaction.atomic() that retries opening the transaction if SQLite is locked.
+
+    Only the BEGIN is retried, so it is safe for non-idempotent bodies. Nested
+    inside another atomic block it behaves exactly like transaction.atomic()
+    (a savepoint never waits for the lock).
+    """
+    def __init__(self, using=None, retries=LOCK_RETRIES, delay=LOCK_RETRY_DELAY):
+        self.atomic = transaction.atomic(using=using)
+        self.retries = retries
+        self.delay = delay
+
+    def __enter__(self):
+        for attempt in range(1, self.retries + 1):
+            try:
+                return self.atomic.__enter__()
+            except OperationalError as e:
+                if not is_lock_error(e) or attempt == self.retries:
+                    raise
+                logger.warning(f"Database locked on BEGIN, retrying ({attempt}/{self.retries})")
+                time.sleep(self.delay * attempt * (1 + random.random()))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.atomic.__exit__(exc_type, exc_value, traceback)
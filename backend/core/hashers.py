@@ -0,0 +1,34 @@
+"""
+Hasher de contraseñas con costo configurable.
+
+El costo de PBKDF2 se toma de settings.PASSWORD_PBKDF2_ITERATIONS. Al
+iniciar sesión Django vuelve a calcular el hash de la contraseña si fue
+guardado con otro número de iteraciones o con otro algoritmo
+(User.check_password), así que cambiar el ajuste o el hasher preferido
+(PASSWORD_HASHERS[0]) migra las contraseñas de forma transparente.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 con el número de iteraciones tomado de los settings.
+    Conserva el algoritmo 'pbkdf2_sha256', así que reemplaza al hasher de Django
+    y verifica los hashes existentes.
+    """
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
+
+
+def hash_passwords(passwords, executor=None):
+    """
+    make_password() for a list of passwords, in parallel when an executor
+    (e.g. a ProcessPoolExecutor) is given. Hashing is CPU bound, so threads
+    do not help; worker processes only need DJANGO_SETTINGS_MODULE.
+    """
+    if executor is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (4 * (getattr(executor, '_max_workers', 1) or 1)))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
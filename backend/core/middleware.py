@@ -1,34 +1,30 @@
 import logging
-from django.db import connection
-from django.db.utils import OperationalError
 from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .db import is_lock_error
 
 logger = logging.getLogger(__name__)
 
-class DatabaseConnectionMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+class DatabaseConnectionMiddleware(MiddlewareMixin):
+    """
+    Convierte un bloqueo persistente de SQLite en una respuesta 503.
 
-    def __call__(self, request):
-        try:
-            response = self.get_response(request)
-            return response
-        except OperationalError as e:
-            if "database is locked" in str(e):
-                logger.warning("Database lock detected, retrying operation")
-                # Close any existing connections
-                connection.close()
-                # Retry the request
-                try:
-                    response = self.get_response(request)
-                    return response
-                except OperationalError as retry_error:
-                    logger.error(f"Database operation failed after retry: {retry_error}")
-                    return JsonResponse({
-                        'error': 'Database is temporarily unavailable. Please try again.'
-                    }, status=503)
-            raise
-        finally:
-            # Always close the connection after the request
-            connection.close()
+    La petición no se vuelve a ejecutar: repetir una vista completa puede
+    duplicar escrituras (POST no idempotentes). Solo se reintenta la apertura
+    de la transacción (core.db.write_transaction), y las conexiones se reutilizan
+    entre peticiones (CONN_MAX_AGE) en lugar de cerrarse al final de cada una.
 
+    MiddlewareMixin la hace compatible con WSGI y ASGI: bajo ASGI no obliga a
+    pasar cada petición por un hilo (solo actúa en process_exception).
+    """
+
+    def process_exception(self, request, exception):
+        if is_lock_error(exception):
+            logger.error(f"Database locked while processing {request.method} {request.path}: {exception}")
+            response = JsonResponse({
+                'error': 'Database is temporarily unavailable. Please try again.'
+            }, status=503)
+            response['Retry-After'] = '1'
+            return response
+        return None
@@ -0,0 +1,55 @@
+"""
+Utilidades para revisar los planes de consulta de SQLite en las pruebas.
+
+Se capturan las consultas (SQL y parámetros) que ejecuta un endpoint y se
+pasan por EXPLAIN QUERY PLAN para detectar recorridos completos de tabla.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+
+# 'SCAN <tabla>' recorre la tabla completa; 'SCAN <tabla> USING [COVERING] INDEX ...'
+# recorre el índice completo (por ejemplo, para resolver un ORDER BY cuando el
+# filtro no tiene índice), lo que también crece con el tamaño de la tabla.
+FULL_SCAN_RE = re.compile(r'^SCAN (?P<table>\w+)\b')
+
+
+@contextmanager
+def capture_queries():
+    """
+    Collect (sql, params) for every statement executed inside the block
+    """
+    queries = []
+
+    def wrapper(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield queries
+
+
+def explain(sql, params=None):
+    """
+    Return the EXPLAIN QUERY PLAN detail lines for a statement
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params or ())
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_table_scans(queries, allowed_tables=()):
+    """
+    Return [(sql, plan_line)] for every SELECT in `queries` whose plan contains
+    a full table or full index scan of a table that is not in `allowed_tables`.
+    """
+    scans = []
+    for sql, params in queries:
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        for line in explain(sql, params):
+            match = FULL_SCAN_RE.match(line.strip())
+            if match and match.group('table') not in allowed_tables:
+                scans.append((sql, line))
+    return scans
@@ -1,40 +1,46 @@
-import time
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
 from django.contrib.sessions.backends.db import SessionStore as DBStore
-from django.db import OperationalError
+from django.utils import timezone
 
-class SessionStore(DBStore):
-    def __init__(self, session_key=None):
-        super().__init__(session_key)
-        self.max_retries = 3
-        self.retry_delay = 0.1  # seconds
+from core.cache import shared_cache
 
-    def _get_session_from_db(self):
-        for attempt in range(self.max_retries):
-            try:
-                return super()._get_session_from_db()
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                raise
+# Sesiones expiradas que se eliminan por transacción en clear_expired()
+CLEANUP_BATCH_SIZE = 500
 
-    def save(self, must_create=False):
-        for attempt in range(self.max_retries):
-            try:
-                return super().save(must_create)
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                raise
 
-    def delete(self, session_key=None):
-        for attempt in range(self.max_retries):
-            try:
-                return super().delete(session_key)
-            except OperationalError as e:
-                if "database is locked" in str(e) and attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                raise
+class SessionStore(CachedDBStore if shared_cache(settings.SESSION_CACHE_ALIAS) else DBStore):
+    """
+    Sesiones con lectura desde la caché y escritura en la base de datos.
 
+    - Las lecturas se resuelven en la caché (SESSION_CACHE_ALIAS) y solo van a
+      la base de datos cuando la sesión no está en caché.
+    - SessionMiddleware solo guarda cuando la sesión cambió
+      (SESSION_SAVE_EVERY_REQUEST = False); cada guardado escribe en la base
+      de datos y actualiza la caché.
+    - No hay reintentos con time.sleep: la espera por el bloqueo de escritura
+      la resuelve SQLite con busy_timeout (ver core.db).
+
+    Con la caché locmem cada proceso tendría su copia de las sesiones y un
+    logout en un worker no se vería en los demás: en ese caso las sesiones se
+    leen siempre de la base de datos (backend db). Con CACHE_BACKEND=file o
+    redis se usa la caché.
+    """
+
+    @classmethod
+    def clear_expired(cls, batch_size=CLEANUP_BATCH_SIZE):
+        """
+        Eliminar las sesiones expiradas en lotes pequeños (usado por `manage.py clearsessions`),
+        para no mantener el bloqueo de escritura durante un DELETE grande.
+        """
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
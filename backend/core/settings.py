@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
     'accounts',
     'Inventory',
     'form',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -57,7 +60,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'core.middleware.DatabaseConnectionMiddleware',  # Moved after auth and messages middleware
+    'core.middleware.DatabaseConnectionMiddleware',  # Returns 503 on persistent SQLite locks
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -85,13 +88,26 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# PRAGMAs applied to every new SQLite connection (see core.db)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',         # Readers don't block the writer and vice versa
+    'synchronous': 'NORMAL',       # Safe with WAL, one fsync per checkpoint instead of per commit
+    'busy_timeout': 20000,         # Milliseconds to wait for the write lock before failing
+    'mmap_size': 268435456,        # 256 MB memory-mapped reads
+    'cache_size': -20000,          # ~20 MB page cache per connection
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,  # Reuse connections across requests
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'timeout': 20,  # Timeout in seconds
-            'isolation_level': None,  # Autocommit mode
+            'transaction_mode': 'IMMEDIATE',  # Take the write lock at BEGIN, so locked transactions can be retried
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
         },
     }
 }
@@ -107,8 +123,45 @@ DATABASES = {
 #     }
 # }
 
-# Custom session backend
-SESSION_ENGINE = 'core.session_backend'
+# Cache
+# CACHE_BACKEND: 'locmem' (por defecto, por proceso), 'file' o 'redis'.
+# Para 'redis' cualquier servidor compatible con el protocolo sirve (Redis, Valkey, KeyDB...).
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sii-default',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_LOCATION', default='redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'TIMEOUT': 300,
+    },
+    # Contadores de intentos de inicio de sesión (accounts.throttling)
+    'ratelimit': {
+        **CACHE_BACKENDS[config('RATELIMIT_CACHE_BACKEND', default='locmem')],
+        'KEY_PREFIX': 'ratelimit',
+    },
+}
+
+# Vistas asíncronas para los GET de listados y estadísticas (core.async_views).
+# Activar solo al servir core.asgi:application (uvicorn, daphne).
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+# Session engine
+# 'core.session_backend' (default): cache-backed reads when the default cache is shared (file/redis), plain
+# database reads with locmem; database writes only when the session changes.
+# 'django.contrib.sessions.backends.signed_cookies': stateless nodes, the session lives in a signed cookie.
+SESSION_ENGINE = config('SESSION_ENGINE', default='core.session_backend')
 
 # Session configuration
 SESSION_COOKIE_SECURE = False  # Set to True in production
@@ -116,13 +169,6 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_SAVE_EVERY_REQUEST = False
 
-# Database connection settings
-CONN_MAX_AGE = 0  # Closes connections at the end of each request
-DATABASE_OPTIONS = {
-    'timeout': 30,
-}
-
-
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -141,6 +187,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# El primer hasher es el preferido; los hashes guardados con otro (o con otro
+# número de iteraciones) se recalculan al iniciar sesión.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'core.hashers.ConfigurablePBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',  # requires argon2-cffi
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',  # requires bcrypt
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+# 0 keeps Django's default; lower values make logins cheaper at the cost of weaker hashes
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=0, cast=int)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -159,6 +221,37 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos subidos (DataEntrega.archivo_adjunto)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
+# Subidas por partes (form.uploads). El staging debe estar en el mismo sistema de
+# archivos que MEDIA_ROOT para que completar una subida sea un rename, no una copia.
+UPLOAD_STAGING_DIR = config('UPLOAD_STAGING_DIR', default=str(Path(MEDIA_ROOT) / '.staging'))
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=50 * 1024 * 1024, cast=int)  # bytes por archivo
+UPLOAD_CHUNK_MAX_SIZE = config('UPLOAD_CHUNK_MAX_SIZE', default=8 * 1024 * 1024, cast=int)  # bytes por parte
+UPLOAD_SESSION_TTL = 24 * 3600  # seconds; purge_uploads deletes unfinished/unlinked uploads older than this
+# Imágenes adjuntas: lado mayor de la miniatura y, si es > 0, de la imagen recomprimida (requiere Pillow)
+ATTACHMENT_THUMBNAIL_SIZE = 320
+ATTACHMENT_IMAGE_MAX_DIMENSION = config('ATTACHMENT_IMAGE_MAX_DIMENSION', default=0, cast=int)
+
+# Entrega de adjuntos: 'django' (Python, con soporte de Range; para desarrollo),
+# 'x-accel' (nginx, con una location internal en ATTACHMENT_INTERNAL_URL) o
+# 'x-sendfile' (Apache mod_xsendfile / lighttpd). Con los dos últimos el servidor
+# web envía el archivo y atiende los Range; Python solo verifica el permiso.
+ATTACHMENT_SERVE_MODE = config('ATTACHMENT_SERVE_MODE', default='django')
+ATTACHMENT_INTERNAL_URL = config('ATTACHMENT_INTERNAL_URL', default='/protected-media/')
+
+# Una solicitud del mismo beneficiario con las mismas ayudas técnicas dentro de
+# este plazo se rechaza como duplicada (form.beneficiaries); 0 desactiva la verificación
+ENTREGA_DUPLICATE_WINDOW_DAYS = config('ENTREGA_DUPLICATE_WINDOW_DAYS', default=30, cast=int)
+
+# Cola de trabajos en segundo plano (jobs.queue), procesada por `manage.py run_jobs`
+JOBS_VISIBILITY_TIMEOUT = config('JOBS_VISIBILITY_TIMEOUT', default=300, cast=int)  # seconds a claimed job stays hidden
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 30  # seconds before the first retry, doubled on each further attempt
+JOBS_POLL_INTERVAL = config('JOBS_POLL_INTERVAL', default=2, cast=float)  # seconds between polls of an idle worker
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -167,15 +260,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'accounts.User'
 
+# Session users are loaded through the in-memory snapshot cache (core.authentication)
+AUTHENTICATION_BACKENDS = [
+    'core.authentication.CachedModelBackend',
+]
+
+# Per-process token -> user cache used by CachedTokenAuthentication / CachedModelBackend
+AUTH_CACHE_MAX_SIZE = 10000  # entries
+AUTH_CACHE_TTL = 60  # seconds; bounds how long another worker may see a stale user
+
+# API token lifecycle (accounts.tokens), all values in seconds
+AUTH_TOKEN_TTL = 7 * 24 * 3600  # Absolute lifetime of a token
+AUTH_TOKEN_IDLE_TIMEOUT = 24 * 3600  # Tokens unused for this long expire
+AUTH_TOKEN_ROTATE_AFTER = 24 * 3600  # Login issues a new token if the current one is older
+AUTH_TOKEN_TOUCH_INTERVAL = 300  # Minimum time between last_used writes for a token
+
 # Configuración de REST Framework con autenticación personalizada sin CSRF
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
         'core.authentication.CSRFExemptSessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # Límites de LoginView (accounts.throttling)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('LOGIN_RATE_PER_IP', default='120/min'),
+        'login_cedula': config('LOGIN_RATE_PER_CEDULA', default='10/min'),
+    },
 }
 
 # Logging configuration
@@ -203,6 +316,10 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'WARNING',
         },
+        'core.db': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
     },
 }
 
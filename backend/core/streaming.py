@@ -0,0 +1,171 @@
+import csv
+import json
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+# Formatos de exportación soportados y su content type
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Número de filas que se agrupan en cada fragmento enviado al cliente
+ROWS_PER_CHUNK = 500
+
+# Bytes por fragmento al enviar un rango de un archivo desde Python
+FILE_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+
+class _Echo:
+    """
+    File-like object for csv.writer that returns the line instead of storing it
+    """
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return value
+
+
+def stream_csv(records, fields):
+    """
+    Yield CSV text for an iterable of dicts, a few hundred rows per chunk
+    """
+    writer = csv.writer(_Echo())
+    # BOM para que Excel detecte UTF-8 (tildes y ñ)
+    yield '\ufeff' + writer.writerow(fields)
+    lines = []
+    for record in records:
+        lines.append(writer.writerow([_csv_value(record.get(field)) for field in fields]))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def stream_ndjson(records):
+    """
+    Yield one JSON document per line for an iterable of dicts
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines = []
+    for record in records:
+        lines.append(encoder.encode(record) + '\n')
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def export_fields(serializer):
+    """
+    Names of the serializer fields that appear in its output (write-only fields excluded)
+    """
+    return [name for name, field in serializer.fields.items() if not field.write_only]
+
+
+def export_response(records, fields, export_format, filename):
+    """
+    Build a StreamingHttpResponse for `records` (a lazy iterable of dicts).
+    Rows are produced while the response is sent, so neither the queryset
+    nor the serialized output is ever fully held in memory.
+    """
+    if export_format == 'csv':
+        content = stream_csv(records, fields)
+    else:
+        content = stream_ndjson(records)
+    response = StreamingHttpResponse(content, content_type=EXPORT_CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range "Range: bytes=..." header.
+    None when there is no usable header (multiple ranges are served as the
+    whole file, as RFC 9110 allows); ValueError when the range is unsatisfiable.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match or not (match['start'] or match['end']):
+        return None
+    if match['start']:
+        start = int(match['start'])
+        end = min(int(match['end']), size - 1) if match['end'] else size - 1
+    else:
+        # bytes=-N: los últimos N bytes
+        start = max(0, size - int(match['end']))
+        end = size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _iter_range(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        while length > 0:
+            data = fileobj.read(min(FILE_CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        fileobj.close()
+
+
+def file_response(request, name, filename=None, storage=default_storage):
+    """
+    Serve a stored file according to settings.ATTACHMENT_SERVE_MODE:
+    - 'x-accel' / 'x-sendfile': only headers; the web server sends the file
+      and answers Range requests itself.
+    - 'django': FileResponse (wsgi.file_wrapper/sendfile when the server has
+      it) or a 206 partial response for a single Range.
+    """
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    disposition = content_disposition_header(False, filename or name.rsplit('/', 1)[-1])
+    mode = settings.ATTACHMENT_SERVE_MODE
+
+    if mode in ('x-accel', 'x-sendfile'):
+        response = HttpResponse(content_type=content_type)
+        if mode == 'x-accel':
+            response['X-Accel-Redirect'] = settings.ATTACHMENT_INTERNAL_URL.rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = storage.path(name)
+        response['Content-Disposition'] = disposition
+        return response
+
+    size = storage.size(name)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_range(storage.open(name, 'rb'), start, end - start + 1),
+            status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    return response
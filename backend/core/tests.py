@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.utils import OperationalError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from Inventory.models import Inventory
+from .cache import namespace_version, reset_cache_stats
+from .db import LOCK_RETRIES, write_transaction
+
+
+class ResponseCacheTests(TestCase):
+    """
+    Caché de respuestas: aciertos, validadores (ETag/Last-Modified) e invalidación por namespace.
+    """
+    url = '/api/Inventory/?tipo_insumo=GASA'
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        Inventory.objects.create(tipo_insumo='GASA', inventario_total=5)
+
+    def stats(self):
+        client = APIClient()
+        client.force_authenticate(User(pk=1, username='stats'))
+        response = client.get('/api/cache/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data.get('inventory', {})
+
+    def test_hit_and_validators(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.stats(), {'hits': 1, 'misses': 1, 'not_modified': 0})
+
+    def test_conditional_requests(self):
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"otro"').status_code, 200)
+        self.assertEqual(self.stats(), {'hits': 1, 'misses': 1, 'not_modified': 2})
+
+    def test_write_invalidates_after_commit(self):
+        first = self.client.get(self.url)
+        version = namespace_version('inventory')
+        with self.captureOnCommitCallbacks(execute=True):
+            Inventory.objects.create(tipo_insumo='GASA', inventario_total=3)
+            # Antes del commit la versión no cambia: una lectura concurrente vería los datos previos
+            self.assertEqual(namespace_version('inventory'), version)
+        self.assertNotEqual(namespace_version('inventory'), version)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(self.stats(), {'hits': 0, 'misses': 2, 'not_modified': 0})
+
+    def test_other_namespaces_stay_cached(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username='otro', email='otro@example.com', cedula='12345682',
+                                     department='oac')
+        self.client.get(self.url)
+        self.assertEqual(self.stats(), {'hits': 1, 'misses': 1, 'not_modified': 0})
+
+    def test_only_get_is_cached(self):
+        self.client.get(self.url)
+        response = self.client.post('/api/Inventory/', {
+            'tipo_insumo': 'GASA', 'inventario_total': 1, 'fecha_adquisicion': '2024-01-01',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stats(), {'hits': 0, 'misses': 1, 'not_modified': 0})
+
+
+@mock.patch('core.db.time.sleep')
+class WriteTransactionTests(TestCase):
+    """
+    write_transaction() reintenta solo el BEGIN cuando SQLite sigue bloqueada.
+    """
+    def atomic(self, *enter_results):
+        # transaction.atomic() simulado cuyo __enter__ falla o pasa según enter_results
+        atomic = mock.MagicMock()
+        atomic.__enter__.side_effect = enter_results
+        return mock.patch('core.db.transaction.atomic', return_value=atomic)
+
+    def test_retries_lock_on_begin(self, sleep):
+        body = mock.Mock()
+        locked = OperationalError('database is locked')
+        with self.atomic(locked, locked, None) as atomic:
+            with write_transaction():
+                body()
+        body.assert_called_once()
+        self.assertEqual(atomic.return_value.__enter__.call_count, 3)
+        atomic.return_value.__exit__.assert_called_once()
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up_after_retries(self, sleep):
+        body = mock.Mock()
+        with self.atomic(*[OperationalError('database is locked')] * LOCK_RETRIES):
+            with self.assertRaisesMessage(OperationalError, 'database is locked'):
+                with write_transaction():
+                    body()
+        body.assert_not_called()
+        self.assertEqual(sleep.call_count, LOCK_RETRIES - 1)
+
+    def test_other_errors_are_not_retried(self, sleep):
+        with self.atomic(OperationalError('no such table: foo'), None):
+            with self.assertRaises(OperationalError):
+                with write_transaction():
+                    pass
+        sleep.assert_not_called()
+
+
+class DatabaseLockMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User(pk=1, username='lock'))
+
+    def test_lock_error_is_503(self):
+        with mock.patch('core.views.cache_stats', side_effect=OperationalError('database is locked')):
+            response = self.client.get('/api/cache/stats/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertIn('error', response.json())
+
+    def test_other_errors_are_not_converted(self):
+        with mock.patch('core.views.cache_stats', side_effect=OperationalError('no such table: foo')):
+            with self.assertRaises(OperationalError):
+                self.client.get('/api/cache/stats/')
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .views import cache_status
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -23,4 +24,5 @@ urlpatterns = [
     path('api-auth/', include('rest_framework.urls')),
     path('api/', include('form.urls')), 
     path('api/Inventory/', include('Inventory.urls')),  
+    path('api/cache/stats/', cache_status, name='cache_status'),
 ]
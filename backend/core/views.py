@@ -0,0 +1,14 @@
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .cache import cache_stats
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def cache_status(request):
+    """
+    Hit/miss counters of the response cache for this worker process
+    """
+    return Response(cache_stats())
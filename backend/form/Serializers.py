@@ -1,8 +1,44 @@
 from rest_framework import serializers
+
+from core.cache import invalidate
+from core.db import write_transaction
+from jobs.queue import enqueue
+from .beneficiaries import DuplicateEntrega, find_duplicate
+from .catalog import catalog, get_catalog
 from .models import DataEntrega, ItemEntregado, AyudaTecnica
+from .uploads import UploadError, attach_upload, get_completed_upload, is_image, process_attachment_image
+
+class AyudaTecnicaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AyudaTecnica
+        fields = ('id', 'nombre')
+
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField que resuelve el nombre con el catálogo en memoria
+    (form.catalog): sin consultas, sin distinguir mayúsculas, tildes ni
+    puntuación, y siempre a la ayuda canónica. Un nombre desconocido cuesta
+    una consulta para comprobar si el catálogo cambió en otro proceso.
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        # Una misma versión del catálogo para todos los items del serializador
+        snapshot = getattr(self, '_snapshot', None)
+        if snapshot is None:
+            snapshot = self._snapshot = get_catalog()
+        ayuda = snapshot.resolve(data)
+        if ayuda is None:
+            # Puede ser una ayuda creada en otro proceso después de cargar el catálogo
+            snapshot = self._snapshot = catalog.refresh_if_changed(snapshot)
+            ayuda = snapshot.resolve(data)
+        if ayuda is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return ayuda
+
 
 class ItemEntregadoSerializer(serializers.ModelSerializer):
-    tipo = serializers.SlugRelatedField(
+    tipo = CatalogSlugRelatedField(
         slug_field='nombre',
         queryset=AyudaTecnica.objects.all(),
         source='ayuda_tecnica'
@@ -14,20 +50,52 @@ class ItemEntregadoSerializer(serializers.ModelSerializer):
 
 class DataEntregaSerializer(serializers.ModelSerializer):
     items = ItemEntregadoSerializer(many=True)
+    # Subida por partes completada (form.uploads) que se guarda como archivo_adjunto
+    upload_id = serializers.UUIDField(write_only=True, required=False)
+    # Registrar la solicitud aunque repita una reciente (p. ej. entregas periódicas de pañales)
+    permitir_duplicado = serializers.BooleanField(write_only=True, required=False, default=False)
     
     class Meta:
         model = DataEntrega
         fields = '__all__'
 
+    def validate_upload_id(self, value):
+        try:
+            return get_completed_upload(value)
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
+
     def create(self, validated_data):
         items_data = validated_data.pop('items')
-        entrega = DataEntrega.objects.create(**validated_data)
-        for item in items_data:
-            ItemEntregado.objects.create(
-                data_entrega=entrega,
-                ayuda_tecnica=item['ayuda_tecnica'],
-                cantidad=item['cantidad']
-            )
+        permitir_duplicado = validated_data.pop('permitir_duplicado', False)
+        upload = validated_data.pop('upload_id', None)
+        # Una sola transacción (un fsync): la entrega nunca queda con items a medias
+        with write_transaction():
+            # Dentro de la transacción: BEGIN IMMEDIATE serializa las escrituras, así que
+            # dos envíos idénticos simultáneos (doble clic) no pasan ambos la verificación
+            if not permitir_duplicado:
+                duplicado = find_duplicate(
+                    validated_data.get('identification'), [item['ayuda_tecnica'].pk for item in items_data]
+                )
+                if duplicado is not None:
+                    raise DuplicateEntrega(duplicado)
+            entrega = DataEntrega.objects.create(**validated_data)
+            ItemEntregado.objects.bulk_create([
+                ItemEntregado(
+                    data_entrega=entrega,
+                    ayuda_tecnica=item['ayuda_tecnica'],
+                    cantidad=item['cantidad']
+                )
+                for item in items_data
+            ])
+            if upload is not None:
+                # Solo se llega aquí con la solicitud ya validada
+                attach_upload(entrega, upload)
+            elif entrega.archivo_adjunto and is_image(entrega.archivo_adjunto.name):
+                # Adjunto enviado en la misma petición: miniatura en segundo plano
+                enqueue(process_attachment_image, entrega_id=entrega.pk)
+        # bulk_create no envía post_save
+        invalidate('entregas')
         return entrega
 
 class StatusUpdateSerializer(serializers.ModelSerializer):
@@ -35,3 +103,14 @@ class StatusUpdateSerializer(serializers.ModelSerializer):
         model = DataEntrega
         fields = ['status']
         read_only_fields = ['id']  # Proteger otros campos
+
+
+# Entregas por petición de cambio de status en lote
+STATUS_BULK_MAX_IDS = 500
+
+
+class StatusBulkUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=STATUS_BULK_MAX_IDS
+    )
+    status = serializers.ChoiceField(choices=DataEntrega.STATUS_CHOICES)
@@ -1,7 +1,24 @@
 from django.contrib import admin
-from .models import AyudaTecnica, DataEntrega, ItemEntregado
+from .models import AyudaTecnica, DataEntrega, ItemEntregado, StatusTransition
 # Register your models here.
 
 admin.site.register(AyudaTecnica)
 admin.site.register(DataEntrega)
-admin.site.register(ItemEntregado)
\ No newline at end of file
+admin.site.register(ItemEntregado)
+
+
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    # El registro es de solo inserción: se consulta, no se edita
+    list_display = ('entrega_id', 'from_status', 'to_status', 'user', 'created', 'seconds_in_from')
+    list_filter = ('to_status', 'from_status')
+    list_select_related = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
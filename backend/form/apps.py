@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class FormConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'form'
+
+    def ready(self):
+        # Registrar los receivers que mantienen BeneficiaryIndex
+        from . import signals  # noqa: F401
+        from core.cache import invalidate_on_change
+        from .models import AyudaTecnica, DataEntrega, ItemEntregado
+
+        # Invalidar las respuestas en caché cuando cambian los datos
+        invalidate_on_change(DataEntrega, 'entregas')
+        invalidate_on_change(ItemEntregado, 'entregas')
+        invalidate_on_change(AyudaTecnica, 'ayudas', 'entregas')
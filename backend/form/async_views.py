@@ -0,0 +1,51 @@
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+
+from core.async_views import json_response, paginate
+from core.cache import acached_response
+
+from .filters import filter_entregas
+from .models import DataEntrega
+from .pagination import EntregaCursorPagination
+from .Serializers import DataEntregaSerializer
+from .stats import PERIODOS, get_stats
+from .views import PAGINATION_PARAMS
+
+
+async def entregas_list(request):
+    """
+    GET of crear_entrega for the ASGI path: same filters, pagination and cache
+    """
+    async def build():
+        try:
+            entregas = filter_entregas(
+                DataEntrega.objects.prefetch_related('items__ayuda_tecnica').order_by('-fecha', '-id'),
+                request.GET
+            )
+        except serializers.ValidationError as e:
+            return json_response(e.detail, status=400)
+        if any(param in request.GET for param in PAGINATION_PARAMS):
+            return await paginate(EntregaCursorPagination(), entregas, request, DataEntregaSerializer)
+        # async for también ejecuta los prefetch_related. Con el request en el contexto
+        # archivo_adjunto sale como URL absoluta, igual que en la vista síncrona que
+        # comparte la entrada de caché
+        return DataEntregaSerializer(
+            [entrega async for entrega in entregas], many=True, context={'request': request}
+        ).data
+
+    return await acached_response(request, ['entregas'], build)
+
+
+async def entregas_stats(request):
+    """
+    estadisticas_entregas for the ASGI path. Las agregaciones y su caché se
+    calculan en get_stats(), ejecutado fuera del event loop.
+    """
+    periodo = request.GET.get('periodo', 'month')
+    if periodo not in PERIODOS:
+        return json_response({'error': f"periodo debe ser uno de: {', '.join(PERIODOS)}"}, status=400)
+    try:
+        stats = await sync_to_async(get_stats)(request.GET, periodo)
+    except serializers.ValidationError as e:
+        return json_response(e.detail, status=400)
+    return json_response(stats)
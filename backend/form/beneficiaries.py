@@ -0,0 +1,165 @@
+"""
+Índice de personas por cédula normalizada (tabla BeneficiaryIndex).
+
+Las cédulas llegan como "12.345.678", "V-12345678" o "012345678"; la clave
+es solo la secuencia de dígitos sin ceros a la izquierda, de modo que todas
+esas variantes encuentran a la misma persona con una búsqueda por índice.
+"""
+import datetime
+import re
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from core.db import write_transaction
+from .models import BeneficiaryIndex, DataEntrega, ItemEntregado
+
+NON_DIGIT_RE = re.compile(r'\D+')
+
+# Rol en el índice -> campo de DataEntrega con la cédula
+ROLE_FIELDS = {
+    'beneficiario': 'identification',
+    'solicitante': 'identificationApplicant',
+    'referente_persona': 'identificationRefererPerson',
+    'referente_organizacion': 'identificationRefererOrganization',
+    'referente_asociacion': 'identificationRefererAssociation',
+}
+
+# Entregas que se reindexan por lote en rebuild_index()
+REBUILD_BATCH_SIZE = 1000
+
+
+def normalize_identification(value):
+    """
+    'V-012.345.678' -> '12345678'; '' when there are no digits
+    """
+    if value is None:
+        return ''
+    return NON_DIGIT_RE.sub('', str(value)).lstrip('0')
+
+
+def index_rows(entrega):
+    rows = []
+    for role, field in ROLE_FIELDS.items():
+        identification = normalize_identification(getattr(entrega, field))
+        if identification:
+            rows.append(BeneficiaryIndex(
+                entrega_id=entrega.pk, identification=identification, role=role, fecha=entrega.fecha
+            ))
+    return rows
+
+
+def index_entrega(entrega, created=False):
+    """
+    Bring the index rows of `entrega` up to date. A new entrega costs one
+    INSERT; an updated one a SELECT, plus writes only if a cédula changed.
+    """
+    rows = index_rows(entrega)
+    if not created:
+        current = set(
+            BeneficiaryIndex.objects.filter(entrega_id=entrega.pk).values_list('identification', 'role', 'fecha')
+        )
+        if current == {(row.identification, row.role, row.fecha) for row in rows}:
+            return
+        BeneficiaryIndex.objects.filter(entrega_id=entrega.pk).delete()
+    BeneficiaryIndex.objects.bulk_create(rows)
+
+
+def rebuild_index(batch_size=REBUILD_BATCH_SIZE):
+    """
+    Recreate the whole index from DataEntrega. Returns the number of rows written.
+    """
+    fields = ['id', 'fecha', *ROLE_FIELDS.values()]
+    written = 0
+    with write_transaction():
+        BeneficiaryIndex.objects.all().delete()
+        rows = []
+        for entrega in DataEntrega.objects.only(*fields).order_by('id').iterator(chunk_size=batch_size):
+            rows.extend(index_rows(entrega))
+            if len(rows) >= batch_size:
+                BeneficiaryIndex.objects.bulk_create(rows)
+                written += len(rows)
+                rows = []
+        BeneficiaryIndex.objects.bulk_create(rows)
+        written += len(rows)
+    return written
+
+
+def history(identification):
+    """
+    Entregas in which a person appears, newest first, each with the person's
+    roles and the delivered items. Returns (normalized identification, entregas).
+    """
+    key = normalize_identification(identification)
+    if not key:
+        return key, []
+    rows = (
+        BeneficiaryIndex.objects.filter(identification=key)
+        .select_related('entrega')
+        .prefetch_related(
+            Prefetch('entrega__items', queryset=ItemEntregado.objects.select_related('ayuda_tecnica'))
+        )
+        .order_by('-fecha', '-entrega_id')
+    )
+    entregas = {}
+    for row in rows:
+        entry = entregas.get(row.entrega_id)
+        if entry is None:
+            entrega = row.entrega
+            entry = entregas[row.entrega_id] = {
+                'id': entrega.id,
+                'fecha': entrega.fecha,
+                'status': entrega.status,
+                'name': entrega.name,
+                'lastname': entrega.lastname,
+                'state': entrega.state,
+                'municipality': entrega.municipality,
+                'roles': [],
+                'items': [
+                    {'tipo': item.ayuda_tecnica.nombre, 'cantidad': item.cantidad}
+                    for item in entrega.items.all()
+                ],
+            }
+        entry['roles'].append(row.role)
+    return key, list(entregas.values())
+
+
+class DuplicateEntrega(Exception):
+    """
+    A recent entrega of the same beneficiary with the same ayudas técnicas exists
+    """
+    def __init__(self, entrega_id):
+        super().__init__(
+            f'Ya existe una solicitud reciente (#{entrega_id}) del mismo beneficiario con las mismas '
+            'ayudas técnicas. Envíe permitir_duplicado=true para registrarla de todos modos.'
+        )
+        self.entrega_id = entrega_id
+
+
+def find_duplicate(identification, ayuda_ids, now=None):
+    """
+    Id of an entrega of the same beneficiary with the same ayudas técnicas
+    made within ENTREGA_DUPLICATE_WINDOW_DAYS (rejected ones excluded), or None.
+    """
+    days = settings.ENTREGA_DUPLICATE_WINDOW_DAYS
+    key = normalize_identification(identification)
+    if not days or not key or not ayuda_ids:
+        return None
+    since = (now or timezone.now()) - datetime.timedelta(days=days)
+    recientes = (
+        BeneficiaryIndex.objects.filter(identification=key, role='beneficiario', fecha__gte=since)
+        .exclude(entrega__status='RECHAZADO')
+        .values('entrega_id')
+    )
+    por_entrega = {}
+    for entrega_id, ayuda_id in (
+        ItemEntregado.objects.filter(data_entrega_id__in=recientes)
+        .values_list('data_entrega_id', 'ayuda_tecnica_id')
+    ):
+        por_entrega.setdefault(entrega_id, set()).add(ayuda_id)
+    wanted = set(ayuda_ids)
+    for entrega_id in sorted(por_entrega, reverse=True):
+        if por_entrega[entrega_id] == wanted:
+            return entrega_id
+    return None
@@ -0,0 +1,151 @@
+"""
+Catálogo de ayudas técnicas en memoria del proceso.
+
+Los nombres se indexan por una clave normalizada (sin mayúsculas, tildes ni
+signos de puntuación), así "PAÑALES", "Panales" y "panales." resuelven a la
+misma ayuda sin consultar la base de datos. Cuando varias filas comparten la
+clave (p. ej. "BASTÓN DE 1 PUNTO" y "BASTON DE 1 PUNTO", que sembraba
+create_ayudas_tecnicas) todas resuelven a una canónica; merge_ayudas_tecnicas
+une esas filas en la base de datos.
+
+El catálogo se carga en el primer uso de cada proceso y se recarga cuando
+cambia la versión del namespace de caché 'ayudas', que se invalida al
+guardar o borrar una AyudaTecnica (ver FormConfig.ready). Esa versión solo
+se comparte entre procesos con una caché compartida (CACHE_BACKEND=file o
+redis); con locmem, lo que otro proceso cambia se ve cuando la copia cumple
+CATALOG_TTL, o antes si un nombre no se encuentra y la tabla cambió
+(refresh_if_changed).
+"""
+import re
+import threading
+import time
+import unicodedata
+
+from django.db.models import Count, Max
+
+from core.cache import invalidate, namespace_version
+from core.db import write_transaction
+from .models import AyudaTecnica, ItemEntregado
+
+NON_ALPHANUMERIC_RE = re.compile(r'[^0-9a-z]+')
+
+# Segundos que una copia del catálogo se usa sin recargarla
+CATALOG_TTL = 60
+
+
+def normalize_nombre(nombre):
+    """
+    'Colchón anti-escaras ' -> 'colchon anti escaras'
+    """
+    decomposed = unicodedata.normalize('NFKD', str(nombre).casefold())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC_RE.sub(' ', stripped).strip()
+
+
+def _canonical_order(ayuda):
+    # Preferir el nombre con tildes (el del formulario) y, a igualdad, el id más antiguo
+    return -sum(1 for char in ayuda.nombre if ord(char) > 127), ayuda.pk
+
+
+def group_ayudas(ayudas):
+    """
+    {clave normalizada: [canónica, duplicadas...]}
+    """
+    groups = {}
+    for ayuda in ayudas:
+        groups.setdefault(normalize_nombre(ayuda.nombre), []).append(ayuda)
+    for members in groups.values():
+        members.sort(key=_canonical_order)
+    return groups
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the catalog at one namespace version
+    """
+    def __init__(self, version, ayudas):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # (id más alto, filas): basta para notar ayudas agregadas o borradas en otro proceso
+        self.marker = (max((ayuda.pk for ayuda in ayudas), default=None), len(ayudas))
+        groups = group_ayudas(ayudas)
+        self.by_key = {key: members[0] for key, members in groups.items()}
+        self.canonical_ids = {
+            ayuda.pk: members[0].pk for members in groups.values() for ayuda in members
+        }
+        self.ayudas = sorted(self.by_key.values(), key=lambda ayuda: ayuda.nombre)
+
+    def resolve(self, nombre):
+        """
+        Canonical AyudaTecnica for a name, or None
+        """
+        return self.by_key.get(normalize_nombre(nombre))
+
+
+class AyudaCatalog:
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _stale(self, snapshot, version):
+        return (
+            snapshot is None or snapshot.version != version
+            or time.monotonic() - snapshot.loaded_at > CATALOG_TTL
+        )
+
+    def get(self):
+        # La versión se lee antes de cargar: un cambio durante la carga fuerza otra recarga
+        version = namespace_version('ayudas')
+        snapshot = self._snapshot
+        if self._stale(snapshot, version):
+            with self._lock:
+                snapshot = self._snapshot
+                if self._stale(snapshot, version):
+                    snapshot = self._snapshot = CatalogSnapshot(version, list(AyudaTecnica.objects.all()))
+        return snapshot
+
+    def refresh_if_changed(self, snapshot):
+        """
+        Reload if AyudaTecnica rows were added or deleted since `snapshot`
+        (one aggregate query). Used when a name is not found.
+        """
+        marker = AyudaTecnica.objects.aggregate(last=Max('id'), total=Count('id'))
+        if (marker['last'], marker['total']) == snapshot.marker:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot = CatalogSnapshot(
+                namespace_version('ayudas'), list(AyudaTecnica.objects.all())
+            )
+        return snapshot
+
+    def clear(self):
+        self._snapshot = None
+
+
+catalog = AyudaCatalog()
+
+
+def get_catalog():
+    return catalog.get()
+
+
+def merge_duplicates(dry_run=False):
+    """
+    Point the items of duplicated ayudas to the canonical one and delete the
+    duplicates. Returns [(canonical, [duplicates])].
+    """
+    groups = [
+        (members[0], members[1:])
+        for members in group_ayudas(AyudaTecnica.objects.all()).values()
+        if len(members) > 1
+    ]
+    if dry_run or not groups:
+        return groups
+    with write_transaction():
+        for canonical, duplicates in groups:
+            ids = [ayuda.pk for ayuda in duplicates]
+            ItemEntregado.objects.filter(ayuda_tecnica_id__in=ids).update(ayuda_tecnica=canonical)
+            AyudaTecnica.objects.filter(pk__in=ids).delete()
+    # update() no envía señales
+    invalidate('ayudas', 'entregas')
+    return groups
@@ -0,0 +1,64 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+
+# Campos de DataEntrega que se filtran por coincidencia exacta
+ENTREGA_FILTER_FIELDS = ('status', 'state', 'municipality', 'parish', 'identification')
+
+
+def _parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        date = parse_date(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise serializers.ValidationError({name: 'Formato de fecha inválido. Use YYYY-MM-DD.'})
+    return date
+
+
+def _start_of_day(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def date_range(params):
+    """
+    ?fecha_desde / ?fecha_hasta (YYYY-MM-DD, ambos inclusive) -> (inicio, fin)
+    como datetimes para comparar con >= y <; None si falta el parámetro
+    """
+    fecha_desde = _parse_date_param(params, 'fecha_desde')
+    fecha_hasta = _parse_date_param(params, 'fecha_hasta')
+    return (
+        _start_of_day(fecha_desde) if fecha_desde else None,
+        _start_of_day(fecha_hasta + datetime.timedelta(days=1)) if fecha_hasta else None,
+    )
+
+
+def filter_entregas(queryset, params):
+    """
+    Aplicar los filtros del listado de entregas:
+    - status, state, municipality, parish, identification: coincidencia exacta
+    - fecha_desde / fecha_hasta (YYYY-MM-DD, ambos inclusive) sobre fecha
+
+    El rango de fechas se compara contra la columna directamente (sin __date)
+    para que la consulta pueda usar el índice de fecha.
+    """
+    filters = {
+        field: params.get(field)
+        for field in ENTREGA_FILTER_FIELDS
+        if params.get(field)
+    }
+
+    desde, hasta = date_range(params)
+    if desde:
+        filters['fecha__gte'] = desde
+    if hasta:
+        filters['fecha__lt'] = hasta
+
+    if filters:
+        queryset = queryset.filter(**filters)
+    return queryset
@@ -0,0 +1,144 @@
+import asyncio
+import datetime
+import importlib
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import clear_url_caches
+
+from form.models import AyudaTecnica, DataEntrega, ItemEntregado
+from Inventory.models import Inventory
+from Inventory.sequences import allocate_codigos
+
+# Endpoints de lectura que tienen vista asíncrona (core.async_views)
+ENDPOINTS = (
+    '/api/Inventory/?page_size=50',
+    '/api/ayudas-tecnicas-externos/?page_size=25',
+    '/api/entregas/estadisticas/?periodo=month',
+)
+
+URL_MODULES = ('Inventory.urls', 'form.urls', 'core.urls')
+
+
+def use_async_reads(enabled):
+    """
+    Re-import the URLconf so read_view() picks the sync or async views
+    """
+    with override_settings(ASYNC_READ_VIEWS=enabled):
+        for name in URL_MODULES:
+            importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara los GET de inventario, entregas y estadísticas por el camino WSGI (vistas DRF '
+        'síncronas en hilos) y el ASGI (vistas asíncronas en un event loop), en proceso y sobre '
+        'una base de datos de prueba desechable. Para una prueba de carga contra un servidor real '
+        'use gunicorn core.wsgi frente a uvicorn core.asgi:application con ASYNC_READ_VIEWS=True.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones por endpoint y modo')
+        parser.add_argument('--concurrency', type=int, default=8, help='Peticiones simultáneas')
+        parser.add_argument('--inventory', type=int, default=2000, help='Artículos de inventario de prueba')
+        parser.add_argument('--entregas', type=int, default=500, help='Solicitudes de prueba (2 items cada una)')
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Repetir la misma URL (respuestas desde la caché); por defecto cada petición es distinta'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark_reads.sqlite3')
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            self.seed(options['inventory'], options['entregas'])
+            # La conexión del hilo principal no debe quedar abierta mientras otros hilos escriben/leen
+            connection.close()
+            for name, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+                use_async_reads(name == 'asgi')
+                for endpoint in ENDPOINTS:
+                    results, elapsed = run(self.urls(endpoint, options), options['concurrency'])
+                    self.report(name, endpoint, results, elapsed)
+        finally:
+            use_async_reads(False)
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def seed(self, inventory, entregas):
+        Inventory.objects.bulk_create([
+            Inventory(
+                codigo_articulo=codigo, tipo_insumo=f'tipo{i % 5}', descripcion=f'artículo {i}',
+                fecha_adquisicion=datetime.date(2024, 1, 1), inventario_total=10,
+            )
+            for i, codigo in enumerate(allocate_codigos(inventory))
+        ])
+        ayudas = AyudaTecnica.objects.bulk_create([AyudaTecnica(nombre=f'Ayuda {i}') for i in range(10)])
+        solicitudes = DataEntrega.objects.bulk_create([
+            DataEntrega(
+                name='Nombre', lastname='Apellido', resident='V', identification=f'{10000000 + i}',
+                phone='0000', direction='Dirección', state='Zulia', municipality=f'Municipio {i % 7}',
+                parish='Parroquia',
+            )
+            for i in range(entregas)
+        ])
+        ItemEntregado.objects.bulk_create([
+            ItemEntregado(data_entrega=solicitud, ayuda_tecnica=ayudas[(i + j) % len(ayudas)], cantidad=1)
+            for i, solicitud in enumerate(solicitudes)
+            for j in range(2)
+        ])
+
+    def urls(self, endpoint, options):
+        if options['cached']:
+            return [endpoint] * options['requests']
+        # Un parámetro distinto por petición evita la caché de respuestas
+        return [f'{endpoint}&_={i}' for i in range(options['requests'])]
+
+    def run_wsgi(self, urls, concurrency):
+        def get(url):
+            start = time.perf_counter()
+            response = Client().get(url)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(get, urls))
+        return results, time.perf_counter() - start
+
+    def run_asgi(self, urls, concurrency):
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def get(url):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(url)
+                    return time.perf_counter() - start, response.status_code
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(get(url) for url in urls))
+            return results, time.perf_counter() - start
+
+        return asyncio.run(main())
+
+    def report(self, mode, endpoint, results, elapsed):
+        latencies = sorted(latency for latency, _ in results)
+        codes = {}
+        for _, code in results:
+            codes[code] = codes.get(code, 0) + 1
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f'{mode}  {endpoint.split("?")[0]:<32} {len(results) / elapsed:8.1f} req/s  '
+            f'p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  status {codes}'
+        )
@@ -0,0 +1,88 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from form.models import DataEntrega
+from form.search import search_ids
+
+NOMBRES = ('José', 'María', 'Luis', 'Ana', 'Carlos', 'Rosa', 'Pedro', 'Carmen', 'Jesús', 'Yolanda', 'Andrés', 'Inés')
+APELLIDOS = ('Pérez', 'González', 'Rodríguez', 'Hernández', 'Martínez', 'Gómez', 'Díaz', 'Núñez', 'Peña', 'Ramírez')
+DIAGNOSTICOS = ('Parálisis cerebral', 'Diabetes', 'Hipertensión', 'Amputación', 'Artrosis', 'ACV', None)
+PALABRAS = ('sector', 'calle', 'avenida', 'barrio', 'casa', 'vereda', 'urbanización', 'edificio', 'carrera')
+
+QUERIES = ('jose perez', 'gonz', 'paralisis', 'andres marti', 'yolanda nunez diabetes', 'calle')
+
+INSERT_BATCH_SIZE = 20000
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la búsqueda de texto completo de entregas (FTS5) sobre una base de datos de prueba '
+        'desechable en archivo con --rows solicitudes sintéticas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Solicitudes de prueba')
+        parser.add_argument('--repeat', type=int, default=20, help='Repeticiones de cada consulta')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark_search.sqlite3')
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            start = time.perf_counter()
+            self.seed(options['rows'])
+            self.stdout.write(f'{options["rows"]} solicitudes indexadas en {time.perf_counter() - start:.1f} s')
+            for q in QUERIES:
+                self.measure(q, {}, options['repeat'])
+            self.measure('jose', {'status': 'APROBADO'}, options['repeat'])
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def seed(self, rows):
+        rng = random.Random(0)
+        fecha = timezone.now()
+        columns = ['name', 'lastname', 'resident', 'identification', 'phone', 'diagnostic', 'direction',
+                   'observation', 'state', 'municipality', 'parish', 'applicant_active', 'fecha', 'status']
+        sql = (
+            f'INSERT INTO {DataEntrega._meta.db_table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})'
+        )
+        statuses = [code for code, _ in DataEntrega.STATUS_CHOICES]
+        with transaction.atomic(), connection.cursor() as cursor:
+            for offset in range(0, rows, INSERT_BATCH_SIZE):
+                cursor.executemany(sql, [
+                    (
+                        rng.choice(NOMBRES), f'{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}', 'V', str(10000000 + i),
+                        '0414', rng.choice(DIAGNOSTICOS),
+                        f'{rng.choice(PALABRAS)} {rng.randint(1, 500)} {rng.choice(PALABRAS)}',
+                        rng.choice((None, f'Observación {rng.choice(PALABRAS)} {i}')),
+                        'Zulia', 'Maracaibo', 'Parroquia', False, fecha, rng.choice(statuses),
+                    )
+                    for i in range(offset, min(offset + INSERT_BATCH_SIZE, rows))
+                ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def measure(self, q, params, repeat):
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = DataEntrega.objects.filter(**params) if params else None
+            ids, total = search_ids(q, queryset, limit=25)
+            latencies.append(time.perf_counter() - start)
+        label = f'{q}' + (f' ({params})' if params else '')
+        self.stdout.write(
+            f'{label:<36} p50 {statistics.median(latencies) * 1000:7.2f} ms  '
+            f'max {max(latencies) * 1000:7.2f} ms  resultados {len(ids)} de {total}'
+        )
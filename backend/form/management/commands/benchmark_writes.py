@@ -0,0 +1,99 @@
+import itertools
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from form.models import AyudaTecnica, DataEntrega, ItemEntregado
+from form.Serializers import DataEntregaSerializer
+
+# Una cédula distinta por solicitud, para no chocar con la verificación de duplicados
+IDENTIFICATIONS = itertools.count(10000000)
+
+AYUDAS = ('SILLA DE RUEDAS', 'MULETAS AXIL', 'BASTON', 'ANDADERA', 'COLCHON ANTIESCARAS')
+
+
+def payload(items):
+    return {
+        'name': 'Nombre', 'lastname': 'Apellido', 'resident': 'V', 'identification': str(next(IDENTIFICATIONS)),
+        'phone': '04140000000', 'direction': 'Dirección', 'state': 'Zulia', 'municipality': 'Maracaibo',
+        'parish': 'Parroquia', 'items': [{'tipo': AYUDAS[i % len(AYUDAS)], 'cantidad': 1} for i in range(items)],
+    }
+
+
+def create_batched(data):
+    serializer = DataEntregaSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+
+
+def create_per_row(data):
+    """
+    La escritura anterior de DataEntregaSerializer.create: autocommit, una
+    consulta por `tipo` y un INSERT (y un commit) por item. Sirve de referencia.
+    """
+    data = dict(data)
+    items = data.pop('items')
+    entrega = DataEntrega.objects.create(**data)
+    for item in items:
+        ItemEntregado.objects.create(
+            data_entrega=entrega,
+            ayuda_tecnica=AyudaTecnica.objects.get(nombre=item['tipo']),
+            cantidad=item['cantidad']
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia de crear una solicitud (POST /api/ayudas-tecnicas-externos/) según la '
+        'cantidad de items: escritura fila por fila anterior, DataEntregaSerializer actual y la '
+        'petición completa, sobre una base de datos de prueba desechable en archivo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Solicitudes por cantidad de items')
+        parser.add_argument(
+            '--items', default='1,5,20,50', help='Cantidades de items por solicitud, separadas por coma'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # En archivo, para que cada commit pague su escritura en disco como en producción
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark_writes.sqlite3')
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            AyudaTecnica.objects.bulk_create([AyudaTecnica(nombre=nombre) for nombre in AYUDAS])
+            client = APIClient()
+            for items in [int(value) for value in options['items'].split(',')]:
+                def post():
+                    response = client.post('/api/ayudas-tecnicas-externos/', payload(items), format='json')
+                    assert response.status_code == 201, response.data
+
+                self.report('per-row', items, self.measure(lambda: create_per_row(payload(items)), options['requests']))
+                self.report('batched', items, self.measure(lambda: create_batched(payload(items)), options['requests']))
+                self.report('endpoint', items, self.measure(post, options['requests']))
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def measure(self, write, total):
+        latencies = []
+        for _ in range(total):
+            start = time.perf_counter()
+            write()
+            latencies.append(time.perf_counter() - start)
+        return sorted(latencies)
+
+    def report(self, mode, items, latencies):
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f'{mode:<8} {items:4d} items  p50 {statistics.median(latencies) * 1000:7.2f} ms  '
+            f'p95 {p95 * 1000:7.2f} ms'
+        )
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from form.catalog import normalize_nombre
 from form.models import AyudaTecnica
 from django.db import IntegrityError
 
@@ -28,35 +29,18 @@ class Command(BaseCommand):
             "PAÑALES",
         ]
 
-        # También añadimos versiones sin tildes para compatibilidad
-        ayudas_tecnicas_sin_tildes = [
-            "PANALES DE ADULTO",
-            "PANALES DE NINO",
-            "CENTRO DE CAMAS",
-            "COLCHON ANTI-ESCARAS",
-            "TENSIOMETRO",
-            "NEBULIZADOR",
-            "MULETAS AXIL",
-            "MULETAS CANA",
-            "BASTON DE 1 PUNTO",
-            "BASTON DE 4 PUNTOS",
-            "GLUCOMETRO",
-            "ANDADERA",
-            "SILLA DE RUEDAS EST.",
-            "SILLA DE RUEDAS CUA.",
-            "SILLA DE RUEDAS PED.",
-            "CANASTILLA DE NINO",
-            "CANASTILLA DE NINA",
-            "PANALES",
-        ]
-        
-        # Combinar ambas listas
-        todos_los_tipos = list(set(ayudas_tecnicas + ayudas_tecnicas_sin_tildes))
-        
+        # Las variantes sin tildes ("PANALES") no se crean: el catálogo las
+        # resuelve a estas mismas ayudas (form.catalog)
+        existentes = {normalize_nombre(nombre) for nombre in AyudaTecnica.objects.values_list('nombre', flat=True)}
+
         created_count = 0
         existing_count = 0
         
-        for nombre in todos_los_tipos:
+        for nombre in ayudas_tecnicas:
+            if normalize_nombre(nombre) in existentes:
+                self.stdout.write(self.style.WARNING(f'Ya existe: {nombre}'))
+                existing_count += 1
+                continue
             try:
                 AyudaTecnica.objects.create(nombre=nombre)
                 self.stdout.write(self.style.SUCCESS(f'Creado: {nombre}'))
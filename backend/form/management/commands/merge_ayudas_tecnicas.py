@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from form.catalog import merge_duplicates
+
+
+class Command(BaseCommand):
+    help = (
+        'Une las ayudas técnicas duplicadas que solo difieren en mayúsculas, tildes o puntuación '
+        '("PAÑALES"/"PANALES"): los items pasan a la ayuda canónica y las duplicadas se eliminan'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Mostrar los grupos sin modificar nada')
+
+    def handle(self, *args, **options):
+        groups = merge_duplicates(dry_run=options['dry_run'])
+        for canonical, duplicates in groups:
+            nombres = ', '.join(ayuda.nombre for ayuda in duplicates)
+            self.stdout.write(f'{canonical.nombre} (id {canonical.pk}) <- {nombres}')
+        accion = 'a unir' if options['dry_run'] else 'unidas'
+        self.stdout.write(self.style.SUCCESS(
+            f'Ayudas duplicadas {accion}: {sum(len(duplicates) for _, duplicates in groups)}'
+        ))
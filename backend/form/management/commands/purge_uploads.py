@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from form.uploads import purge_uploads
+
+
+class Command(BaseCommand):
+    help = 'Elimina las subidas por partes vencidas que no se asociaron a ninguna entrega (ejecutar periódicamente)'
+
+    def handle(self, *args, **options):
+        deleted = purge_uploads()
+        self.stdout.write(self.style.SUCCESS(f'Subidas eliminadas: {deleted}'))
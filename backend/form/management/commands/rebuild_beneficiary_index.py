@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from form.beneficiaries import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el índice de cédulas normalizadas (BeneficiaryIndex) a partir de DataEntrega; '
+        'necesario tras cargas masivas que no envían señales'
+    )
+
+    def handle(self, *args, **options):
+        written = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Filas del índice: {written}'))
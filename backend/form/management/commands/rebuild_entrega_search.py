@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from form import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el índice de texto completo de las entregas (tabla FTS5 entrega_search) y '
+        'restaura sus triggers si faltan; con --optimize compacta el índice'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--optimize', action='store_true', help='Compactar el índice después de reconstruirlo')
+
+    def handle(self, *args, **options):
+        if not search.is_supported(connection):
+            raise CommandError('La búsqueda de texto completo requiere SQLite (FTS5)')
+        if not search.install(connection):
+            search.rebuild(connection)
+        if options['optimize']:
+            search.optimize(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {search.SEARCH_TABLE}')
+            total = cursor.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(f'Índice de búsqueda reconstruido: {total} entregas'))
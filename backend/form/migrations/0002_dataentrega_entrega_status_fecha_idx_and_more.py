@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('form', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dataentrega',
+            index=models.Index(fields=['status', 'fecha'], name='entrega_status_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataentrega',
+            index=models.Index(fields=['fecha'], name='entrega_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataentrega',
+            index=models.Index(fields=['identification'], name='entrega_identification_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataentrega',
+            index=models.Index(fields=['state', 'municipality', 'parish'], name='entrega_ubicacion_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 08:36
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('form', '0002_dataentrega_entrega_status_fecha_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('completed', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'Upload_Session',
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-18 08:45
+
+import django.db.models.deletion
+import re
+
+from django.db import migrations, models
+
+# Copias de form.beneficiaries (las migraciones no deben depender del código actual)
+ROLE_FIELDS = {
+    'beneficiario': 'identification',
+    'solicitante': 'identificationApplicant',
+    'referente_persona': 'identificationRefererPerson',
+    'referente_organizacion': 'identificationRefererOrganization',
+    'referente_asociacion': 'identificationRefererAssociation',
+}
+
+
+def build_beneficiary_index(apps, schema_editor):
+    DataEntrega = apps.get_model('form', 'DataEntrega')
+    BeneficiaryIndex = apps.get_model('form', 'BeneficiaryIndex')
+    rows = []
+    for entrega in DataEntrega.objects.only('id', 'fecha', *ROLE_FIELDS.values()).iterator(chunk_size=1000):
+        for role, field in ROLE_FIELDS.items():
+            value = getattr(entrega, field)
+            identification = re.sub(r'\D+', '', str(value)).lstrip('0') if value is not None else ''
+            if identification:
+                rows.append(BeneficiaryIndex(
+                    entrega_id=entrega.pk, identification=identification, role=role, fecha=entrega.fecha
+                ))
+    BeneficiaryIndex.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('form', '0003_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BeneficiaryIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identification', models.CharField(max_length=20)),
+                ('role', models.CharField(choices=[('beneficiario', 'Beneficiario'), ('solicitante', 'Solicitante'), ('referente_persona', 'Persona que refiere'), ('referente_organizacion', 'Organización que refiere'), ('referente_asociacion', 'Asociación que refiere')], max_length=30)),
+                ('fecha', models.DateTimeField()),
+                ('entrega', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='beneficiary_keys', to='form.dataentrega')),
+            ],
+            options={
+                'db_table': 'Beneficiary_Index',
+                'indexes': [models.Index(fields=['identification', 'fecha'], name='beneficiary_ident_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entrega', 'role'), name='beneficiary_entrega_role_uniq')],
+            },
+        ),
+        migrations.RunPython(build_beneficiary_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 08:47
+
+from django.db import migrations
+
+# Copia del esquema de form.search en el momento de esta migración
+COLUMNS = ', '.join(f'"{column}"' for column in (
+    'name', 'lastname', 'nameApplicant', 'lastnameApplicant', 'nameRefererPerson',
+    'nameRefererOrganization', 'nameRefererAssociation', 'diagnostic', 'observation', 'direction',
+))
+
+
+def values(prefix):
+    return ', '.join(f'{prefix}{column.strip()}' for column in COLUMNS.split(','))
+
+
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS entrega_search USING fts5(" + COLUMNS + ", "
+    "content='form_dataentrega', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS entrega_search_ai AFTER INSERT ON form_dataentrega BEGIN "
+    "INSERT INTO entrega_search(rowid, " + COLUMNS + ") VALUES (new.id, " + values('new.') + "); END",
+    "CREATE TRIGGER IF NOT EXISTS entrega_search_ad AFTER DELETE ON form_dataentrega BEGIN "
+    "INSERT INTO entrega_search(entrega_search, rowid, " + COLUMNS + ") VALUES ('delete', old.id, " + values('old.') + "); END",
+    "CREATE TRIGGER IF NOT EXISTS entrega_search_au AFTER UPDATE OF " + COLUMNS + " ON form_dataentrega BEGIN "
+    "INSERT INTO entrega_search(entrega_search, rowid, " + COLUMNS + ") VALUES ('delete', old.id, " + values('old.') + "); "
+    "INSERT INTO entrega_search(rowid, " + COLUMNS + ") VALUES (new.id, " + values('new.') + "); END",
+    "INSERT INTO entrega_search(entrega_search) VALUES ('rebuild')",
+]
+
+DROP_STATEMENTS = [
+    'DROP TRIGGER IF EXISTS entrega_search_ai',
+    'DROP TRIGGER IF EXISTS entrega_search_ad',
+    'DROP TRIGGER IF EXISTS entrega_search_au',
+    'DROP TABLE IF EXISTS entrega_search',
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # FTS5 solo existe en SQLite; en otras bases form.search usa icontains
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('form', '0004_beneficiaryindex'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_STATEMENTS), run(DROP_STATEMENTS)),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 09:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('form', '0005_entrega_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_REVISION', 'En Revisión'), ('APROBADO', 'Aprobado'), ('RECHAZADO', 'Rechazado'), ('ENTREGADO', 'Entregado')], max_length=20)),
+                ('to_status', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_REVISION', 'En Revisión'), ('APROBADO', 'Aprobado'), ('RECHAZADO', 'Rechazado'), ('ENTREGADO', 'Entregado')], max_length=20)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('seconds_in_from', models.PositiveIntegerField()),
+                ('entrega', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='form.dataentrega')),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_transitions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'Status_Transition',
+                'indexes': [models.Index(fields=['entrega', 'created'], name='transition_entrega_idx'), models.Index(fields=['created', 'to_status', 'from_status', 'seconds_in_from'], name='transition_created_idx'), models.Index(fields=['user', 'created'], name='transition_user_created_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,8 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -53,7 +57,108 @@ class DataEntrega(models.Model):
         default='PENDIENTE',
         help_text='Estado actual de la solicitud'
     )
+
+    class Meta:
+        indexes = [
+            # Listado por estado ordenado por fecha (pantalla de pendientes)
+            models.Index(fields=['status', 'fecha'], name='entrega_status_fecha_idx'),
+            models.Index(fields=['fecha'], name='entrega_fecha_idx'),
+            models.Index(fields=['identification'], name='entrega_identification_idx'),
+            models.Index(fields=['state', 'municipality', 'parish'], name='entrega_ubicacion_idx'),
+        ]
+
 class ItemEntregado(models.Model):
     data_entrega = models.ForeignKey(DataEntrega, on_delete=models.CASCADE, related_name='items')
     ayuda_tecnica = models.ForeignKey(AyudaTecnica, on_delete=models.CASCADE)
     cantidad = models.PositiveIntegerField()
+
+
+class BeneficiaryIndex(models.Model):
+    """
+    Cédulas normalizadas (solo dígitos) de las personas de cada DataEntrega:
+    beneficiario, solicitante y referentes. Se mantiene con las señales de
+    form.signals y permite buscar el historial de una persona por índice.
+    """
+    ROLE_CHOICES = [
+        ('beneficiario', 'Beneficiario'),
+        ('solicitante', 'Solicitante'),
+        ('referente_persona', 'Persona que refiere'),
+        ('referente_organizacion', 'Organización que refiere'),
+        ('referente_asociacion', 'Asociación que refiere'),
+    ]
+
+    entrega = models.ForeignKey(DataEntrega, on_delete=models.CASCADE, related_name='beneficiary_keys')
+    identification = models.CharField(max_length=20)
+    role = models.CharField(max_length=30, choices=ROLE_CHOICES)
+    fecha = models.DateTimeField()  # Copia de DataEntrega.fecha: el historial se ordena sin JOIN
+
+    class Meta:
+        db_table = 'Beneficiary_Index'
+        constraints = [
+            models.UniqueConstraint(fields=['entrega', 'role'], name='beneficiary_entrega_role_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['identification', 'fecha'], name='beneficiary_ident_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.identification} ({self.role}) -> {self.entrega_id}"
+
+
+class StatusTransition(models.Model):
+    """
+    Registro de solo inserción de los cambios de status de una DataEntrega
+    (form.transitions): quién, cuándo, desde y hacia qué status.
+    seconds_in_from es el tiempo que la entrega pasó en from_status, así los
+    tiempos por status salen de un AVG sin emparejar filas del registro.
+    """
+    entrega = models.ForeignKey(DataEntrega, on_delete=models.CASCADE, related_name='transitions', db_index=False)
+    from_status = models.CharField(max_length=20, choices=DataEntrega.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=DataEntrega.STATUS_CHOICES)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='status_transitions', db_index=False
+    )
+    created = models.DateTimeField(default=timezone.now)
+    seconds_in_from = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = 'Status_Transition'
+        indexes = [
+            # Historial de una entrega y momento en que entró a su status actual
+            models.Index(fields=['entrega', 'created'], name='transition_entrega_idx'),
+            # Cubre el embudo y los tiempos por status de un rango de fechas: se leen sin tocar la tabla
+            models.Index(
+                fields=['created', 'to_status', 'from_status', 'seconds_in_from'], name='transition_created_idx'
+            ),
+            # Rendimiento por revisor
+            models.Index(fields=['user', 'created'], name='transition_user_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('StatusTransition es de solo inserción')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.entrega_id}: {self.from_status} -> {self.to_status}"
+
+
+class UploadSession(models.Model):
+    """
+    Subida por partes de un archivo adjunto (form.uploads). El archivo se
+    guarda en el directorio de staging hasta que se asocia a una DataEntrega.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()  # Tamaño total declarado al iniciar la subida
+    received = models.PositiveBigIntegerField(default=0)  # Bytes recibidos (offset de la siguiente parte)
+    content_type = models.CharField(max_length=100, blank=True)  # Detectado al completar la subida
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    completed = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'Upload_Session'
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
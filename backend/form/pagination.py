@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class EntregaCursorPagination(CursorPagination):
+    """
+    Paginación por cursor para el listado de entregas, de la más reciente a la más antigua.
+    El cursor guarda la última fecha vista, por lo que cada página cuesta lo mismo
+    sin importar cuántas solicitudes se hayan acumulado.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-fecha', '-id')
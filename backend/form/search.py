@@ -0,0 +1,222 @@
+"""
+Búsqueda de texto completo sobre DataEntrega con SQLite FTS5.
+
+entrega_search es una tabla FTS5 de contenido externo: indexa columnas de
+form_dataentrega sin duplicar el texto, y los triggers la mantienen al día
+en cualquier INSERT/UPDATE/DELETE, también los de bulk_create() y update().
+El tokenizador unicode61 con remove_diacritics ignora mayúsculas y tildes
+("jose" encuentra "José"); la última palabra buscada puede ser un prefijo.
+
+Django recrea la tabla (y pierde sus triggers) al alterar algunas columnas
+en SQLite; install() se ejecuta después de cada migrate y los restaura,
+reconstruyendo el índice si faltaban. En otras bases de datos la búsqueda
+usa icontains.
+"""
+import functools
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .catalog import normalize_nombre
+
+SEARCH_TABLE = 'entrega_search'
+CONTENT_TABLE = 'form_dataentrega'
+
+# Columna -> peso en el orden de relevancia: coincidir en el nombre pesa más que en la dirección
+SEARCH_COLUMNS = {
+    'name': 10.0,
+    'lastname': 10.0,
+    'nameApplicant': 5.0,
+    'lastnameApplicant': 5.0,
+    'nameRefererPerson': 5.0,
+    'nameRefererOrganization': 5.0,
+    'nameRefererAssociation': 5.0,
+    'diagnostic': 3.0,
+    'observation': 1.0,
+    'direction': 1.0,
+}
+
+TRIGGER_NAMES = ('entrega_search_ai', 'entrega_search_ad', 'entrega_search_au')
+
+# Coincidencias más recientes que se ordenan por relevancia: ordenar todas
+# crecería con la cantidad de coincidencias (un nombre común en un millón de
+# solicitudes); así el costo de cada búsqueda queda acotado.
+RANK_WINDOW = 200
+
+# Palabras de la consulta que se usan como máximo
+MAX_TERMS = 8
+
+
+def _columns(prefix=''):
+    return ', '.join(f'{prefix}"{column}"' for column in SEARCH_COLUMNS)
+
+
+def schema_statements():
+    columns = _columns()
+    return [
+        # prefix='2 3': índices de prefijo para que "jo*" no recorra todo el vocabulario
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({columns}, "
+        f"content='{CONTENT_TABLE}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS entrega_search_ai AFTER INSERT ON {CONTENT_TABLE} BEGIN "
+        f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) VALUES (new.id, {_columns('new.')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS entrega_search_ad AFTER DELETE ON {CONTENT_TABLE} BEGIN "
+        f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {_columns('old.')}); END",
+        # Solo cuando cambia una columna indexada: los cambios de status no tocan el índice
+        f"CREATE TRIGGER IF NOT EXISTS entrega_search_au AFTER UPDATE OF {columns} ON {CONTENT_TABLE} BEGIN "
+        f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {_columns('old.')}); "
+        f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) VALUES (new.id, {_columns('new.')}); END",
+    ]
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(using=connection):
+    """
+    Recreate the triggers if they are missing (the FTS table itself comes
+    from a migration) and rebuild the index. Returns True if it rebuilt.
+    """
+    if not is_supported(using):
+        return False
+    with using.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = set(cursor.fetchall())
+        # Sin la tabla FTS la migración que la crea todavía no se aplicó
+        if ('table', SEARCH_TABLE) not in existing or ('table', CONTENT_TABLE) not in existing:
+            return False
+        if all(('trigger', name) in existing for name in TRIGGER_NAMES):
+            return False
+        for statement in schema_statements():
+            cursor.execute(statement)
+    rebuild(using)
+    return True
+
+
+def rebuild(using=connection):
+    """
+    Rebuild the whole index from form_dataentrega
+    """
+    with using.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def optimize(using=connection):
+    """
+    Merge the index b-trees (faster queries after many writes)
+    """
+    with using.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def search_terms(text):
+    """
+    'José  Pérez-G.' -> ['jose', 'perez', 'g'] (same folding as the FTS tokenizer)
+    """
+    return normalize_nombre(text or '').split()[:MAX_TERMS]
+
+
+def match_expression(terms, prefix=False):
+    """
+    ['jose', 'per'] -> '"jose" "per"*' with prefix=True (only the last term is
+    a prefix). Quoting keeps FTS5 operators in the user's text from being
+    interpreted.
+    """
+    expression = ' '.join(f'"{term}"' for term in terms)
+    return expression + '*' if prefix else expression
+
+
+def _match_ids(expression, queryset):
+    """
+    Ids of the RANK_WINDOW most recent entregas that match
+    """
+    sql = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    params = [expression]
+    if queryset is not None and queryset.query.where:
+        # EXISTS correlacionado: el filtro se evalúa solo para las filas que
+        # salen del MATCH. Con "rowid IN (...)" SQLite pasaría el IN a la tabla
+        # FTS y repetiría la búsqueda por cada rowid candidato.
+        subquery, subquery_params = (
+            queryset.filter(id=RawSQL(f'{SEARCH_TABLE}.rowid', ())).values('id').query.sql_with_params()
+        )
+        sql += f" AND EXISTS ({subquery})"
+        params.extend(subquery_params)
+    # FTS5 entrega las coincidencias por rowid descendente sin ordenarlas
+    sql += " ORDER BY rowid DESC LIMIT %s"
+    params.append(RANK_WINDOW)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokens(value):
+    # Nombres, apellidos y diagnósticos se repiten mucho entre solicitudes
+    return frozenset(normalize_nombre(value).split())
+
+
+def _rank(ids, terms, prefix):
+    """
+    Order ids by the weight of the columns where the terms appear, newest
+    first on ties. Every candidate contains all the terms, so bm25()'s
+    inverse document frequency would not change the order; it would only add
+    a pass over the full doclist of every term.
+    """
+    from .models import DataEntrega
+
+    def matches(term, tokens, is_prefix):
+        return any(token.startswith(term) for token in tokens) if is_prefix else term in tokens
+
+    scores = {}
+    for row in DataEntrega.objects.filter(id__in=ids).values_list('id', *SEARCH_COLUMNS):
+        score = 0.0
+        for (column, weight), value in zip(SEARCH_COLUMNS.items(), row[1:]):
+            if not value:
+                continue
+            tokens = _tokens(value)
+            score += weight * sum(
+                matches(term, tokens, prefix and i == len(terms) - 1) for i, term in enumerate(terms)
+            )
+        scores[row[0]] = score
+    return sorted(ids, key=lambda pk: (-scores.get(pk, 0), -pk))
+
+
+def search_ids(text, queryset=None, limit=25, offset=0):
+    """
+    (ids, total) of the entregas that match every word of `text`, most
+    relevant first. Candidates are the RANK_WINDOW most recent matches, so
+    total is at most RANK_WINDOW. Whole words are tried first; when they
+    match fewer than RANK_WINDOW entregas the last word is also searched as
+    a prefix ("jose per" finds "José Pérez"). The candidates do not depend
+    on limit/offset, so pages never overlap. `queryset` (e.g.
+    filter_entregas(...)) restricts the candidates.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return [], 0
+    if not is_supported():
+        return _search_ids_fallback(terms, queryset, limit, offset)
+
+    # Las palabras completas recorren el índice en orden y se detienen en
+    # RANK_WINDOW; un prefijo obliga a FTS5 a unir todas sus coincidencias
+    prefix = False
+    ids = _match_ids(match_expression(terms), queryset)
+    if len(ids) < RANK_WINDOW:
+        prefix = True
+        ids = _match_ids(match_expression(terms, prefix=True), queryset)
+    return _rank(ids, terms, prefix)[offset:offset + limit], len(ids)
+
+
+def _search_ids_fallback(terms, queryset, limit, offset):
+    from .models import DataEntrega
+
+    queryset = DataEntrega.objects.all() if queryset is None else queryset
+    for term in terms:
+        condition = Q()
+        for column in SEARCH_COLUMNS:
+            condition |= Q(**{f'{column}__icontains': term})
+        queryset = queryset.filter(condition)
+    ids = list(queryset.order_by('-fecha', '-id').values_list('id', flat=True)[:RANK_WINDOW])
+    return ids[offset:offset + limit], len(ids)
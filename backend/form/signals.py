@@ -0,0 +1,35 @@
+import logging
+
+from django.db import connections
+from django.db.models.signals import post_migrate, post_save
+from django.dispatch import receiver
+
+from . import search
+from .beneficiaries import ROLE_FIELDS, index_entrega
+from .models import DataEntrega
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = {'fecha', *ROLE_FIELDS.values()}
+
+
+@receiver(post_save, sender=DataEntrega)
+def update_beneficiary_index(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Mantener BeneficiaryIndex en la misma transacción que el guardado de la entrega
+    """
+    if raw:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    index_entrega(instance, created=created)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using='default', **kwargs):
+    """
+    Al alterar columnas, el editor de esquemas de SQLite recrea form_dataentrega
+    y se pierden los triggers de búsqueda: volver a crearlos después de migrate
+    """
+    if sender.name == 'form' and search.install(connections[using]):
+        logger.info('Triggers de búsqueda de entregas restaurados; índice reconstruido')
@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from core.cache import DEFAULT_TIMEOUT, shared_cache, versioned_key
+from jobs.queue import enqueue
+from .filters import ENTREGA_FILTER_FIELDS, filter_entregas
+from .models import DataEntrega, ItemEntregado
+
+# Funciones de truncado de fecha disponibles para ?periodo=
+PERIODOS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _por_estado(queryset):
+    counts = {code: 0 for code, _ in DataEntrega.STATUS_CHOICES}
+    for row in queryset.values('status').annotate(total=Count('id')).order_by():
+        counts[row['status']] = row['total']
+    return counts
+
+
+def _por_periodo(queryset, periodo):
+    """
+    Solicitudes por periodo de fecha, con el desglose por estado de cada periodo
+    """
+    buckets = {}
+    rows = (
+        queryset.annotate(periodo=PERIODOS[periodo]('fecha'))
+        .values('periodo', 'status')
+        .annotate(total=Count('id'))
+        .order_by('periodo')
+    )
+    for row in rows:
+        key = row['periodo'].date().isoformat()
+        bucket = buckets.setdefault(key, {'periodo': key, 'total': 0, 'por_estado': {}})
+        bucket['total'] += row['total']
+        bucket['por_estado'][row['status']] = row['total']
+    return list(buckets.values())
+
+
+def _por_ayuda_tecnica(queryset):
+    rows = (
+        ItemEntregado.objects.filter(data_entrega__in=queryset.values('id'))
+        .values('ayuda_tecnica__nombre')
+        .annotate(cantidad=Sum('cantidad'), solicitudes=Count('data_entrega', distinct=True))
+        .order_by('-cantidad')
+    )
+    return [
+        {'ayuda_tecnica': row['ayuda_tecnica__nombre'], 'cantidad': row['cantidad'], 'solicitudes': row['solicitudes']}
+        for row in rows
+    ]
+
+
+def _por_ubicacion(queryset):
+    rows = (
+        queryset.values('state', 'municipality')
+        .annotate(total=Count('id'))
+        .order_by('state', 'municipality')
+    )
+    return [
+        {'state': row['state'], 'municipality': row['municipality'], 'total': row['total']}
+        for row in rows
+    ]
+
+
+def compute_stats(params, periodo='month'):
+    """
+    Estadísticas de DataEntrega agrupadas en SQL (sin traer filas al proceso).
+    Acepta los mismos filtros que el listado de entregas.
+    """
+    queryset = filter_entregas(DataEntrega.objects.all(), params)
+    por_estado = _por_estado(queryset)
+    return {
+        'total': sum(por_estado.values()),
+        'por_estado': por_estado,
+        'periodo': periodo,
+        'por_periodo': _por_periodo(queryset, periodo),
+        'por_ayuda_tecnica': _por_ayuda_tecnica(queryset),
+        'por_ubicacion': _por_ubicacion(queryset),
+    }
+
+
+def get_stats(params, periodo='month'):
+    """
+    compute_stats() con caché por combinación de filtros.
+    La clave incluye la versión del namespace 'entregas', así que cualquier
+    cambio en DataEntrega/ItemEntregado descarta los resultados guardados.
+    """
+    filtros = sorted(
+        (name, params.get(name))
+        for name in (*ENTREGA_FILTER_FIELDS, 'fecha_desde', 'fecha_hasta')
+        if params.get(name)
+    )
+    key = versioned_key('estadisticas', ['entregas'], periodo, filtros)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(params, periodo)
+        cache.set(key, stats, DEFAULT_TIMEOUT)
+    return stats
+
+
+def refresh_stats():
+    """
+    Recalcular en segundo plano (jobs.queue) las estadísticas sin filtros de
+    cada periodo, para que el tablero no pague el GROUP BY después de cada
+    nueva solicitud.
+    """
+    for periodo in PERIODOS:
+        get_stats({}, periodo)
+
+
+def schedule_refresh():
+    """
+    Encolar refresh_stats() después de un cambio en las entregas, solo si la
+    caché es compartida: con locmem el worker de jobs calentaría únicamente su
+    propia caché y get_stats() recalcula de todas formas en la siguiente lectura.
+    """
+    if shared_cache():
+        enqueue(refresh_stats, unique=True)
@@ -1,3 +1,612 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.query_plans import capture_queries, full_table_scans
+from .Serializers import DataEntregaSerializer
+from .async_views import entregas_list, entregas_stats
+from .beneficiaries import DuplicateEntrega, normalize_identification
+from . import search
+from .transitions import transition, transition_stats
+from .uploads import UploadError, attach_upload, staging_path
+from .catalog import catalog, get_catalog, merge_duplicates, normalize_nombre
+from accounts.models import User
+from jobs.models import Job
+from .models import AyudaTecnica, DataEntrega, ItemEntregado, StatusTransition, UploadSession
+
+
+def crear_entrega_prueba(**kwargs):
+    datos = {
+        'name': 'Ana', 'lastname': 'Pérez', 'resident': 'V', 'identification': '12345678',
+        'phone': '04140000000', 'direction': 'Calle 1', 'state': 'Zulia',
+        'municipality': 'Maracaibo', 'parish': 'Olegario Villalobos',
+    }
+    datos.update(kwargs)
+    return DataEntrega.objects.create(**datos)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN checks are SQLite specific')
+class EntregaQueryPlanTests(TestCase):
+    """
+    Las consultas del listado y la exportación de entregas no deben recorrer tablas completas.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        muletas = AyudaTecnica.objects.create(nombre='MULETAS AXIL')
+        for i in range(50):
+            entrega = crear_entrega_prueba(
+                identification=str(10000000 + i),
+                status='PENDIENTE' if i % 2 else 'APROBADO',
+                state='Zulia' if i % 3 else 'Lara',
+            )
+            ItemEntregado.objects.create(data_entrega=entrega, ayuda_tecnica=muletas, cantidad=1)
+
+    def setUp(self):
+        # Sin respuestas en caché para que cada petición llegue a la base de datos
+        cache.clear()
+        self.client = APIClient()
+
+    def assertNoFullScans(self, url, allowed_tables=()):
+        with capture_queries() as queries:
+            response = self.client.get(url)
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries)
+        self.assertEqual(full_table_scans(queries, allowed_tables), [])
+
+    def test_list_filters(self):
+        for params in ('status=PENDIENTE', 'identification=10000001', 'state=Zulia',
+                       'state=Zulia&municipality=Maracaibo&parish=Olegario Villalobos',
+                       'fecha_desde=2020-01-01&fecha_hasta=2100-01-01'):
+            with self.subTest(params=params):
+                self.assertNoFullScans(f'/api/ayudas-tecnicas-externos/?paginated=1&{params}')
+
+    def test_list_next_page(self):
+        response = self.client.get('/api/ayudas-tecnicas-externos/?page_size=10&status=PENDIENTE')
+        self.assertNoFullScans(response.data['next'])
+
+    def test_export_filters(self):
+        self.assertNoFullScans('/api/entregas/exportar/?formato=ndjson&status=APROBADO')
+
+
+class EntregaExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        crear_entrega_prueba()
+
+    def export(self, formato):
+        response = self.client.get(f'/api/entregas/exportar/?formato={formato}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8-sig')
+
+    def test_csv_header_has_no_write_only_fields(self):
+        header = self.export('csv').splitlines()[0].split(',')
+        self.assertIn('identification', header)
+        for field in ('upload_id', 'permitir_duplicado'):
+            self.assertNotIn(field, header)
+        self.assertEqual(header, [
+            name for name, field in DataEntregaSerializer().fields.items() if not field.write_only
+        ])
+
+    def test_ndjson_rows_match_csv_header(self):
+        header = self.export('csv').splitlines()[0].split(',')
+        row = json.loads(self.export('ndjson').splitlines()[0])
+        self.assertEqual(list(row), header)
+
+
+class EntregaAsyncViewTests(TestCase):
+    """
+    Las vistas asíncronas devuelven lo mismo que las vistas DRF del mismo endpoint.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        muletas = AyudaTecnica.objects.create(nombre='MULETAS AXIL')
+        for i in range(5):
+            entrega = crear_entrega_prueba(identification=str(10000000 + i))
+            ItemEntregado.objects.create(data_entrega=entrega, ayuda_tecnica=muletas, cantidad=2)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    async def test_list(self):
+        url = '/api/ayudas-tecnicas-externos/?page_size=2'
+        response = await entregas_list(self.factory.get(url))
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['results'][0]['items'], [{'tipo': 'MULETAS AXIL', 'cantidad': 2}])
+
+        # La vista síncrona responde desde la misma entrada de caché
+        sync_response = await self.async_client.get(url)
+        self.assertEqual(sync_response['ETag'], response['ETag'])
+
+    async def test_same_body_as_sync_view(self):
+        url = '/api/ayudas-tecnicas-externos/'
+        await DataEntrega.objects.filter(identification='10000000').aupdate(archivo_adjunto='adjuntos/receta.pdf')
+        data = json.loads((await entregas_list(self.factory.get(url))).content)
+        await cache.aclear()
+        self.assertEqual(data, (await self.async_client.get(url)).json())
+        self.assertIn('http://testserver/', json.dumps(data))
+
+    async def test_invalid_params(self):
+        response = await entregas_list(self.factory.get('/api/ayudas-tecnicas-externos/?fecha_desde=ayer'))
+        self.assertEqual(response.status_code, 400)
+        response = await entregas_stats(self.factory.get('/api/entregas/estadisticas/?periodo=year'))
+        self.assertEqual(response.status_code, 400)
+
+
+class AdjuntoUploadTests(TestCase):
+    """
+    Subida por partes reanudable, asociación a la entrega y descarga por rangos.
+    """
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, UPLOAD_STAGING_DIR=f'{media_root}/.staging', UPLOAD_CHUNK_MAX_SIZE=1000,
+            ATTACHMENT_SERVE_MODE='django',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        AyudaTecnica.objects.create(nombre='MULETAS AXIL')
+        self.client = APIClient()
+        self.content = b'%PDF-1.4\n' + bytes(range(256)) * 10
+
+    def send_chunk(self, upload_id, offset, data):
+        return self.client.generic(
+            'PATCH', f'/api/uploads/{upload_id}/', data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_upload_attach_and_download(self):
+        response = self.client.post('/api/uploads/', {'filename': 'informe.pdf', 'size': len(self.content)},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        upload_id = str(response.data['id'])
+
+        for offset in range(0, len(self.content), 1000):
+            response = self.send_chunk(upload_id, offset, self.content[offset:offset + 1000])
+            self.assertEqual(response.status_code, 200)
+        # Reenviar una parte ya recibida no avanza el offset
+        self.assertEqual(self.send_chunk(upload_id, 0, self.content[:1000]).status_code, 409)
+        self.assertTrue(self.client.get(f'/api/uploads/{upload_id}/').data['complete'])
+
+        datos = {
+            'name': 'Ana', 'lastname': 'Pérez', 'resident': 'V', 'identification': '12345678',
+            'phone': '04140000000', 'direction': 'Calle 1', 'state': 'Zulia', 'municipality': 'Maracaibo',
+            'parish': 'Olegario Villalobos', 'items': [{'tipo': 'MULETAS AXIL', 'cantidad': 1}],
+            'upload_id': upload_id,
+        }
+        # El recálculo de estadísticas queda en la cola, no en la petición (solo con caché compartida);
+        # el archivo se mueve al hacer commit
+        with mock.patch('form.stats.shared_cache', return_value=True), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/ayudas-tecnicas-externos/', {'data': json.dumps(datos)},
+                                        format='multipart')
+        self.assertEqual(response.status_code, 201)
+        entrega_id = response.data['id']
+        self.assertTrue(Job.objects.filter(task='form.stats.refresh_stats').exists())
+
+        self.client.force_authenticate(User.objects.create(username='oac', email='oac@example.com',
+                                                           cedula='30000000', department='oac'))
+        response = self.client.get(f'/api/entregas/{entrega_id}/adjunto/', HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+    def test_rejected_uploads(self):
+        response = self.client.post('/api/uploads/', {'filename': 'programa.exe', 'size': 10}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/uploads/', {'filename': 'foto.png', 'size': 5}, format='json')
+        response = self.send_chunk(response.data['id'], 0, b'hello')
+        self.assertEqual(response.status_code, 400)
+
+
+    def completed_upload(self):
+        upload_id = self.client.post('/api/uploads/', {'filename': 'informe.pdf', 'size': len(self.content)},
+                                     format='json').data['id']
+        for offset in range(0, len(self.content), 1000):
+            self.send_chunk(upload_id, offset, self.content[offset:offset + 1000])
+        return UploadSession.objects.get(pk=upload_id)
+
+    def test_rollback_keeps_staged_upload(self):
+        upload = self.completed_upload()
+        datos = {
+            'name': 'Ana', 'lastname': 'Pérez', 'resident': 'V', 'identification': '12345678',
+            'phone': '04140000000', 'direction': 'Calle 1', 'state': 'Zulia', 'municipality': 'Maracaibo',
+            'parish': 'Olegario Villalobos', 'items': [{'tipo': 'MULETAS AXIL', 'cantidad': 1}],
+            'upload_id': str(upload.pk),
+        }
+        serializer = DataEntregaSerializer(data=datos)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        # Falla después de reclamar la subida y guardar el nombre del adjunto
+        with mock.patch('form.uploads.transaction.on_commit', side_effect=RuntimeError('disk full')), \
+                self.assertRaises(RuntimeError):
+            serializer.save()
+        self.assertTrue(UploadSession.objects.filter(pk=upload.pk).exists())
+        self.assertTrue(os.path.exists(staging_path(upload)))
+
+    def test_upload_claimed_once(self):
+        upload = self.completed_upload()
+        # Dos solicitudes validaron el mismo upload_id; la segunda llega después de la primera
+        with self.captureOnCommitCallbacks(execute=True):
+            attach_upload(crear_entrega_prueba(), upload)
+        with self.assertRaises(UploadError) as error:
+            attach_upload(crear_entrega_prueba(identification='87654321'), upload)
+        self.assertEqual(error.exception.status, 409)
+
+
+class CrearEntregaTests(TestCase):
+    """
+    La entrega y sus items se escriben juntos, con un número fijo de consultas.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        AyudaTecnica.objects.bulk_create([AyudaTecnica(nombre=nombre) for nombre in ('BASTON', 'MULETAS AXIL')])
+
+    def datos(self, items):
+        return {
+            'name': 'Ana', 'lastname': 'Pérez', 'resident': 'V', 'identification': '12345678',
+            'phone': '04140000000', 'direction': 'Calle 1', 'state': 'Zulia', 'municipality': 'Maracaibo',
+            'parish': 'Olegario Villalobos',
+            'items': [{'tipo': ('BASTON', 'MULETAS AXIL')[i % 2], 'cantidad': 1} for i in range(items)],
+        }
+
+    def setUp(self):
+        # Los datos de setUpTestData se crearon con bulk_create, sin invalidar el catálogo
+        catalog.clear()
+        get_catalog()
+
+    def save(self, datos):
+        serializer = DataEntregaSerializer(data=datos)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save()
+
+    def test_queries_do_not_grow_with_items(self):
+        # Verificación de duplicados + INSERT de la entrega, de su fila en BeneficiaryIndex y de
+        # todos los items (+ SAVEPOINT/RELEASE en TestCase); los nombres se resuelven en memoria
+        with self.assertNumQueries(6):
+            self.save(self.datos(2))
+        with self.assertNumQueries(6):
+            entrega = self.save({**self.datos(40), 'identification': '87654321'})
+        self.assertEqual(entrega.items.count(), 40)
+
+    def test_unknown_tipo(self):
+        datos = self.datos(3)
+        datos['items'][1]['tipo'] = 'NO EXISTE'
+        serializer = DataEntregaSerializer(data=datos)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('tipo', serializer.errors['items'][1])
+
+    def test_failure_leaves_no_partial_rows(self):
+        with mock.patch.object(ItemEntregado.objects, 'bulk_create', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                self.save(self.datos(5))
+        self.assertFalse(DataEntrega.objects.exists())
+
+
+class AyudaCatalogTests(TestCase):
+    def setUp(self):
+        catalog.clear()
+        self.baston = AyudaTecnica.objects.create(nombre='BASTÓN DE 1 PUNTO')
+        self.baston_sin_tilde = AyudaTecnica.objects.create(nombre='BASTON DE 1 PUNTO')
+        self.silla = AyudaTecnica.objects.create(nombre='SILLA DE RUEDAS EST.')
+
+    def test_normalize(self):
+        self.assertEqual(normalize_nombre(' Colchón  ANTI-escaras '), 'colchon anti escaras')
+        self.assertEqual(normalize_nombre('PAÑALES'), normalize_nombre('panales'))
+
+    def test_resolves_variants_to_canonical_without_queries(self):
+        get_catalog()
+        with self.assertNumQueries(0):
+            snapshot = get_catalog()
+            self.assertEqual(snapshot.resolve('baston de 1 punto'), self.baston)
+            self.assertEqual(snapshot.resolve('BASTON DE 1 PUNTO'), self.baston)
+            self.assertEqual(snapshot.resolve('silla de ruedas est'), self.silla)
+            self.assertIsNone(snapshot.resolve('SILLA'))
+        self.assertEqual([ayuda.pk for ayuda in snapshot.ayudas], [self.baston.pk, self.silla.pk])
+
+    def test_refreshed_on_change(self):
+        self.assertIsNone(get_catalog().resolve('andadera'))
+        # La invalidación espera al commit
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            andadera = AyudaTecnica.objects.create(nombre='ANDADERA')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_catalog().resolve('Andadera'), andadera)
+
+    def test_sees_changes_from_other_processes(self):
+        snapshot = get_catalog()
+        # Otro proceso con su propia caché locmem: la versión del namespace de este no cambia
+        with mock.patch('form.catalog.namespace_version', return_value=snapshot.version):
+            andadera = AyudaTecnica.objects.create(nombre='ANDADERA')
+            self.assertIsNone(get_catalog().resolve('andadera'))
+            self.assertEqual(catalog.refresh_if_changed(snapshot).resolve('andadera'), andadera)
+            with mock.patch('form.catalog.time.monotonic', return_value=snapshot.loaded_at + 61):
+                self.assertIsNot(get_catalog(), snapshot)
+
+    def test_merge_duplicates(self):
+        entrega = crear_entrega_prueba()
+        item = ItemEntregado.objects.create(data_entrega=entrega, ayuda_tecnica=self.baston_sin_tilde, cantidad=2)
+        [(canonical, duplicates)] = merge_duplicates()
+        self.assertEqual((canonical, duplicates), (self.baston, [self.baston_sin_tilde]))
+        item.refresh_from_db()
+        self.assertEqual(item.ayuda_tecnica, self.baston)
+        self.assertFalse(AyudaTecnica.objects.filter(pk=self.baston_sin_tilde.pk).exists())
+
+
+class BeneficiaryIndexTests(TestCase):
+    def setUp(self):
+        catalog.clear()
+        cache.clear()
+        AyudaTecnica.objects.bulk_create([AyudaTecnica(nombre=nombre) for nombre in ('BASTON', 'ANDADERA')])
+        self.client = APIClient()
+
+    def crear(self, identification, tipos, **kwargs):
+        datos = {
+            'name': 'Ana', 'lastname': 'Pérez', 'resident': 'V', 'identification': identification,
+            'phone': '04140000000', 'direction': 'Calle 1', 'state': 'Zulia', 'municipality': 'Maracaibo',
+            'parish': 'Olegario Villalobos', 'items': [{'tipo': tipo, 'cantidad': 1} for tipo in tipos],
+        }
+        datos.update(kwargs)
+        return self.client.post('/api/ayudas-tecnicas-externos/', datos, format='json')
+
+    def test_normalize_identification(self):
+        for value in ('V-12.345.678', '012345678', ' 12 345 678 ', 12345678):
+            self.assertEqual(normalize_identification(value), '12345678')
+        self.assertEqual(normalize_identification('V-'), '')
+
+    def test_duplicate_submission(self):
+        primera = self.crear('V-12.345.678', ['BASTON', 'ANDADERA'])
+        self.assertEqual(primera.status_code, 201)
+        response = self.crear('12345678', ['ANDADERA', 'BASTON'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['duplicado_de'], primera.data['id'])
+        # Otras ayudas, o con confirmación explícita, sí se registran
+        self.assertEqual(self.crear('12345678', ['BASTON']).status_code, 201)
+        self.assertEqual(self.crear('12345678', ['ANDADERA', 'BASTON'], permitir_duplicado=True).status_code, 201)
+
+    def test_simultaneous_duplicates(self):
+        # Dos envíos idénticos (doble clic) validados antes de que cualquiera se guarde
+        datos = {
+            'name': 'Ana', 'lastname': 'Pérez', 'resident': 'V', 'identification': '12345678',
+            'phone': '04140000000', 'direction': 'Calle 1', 'state': 'Zulia', 'municipality': 'Maracaibo',
+            'parish': 'Olegario Villalobos', 'items': [{'tipo': 'BASTON', 'cantidad': 1}],
+        }
+        serializers = [DataEntregaSerializer(data=datos), DataEntregaSerializer(data=datos)]
+        self.assertTrue(all(serializer.is_valid() for serializer in serializers))
+        primera = serializers[0].save()
+        with self.assertRaises(DuplicateEntrega) as error:
+            serializers[1].save()
+        self.assertEqual(error.exception.entrega_id, primera.id)
+        self.assertEqual(DataEntrega.objects.count(), 1)
+
+    def test_history(self):
+        primera = self.crear('V-12345678', ['BASTON']).data['id']
+        segunda = self.crear('9876543', ['ANDADERA'], identificationApplicant='12.345.678').data['id']
+        self.crear('5555555', ['BASTON'])
+
+        self.client.force_authenticate(User.objects.create(username='oac', email='oac@example.com',
+                                                           cedula='30000000', department='oac'))
+        with capture_queries() as queries:
+            response = self.client.get('/api/beneficiarios/12345678/historial/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(entrega['id'], entrega['roles']) for entrega in response.data['entregas']],
+            [(segunda, ['solicitante']), (primera, ['beneficiario'])]
+        )
+        if connection.vendor == 'sqlite':
+            self.assertEqual(full_table_scans(queries), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 is SQLite specific')
+class EntregaSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.jose = crear_entrega_prueba(name='José', lastname='Pérez', diagnostic='Parálisis cerebral')
+        cls.maria = crear_entrega_prueba(name='María', lastname='González', observation='Vive con José, su hijo',
+                                         status='APROBADO')
+        # bulk_create no envía señales, pero los triggers sí se ejecutan
+        DataEntrega.objects.bulk_create([
+            DataEntrega(name='Pedro', lastname='Pañalver', resident='V', identification='1', phone='1',
+                        direction='Sector Los Pañales', state='Lara', municipality='Iribarren', parish='Concepción')
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='oac', email='oac@example.com',
+                                                           cedula='30000000', department='oac'))
+
+    def buscar(self, q, **params):
+        response = self.client.get('/api/entregas/buscar/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [entrega['id'] for entrega in response.data['results']]
+
+    def test_accents_prefix_and_ranking(self):
+        # El nombre pesa más que la observación
+        self.assertEqual(self.buscar('jose'), [self.jose.id, self.maria.id])
+        # Solo la última palabra se busca como prefijo
+        self.assertEqual(self.buscar('JOSÉ PER'), [self.jose.id])
+        self.assertEqual(self.buscar('jos perez'), [])
+        self.assertEqual(self.buscar('paralisis'), [self.jose.id])
+        self.assertEqual(len(self.buscar('panal')), 1)
+        self.assertEqual(self.buscar('jose', status='APROBADO'), [self.maria.id])
+        # Los operadores de FTS5 en el texto del usuario no rompen la consulta
+        self.assertEqual(self.buscar('"jose" OR NEAR('), [])
+
+    def test_pages_come_from_one_candidate_set(self):
+        # Página 1 y 2 salen del mismo conjunto ordenado aunque limit+offset cambie
+        self.assertEqual(self.buscar('jose', limit=1) + self.buscar('jose', limit=1, offset=1), self.buscar('jose'))
+        response = self.client.get('/api/entregas/buscar/', {'q': 'jose', 'limit': 1})
+        self.assertEqual((response.data['total'], response.data['window']), (2, search.RANK_WINDOW))
+        response = self.client.get('/api/entregas/buscar/', {'q': 'jose', 'offset': search.RANK_WINDOW})
+        self.assertEqual(response.status_code, 400)
+
+    def test_index_follows_updates_and_deletes(self):
+        DataEntrega.objects.filter(pk=self.jose.pk).update(name='Josefina')
+        self.assertEqual(self.buscar('josefina'), [self.jose.id])
+        DataEntrega.objects.filter(pk=self.maria.pk).delete()
+        self.assertEqual(self.buscar('jose'), [self.jose.id])
+
+    def test_install_restores_missing_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER entrega_search_ai')
+        self.assertTrue(search.install())
+        self.assertFalse(search.install())
+        crear_entrega_prueba(name='Rigoberto')
+        self.assertEqual(len(self.buscar('rigo')), 1)
+
+
+class StatusTransitionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.revisor = User.objects.create(username='revisor', email='revisor@example.com',
+                                           cedula='30000001', department='oac')
+        self.entregas = [crear_entrega_prueba(identification=str(20000000 + i)) for i in range(3)]
+
+    def test_single_transition_is_validated_and_logged(self):
+        entrega = self.entregas[0]
+        url = f'/api/entregas/{entrega.id}/status/'
+        # Sin sesión no se lee ni se escribe el registro
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.patch(url, {'status': 'EN_REVISION'}, format='json').status_code, 401)
+
+        self.client.force_authenticate(self.revisor)
+        self.assertEqual(self.client.patch(url, {'status': 'ENTREGADO'}, format='json').status_code, 409)
+        self.assertEqual(self.client.patch(url, {'status': 'OTRO'}, format='json').status_code, 400)
+        response = self.client.patch(url, {'status': 'EN_REVISION'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'status': 'EN_REVISION'})
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['permitidos'], ('APROBADO', 'RECHAZADO', 'PENDIENTE'))
+        [log] = response.data['transiciones']
+        self.assertEqual((log['from_status'], log['to_status'], log['user__username']),
+                         ('PENDIENTE', 'EN_REVISION', 'revisor'))
+        # El registro no se modifica
+        with self.assertRaises(ValueError):
+            StatusTransition.objects.get().save()
+
+    def test_bulk_transition(self):
+        entregada = self.entregas[2]
+        for nuevo in ('EN_REVISION', 'APROBADO', 'ENTREGADO'):
+            transition([entregada.id], nuevo)
+        ids = [entrega.id for entrega in self.entregas]
+
+        self.client.force_authenticate(self.revisor)
+        # Lectura de status, última transición, UPDATE e INSERT del registro (más
+        # SAVEPOINT/RELEASE); con la caché locmem no se encola refresh_stats
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/entregas/status/', {'ids': ids + [999], 'status': 'EN_REVISION'},
+                                        format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['actualizadas'], ids[:2])
+        self.assertEqual(set(response.data['errores']), {entregada.id, 999})
+        self.assertEqual(DataEntrega.objects.filter(status='EN_REVISION').count(), 2)
+        self.assertEqual(StatusTransition.objects.filter(user=self.revisor).count(), 2)
+
+    def test_funnel_and_sla(self):
+        ids = [entrega.id for entrega in self.entregas]
+        inicio = self.entregas[0].fecha
+        transition(ids, 'EN_REVISION', user=self.revisor, now=inicio + datetime.timedelta(hours=1))
+        transition(ids[:2], 'APROBADO', user=self.revisor, now=inicio + datetime.timedelta(hours=3))
+        transition(ids[2:], 'RECHAZADO', now=inicio + datetime.timedelta(hours=5))
+
+        stats = transition_stats()
+        self.assertEqual(stats['entradas'], {
+            'PENDIENTE': 3, 'EN_REVISION': 3, 'APROBADO': 2, 'RECHAZADO': 1, 'ENTREGADO': 0,
+        })
+        self.assertEqual(stats['tiempos']['EN_REVISION']['total'], 3)
+        self.assertEqual(stats['tiempos']['EN_REVISION']['maximo_segundos'], 4 * 3600)
+        self.assertEqual(stats['revisores'], [
+            {'user': self.revisor.id, 'username': 'revisor', 'total': 5, 'APROBADO': 2, 'RECHAZADO': 0, 'ENTREGADO': 0},
+        ])
+
+        self.client.force_authenticate(self.revisor)
+        with capture_queries() as queries:
+            response = self.client.get('/api/entregas/estadisticas/transiciones/',
+                                       {'fecha_desde': '2000-01-01', 'fecha_hasta': '2100-01-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['entradas']['APROBADO'], 2)
+        if connection.vendor == 'sqlite':
+            self.assertEqual(full_table_scans(queries), [])
+
+
+class EntregaStatsTests(TestCase):
+    """
+    Estadísticas del tablero: agrupación por status, periodo, ayuda técnica y ubicación, y su caché.
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        muletas = AyudaTecnica.objects.create(nombre='MULETAS')
+        silla = AyudaTecnica.objects.create(nombre='SILLA DE RUEDAS')
+        entregas = [
+            crear_entrega_prueba(identification='10000001', status='PENDIENTE'),
+            crear_entrega_prueba(identification='10000002', status='APROBADO'),
+            crear_entrega_prueba(identification='10000003', status='APROBADO', state='Lara', municipality='Iribarren'),
+        ]
+        for entrega, dia in zip(entregas, (datetime.date(2024, 1, 10), datetime.date(2024, 1, 20),
+                                           datetime.date(2024, 2, 15))):
+            DataEntrega.objects.filter(pk=entrega.pk).update(
+                fecha=datetime.datetime.combine(dia, datetime.time(12), datetime.timezone.utc)
+            )
+        ItemEntregado.objects.bulk_create([
+            ItemEntregado(data_entrega=entregas[0], ayuda_tecnica=muletas, cantidad=2),
+            ItemEntregado(data_entrega=entregas[0], ayuda_tecnica=silla, cantidad=1),
+            ItemEntregado(data_entrega=entregas[2], ayuda_tecnica=muletas, cantidad=1),
+        ])
+
+    def stats(self, query=''):
+        response = self.client.get(f'/api/entregas/estadisticas/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_grouping_and_totals(self):
+        stats = self.stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['por_estado'], {
+            'PENDIENTE': 1, 'EN_REVISION': 0, 'APROBADO': 2, 'RECHAZADO': 0, 'ENTREGADO': 0,
+        })
+        self.assertEqual(stats['por_periodo'], [
+            {'periodo': '2024-01-01', 'total': 2, 'por_estado': {'APROBADO': 1, 'PENDIENTE': 1}},
+            {'periodo': '2024-02-01', 'total': 1, 'por_estado': {'APROBADO': 1}},
+        ])
+        self.assertEqual(stats['por_ayuda_tecnica'], [
+            {'ayuda_tecnica': 'MULETAS', 'cantidad': 3, 'solicitudes': 2},
+            {'ayuda_tecnica': 'SILLA DE RUEDAS', 'cantidad': 1, 'solicitudes': 1},
+        ])
+        self.assertEqual(stats['por_ubicacion'], [
+            {'state': 'Lara', 'municipality': 'Iribarren', 'total': 1},
+            {'state': 'Zulia', 'municipality': 'Maracaibo', 'total': 2},
+        ])
+
+    def test_filters_and_periodo(self):
+        stats = self.stats('?state=Lara')
+        self.assertEqual(stats['total'], 1)
+        self.assertEqual(stats['por_ayuda_tecnica'], [{'ayuda_tecnica': 'MULETAS', 'cantidad': 1, 'solicitudes': 1}])
+        stats = self.stats('?periodo=day&status=APROBADO')
+        self.assertEqual([bucket['periodo'] for bucket in stats['por_periodo']], ['2024-01-20', '2024-02-15'])
+        self.assertEqual(self.client.get('/api/entregas/estadisticas/?periodo=year').status_code, 400)
+
+    def test_cached_until_entregas_change(self):
+        self.assertEqual(self.stats()['total'], 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.stats()['total'], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_entrega_prueba(identification='10000004', status='RECHAZADO')
+        stats = self.stats()
+        self.assertEqual(stats['total'], 4)
+        self.assertEqual(stats['por_estado']['RECHAZADO'], 1)
@@ -0,0 +1,140 @@
+"""
+Máquina de estados de DataEntrega.status y su registro (StatusTransition).
+
+Cada cambio de status pasa por transition(), que valida el cambio contra
+TRANSITIONS, actualiza las entregas con un solo UPDATE y agrega una fila al
+registro por entrega, todo en la misma transacción. El registro guarda el
+tiempo que la entrega pasó en el status anterior, de modo que el embudo y
+los tiempos por status (transition_stats) son agregados sobre un índice.
+"""
+from django.db.models import Avg, Count, Max, Q
+from django.utils import timezone
+
+from core.cache import invalidate
+from core.db import write_transaction
+from .models import DataEntrega, StatusTransition
+
+# Status -> status a los que puede pasar
+TRANSITIONS = {
+    'PENDIENTE': ('EN_REVISION', 'RECHAZADO'),
+    'EN_REVISION': ('APROBADO', 'RECHAZADO', 'PENDIENTE'),  # PENDIENTE: devuelta para corregir
+    'APROBADO': ('ENTREGADO', 'EN_REVISION'),
+    'RECHAZADO': ('EN_REVISION',),  # reabrir
+    'ENTREGADO': (),
+}
+
+STATUSES = [code for code, _ in DataEntrega.STATUS_CHOICES]
+
+
+class TransitionError(Exception):
+    pass
+
+
+def allowed(from_status, to_status):
+    return to_status in TRANSITIONS.get(from_status, ())
+
+
+def transition(ids, to_status, user=None, now=None):
+    """
+    Move the entregas `ids` to `to_status` and log each change. Entregas
+    whose current status does not allow it are left as they are. Returns
+    (moved ids, {id: error message}); raises TransitionError for an unknown
+    status.
+    """
+    if to_status not in TRANSITIONS:
+        raise TransitionError(f"status debe ser uno de: {', '.join(STATUSES)}")
+    now = now or timezone.now()
+    ids = list(dict.fromkeys(ids))
+    errors = {}
+    with write_transaction():
+        current = {
+            pk: (status, fecha)
+            for pk, status, fecha in DataEntrega.objects.select_for_update()
+            .filter(id__in=ids).values_list('id', 'status', 'fecha')
+        }
+        moved = []
+        for pk in ids:
+            if pk not in current:
+                errors[pk] = 'Entrega no encontrada'
+            elif not allowed(current[pk][0], to_status):
+                errors[pk] = f'No se puede pasar de {current[pk][0]} a {to_status}'
+            else:
+                moved.append(pk)
+        if not moved:
+            return moved, errors
+
+        # Desde cuándo está cada entrega en su status: su última transición o su creación
+        entered = dict(
+            StatusTransition.objects.filter(entrega_id__in=moved)
+            .values('entrega_id').annotate(last=Max('created')).values_list('entrega_id', 'last')
+        )
+        DataEntrega.objects.filter(id__in=moved).update(status=to_status)
+        StatusTransition.objects.bulk_create([
+            StatusTransition(
+                entrega_id=pk, from_status=current[pk][0], to_status=to_status, user=user, created=now,
+                seconds_in_from=max(0, int((now - entered.get(pk, current[pk][1])).total_seconds())),
+            )
+            for pk in moved
+        ])
+    # update() no envía señales
+    invalidate('entregas')
+    return moved, errors
+
+
+def transition_stats(desde=None, hasta=None):
+    """
+    Aggregates of the transitions made in [desde, hasta):
+    - entradas: transitions into each status (the funnel; PENDIENTE also
+      counts the entregas created in the range)
+    - tiempos: seconds spent in each status before leaving it
+    - revisores: transitions per user
+    """
+    queryset = StatusTransition.objects.all()
+    creadas = DataEntrega.objects.all()
+    if desde:
+        queryset = queryset.filter(created__gte=desde)
+        creadas = creadas.filter(fecha__gte=desde)
+    if hasta:
+        queryset = queryset.filter(created__lt=hasta)
+        creadas = creadas.filter(fecha__lt=hasta)
+
+    entradas = dict.fromkeys(STATUSES, 0)
+    for row in queryset.order_by().values('to_status').annotate(total=Count('id')):
+        entradas[row['to_status']] = row['total']
+    entradas['PENDIENTE'] += creadas.count()
+
+    tiempos = {
+        row['from_status']: {
+            'total': row['total'],
+            'promedio_segundos': round(row['promedio']),
+            'maximo_segundos': row['maximo'],
+        }
+        for row in queryset.order_by().values('from_status').annotate(
+            total=Count('id'), promedio=Avg('seconds_in_from'), maximo=Max('seconds_in_from')
+        )
+    }
+
+    revisores = [
+        {
+            'user': row['user_id'],
+            'username': row['user__username'],
+            'total': row['total'],
+            **{status: row[status] for status in ('APROBADO', 'RECHAZADO', 'ENTREGADO')},
+        }
+        for row in queryset.filter(user__isnull=False).order_by().values('user_id', 'user__username').annotate(
+            total=Count('id'),
+            **{status: Count('id', filter=Q(to_status=status)) for status in ('APROBADO', 'RECHAZADO', 'ENTREGADO')},
+        ).order_by('-total')
+    ]
+    return {'entradas': entradas, 'tiempos': tiempos, 'revisores': revisores}
+
+
+def entrega_transitions(entrega_id):
+    """
+    Transitions of one entrega, oldest first
+    """
+    return list(
+        StatusTransition.objects.filter(entrega_id=entrega_id).order_by('created', 'id').values(
+            'from_status', 'to_status', 'created', 'seconds_in_from', 'user_id', 'user__username'
+        )
+    )
@@ -0,0 +1,280 @@
+"""
+Subidas por partes y reanudables de DataEntrega.archivo_adjunto.
+
+1. POST   /api/uploads/            {filename, size}  -> {id, offset, chunk_size}
+2. PATCH  /api/uploads/<id>/       cuerpo = bytes de la parte, cabecera Upload-Offset
+3. GET    /api/uploads/<id>/       -> {offset, size, complete} para reanudar tras un corte
+4. POST   crear_entrega con "upload_id" en los datos: el archivo se asocia a
+   la entrega solo si la solicitud es válida.
+
+Cada parte pasa del cuerpo de la petición al archivo de staging en bloques
+de COPY_BUFFER_SIZE, sin cargar la parte ni el archivo en memoria. Al
+asociarlo, el archivo se mueve (rename) de staging a MEDIA_ROOT sin copiarlo,
+después del commit de la entrega.
+"""
+import datetime
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.cache import invalidate
+from jobs.queue import enqueue
+from .models import DataEntrega, UploadSession
+
+logger = logging.getLogger(__name__)
+
+# Bytes que se leen del cuerpo de la petición en cada vuelta
+COPY_BUFFER_SIZE = 256 * 1024
+
+# Tipos de archivo aceptados: extensión -> (content type, firmas de los primeros bytes)
+ALLOWED_TYPES = {
+    '.pdf': ('application/pdf', (b'%PDF-',)),
+    '.jpg': ('image/jpeg', (b'\xff\xd8\xff',)),
+    '.jpeg': ('image/jpeg', (b'\xff\xd8\xff',)),
+    '.png': ('image/png', (b'\x89PNG\r\n\x1a\n',)),
+}
+
+IMAGE_TYPES = ('image/jpeg', 'image/png')
+
+# Directorio (dentro del storage) de las miniaturas de imágenes adjuntas
+THUMBNAIL_DIR = 'adjuntos/miniaturas'
+
+
+class UploadError(Exception):
+    """
+    Invalid upload request; `status` is the HTTP status to answer with
+    """
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def is_image(name):
+    extension = os.path.splitext(name)[1].lower()
+    return extension in ALLOWED_TYPES and ALLOWED_TYPES[extension][0] in IMAGE_TYPES
+
+
+def staging_path(upload):
+    return os.path.join(settings.UPLOAD_STAGING_DIR, upload.id.hex)
+
+
+def start_upload(filename, size):
+    filename = os.path.basename(str(filename or '')).strip()
+    extension = os.path.splitext(filename)[1].lower()
+    if not filename or extension not in ALLOWED_TYPES:
+        raise UploadError(f"Tipo de archivo no permitido. Use: {', '.join(ALLOWED_TYPES)}")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError('size debe ser el tamaño del archivo en bytes')
+    if size <= 0 or size > settings.UPLOAD_MAX_SIZE:
+        raise UploadError(f'El archivo debe tener entre 1 y {settings.UPLOAD_MAX_SIZE} bytes', status=413)
+
+    upload = UploadSession.objects.create(filename=filename, size=size)
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    # Archivo vacío: las partes se escriben en su offset
+    open(staging_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload, offset, stream, length):
+    """
+    Write `length` bytes read from `stream` at `offset` of the staged file.
+
+    The offset must be the number of bytes already received, so a client
+    that lost a response asks for the offset (GET) and resends from there.
+    Returns the new offset.
+    """
+    if upload.completed:
+        raise UploadError('La subida ya está completa', status=409)
+    if offset != upload.received:
+        raise UploadError(f'Upload-Offset debe ser {upload.received}', status=409)
+    if length <= 0:
+        raise UploadError('La parte está vacía')
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadError(f'Cada parte puede tener como máximo {settings.UPLOAD_CHUNK_MAX_SIZE} bytes', status=413)
+    if offset + length > upload.size:
+        raise UploadError('La parte excede el tamaño declarado del archivo', status=413)
+
+    written = 0
+    with open(staging_path(upload), 'r+b') as staged:
+        staged.seek(offset)
+        while written < length:
+            data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            if not data:
+                break
+            staged.write(data)
+            written += len(data)
+    if written != length:
+        # Conexión cortada: el offset no avanza y el cliente reenvía la parte
+        raise UploadError('La parte llegó incompleta, reenvíela desde el mismo offset')
+
+    # Solo avanza si nadie más escribió esta misma parte mientras tanto
+    if not UploadSession.objects.filter(pk=upload.pk, received=offset).update(received=F('received') + length):
+        raise UploadError('Otra petición escribió esta parte', status=409)
+    upload.received = offset + length
+    if upload.received == upload.size:
+        _complete(upload)
+    return upload.received
+
+
+def _complete(upload):
+    """
+    Check the file signature against the extension once every byte arrived
+    """
+    content_type, signatures = ALLOWED_TYPES[os.path.splitext(upload.filename)[1].lower()]
+    with open(staging_path(upload), 'rb') as staged:
+        head = staged.read(16)
+    if not any(head.startswith(signature) for signature in signatures):
+        discard(upload)
+        raise UploadError('El contenido del archivo no corresponde a su extensión')
+    upload.content_type = content_type
+    upload.completed = timezone.now()
+    upload.save(update_fields=['content_type', 'completed'])
+
+
+def get_completed_upload(upload_id):
+    try:
+        upload = UploadSession.objects.get(pk=upload_id)
+    except UploadSession.DoesNotExist:
+        raise UploadError('La subida no existe o ya fue utilizada', status=404)
+    if not upload.completed:
+        raise UploadError(f'La subida está incompleta ({upload.received} de {upload.size} bytes)', status=409)
+    return upload
+
+
+def discard(upload):
+    try:
+        os.remove(staging_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def _store_staged(path, name):
+    """
+    Move a staged file into the storage as `name` (a rename, without copying,
+    on a FileSystemStorage). Returns the final name.
+    """
+    if not isinstance(default_storage, FileSystemStorage):
+        with open(path, 'rb') as staged:
+            name = default_storage.save(name, File(staged))
+        os.remove(path)
+        return name
+    os.makedirs(os.path.dirname(default_storage.path(name)), exist_ok=True)
+    while True:
+        try:
+            # link() falla si el nombre ya existe: otra subida no puede pisar el archivo
+            os.link(path, default_storage.path(name))
+            break
+        except FileExistsError:
+            name = default_storage.get_available_name(name)
+    os.remove(path)
+    return name
+
+
+def attach_upload(entrega, upload):
+    """
+    Attach the staged file to `entrega` as archivo_adjunto. Runs inside the
+    transaction that saves the entrega: the upload is claimed there (reusing
+    the upload_id raises UploadError 409) and the file is moved into the
+    storage after the commit, so a rollback leaves the staged upload intact.
+    The image processing is queued (jobs.queue) once the file is in place.
+    """
+    path = staging_path(upload)
+    if not UploadSession.objects.filter(pk=upload.pk).delete()[0]:
+        raise UploadError('La subida ya fue utilizada', status=409)
+    if not os.path.exists(path):
+        raise UploadError('El archivo de la subida ya no está disponible', status=409)
+
+    name = default_storage.get_available_name(f'adjuntos/{upload.filename}')
+    entrega.archivo_adjunto.name = name
+    entrega.save(update_fields=['archivo_adjunto'])
+    process_image = upload.content_type in IMAGE_TYPES
+
+    def store():
+        stored = _store_staged(path, name)
+        if stored != name:
+            # Otro archivo tomó el nombre entre la transacción y el commit
+            DataEntrega.objects.filter(pk=entrega.pk).update(archivo_adjunto=stored)
+            invalidate('entregas')
+        if process_image:
+            enqueue(process_attachment_image, entrega_id=entrega.pk)
+
+    transaction.on_commit(store, robust=True)
+    return name
+
+
+def purge_uploads(now=None):
+    """
+    Delete uploads older than UPLOAD_SESSION_TTL that were never attached,
+    plus staged files without a session. Returns the number of uploads deleted.
+    """
+    now = now or timezone.now()
+    expired = UploadSession.objects.filter(
+        created__lt=now - datetime.timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    )
+    deleted = 0
+    for upload in expired.iterator():
+        discard(upload)
+        deleted += 1
+
+    if os.path.isdir(settings.UPLOAD_STAGING_DIR):
+        known = {upload_id.hex for upload_id in UploadSession.objects.values_list('id', flat=True)}
+        for entry in os.scandir(settings.UPLOAD_STAGING_DIR):
+            if entry.is_file() and entry.name not in known:
+                os.remove(entry.path)
+    return deleted
+
+
+def thumbnail_name(name):
+    return f'{THUMBNAIL_DIR}/{os.path.basename(name)}.jpg'
+
+
+def process_attachment_image(entrega_id):
+    """
+    Build the thumbnail of an image attachment and, when
+    ATTACHMENT_IMAGE_MAX_DIMENSION > 0, recompress oversized images.
+    Does nothing when Pillow is not installed. Runs in a jobs worker, which
+    retries it if it raises.
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.info('Pillow is not installed, skipping attachment image processing')
+        return
+
+    name = DataEntrega.objects.filter(pk=entrega_id).values_list('archivo_adjunto', flat=True).first()
+    if not name:
+        return
+    with default_storage.open(name, 'rb') as source:
+        original = Image.open(source)
+        image_format = original.format or 'JPEG'
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    max_dimension = settings.ATTACHMENT_IMAGE_MAX_DIMENSION
+    if max_dimension and max(image.size) > max_dimension:
+        resized = image.copy()
+        resized.thumbnail((max_dimension, max_dimension))
+        _replace(name, resized, format=image_format, optimize=True, quality=85)
+
+    thumbnail = image.convert('RGB')
+    thumbnail.thumbnail((settings.ATTACHMENT_THUMBNAIL_SIZE, settings.ATTACHMENT_THUMBNAIL_SIZE))
+    _replace(thumbnail_name(name), thumbnail, format='JPEG', quality=80)
+
+
+def _replace(name, image, **save_options):
+    buffer = io.BytesIO()
+    image.save(buffer, **save_options)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(buffer.getvalue()))
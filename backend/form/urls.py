@@ -1,7 +1,23 @@
 from django.urls import path
-from .views import crear_entrega, actualizar_estado
+from core.async_views import read_view
+from .async_views import entregas_list, entregas_stats
+from .views import (
+    crear_entrega, listar_ayudas_tecnicas, actualizar_estado, actualizar_estados, exportar_entregas,
+    estadisticas_entregas, estadisticas_transiciones,
+    iniciar_subida, subida_detalle, descargar_adjunto, historial_beneficiario, buscar_entregas,
+)
 
 urlpatterns = [
-    path('ayudas-tecnicas-externos/', crear_entrega, name='crear_entrega'),
+    path('ayudas-tecnicas-externos/', read_view(crear_entrega, entregas_list), name='crear_entrega'),
+    path('ayudas-tecnicas/', listar_ayudas_tecnicas, name='listar_ayudas_tecnicas'),
+    path('entregas/exportar/', exportar_entregas, name='exportar_entregas'),
+    path('entregas/buscar/', buscar_entregas, name='buscar_entregas'),
+    path('entregas/estadisticas/', read_view(estadisticas_entregas, entregas_stats), name='estadisticas_entregas'),
+    path('entregas/estadisticas/transiciones/', estadisticas_transiciones, name='estadisticas_transiciones'),
+    path('entregas/status/', actualizar_estados, name='actualizar_estados'),
     path('entregas/<int:entrega_id>/status/', actualizar_estado, name='actualizar_estado'),
+    path('entregas/<int:entrega_id>/adjunto/', descargar_adjunto, name='descargar_adjunto'),
+    path('beneficiarios/<str:identificacion>/historial/', historial_beneficiario, name='historial_beneficiario'),
+    path('uploads/', iniciar_subida, name='iniciar_subida'),
+    path('uploads/<uuid:upload_id>/', subida_detalle, name='subida_detalle'),
 ]
@@ -9,36 +9,69 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import permission_classes
-from .Serializers import DataEntregaSerializer, StatusUpdateSerializer
-from .models import DataEntrega
+from .Serializers import (
+    AyudaTecnicaSerializer, DataEntregaSerializer, StatusBulkUpdateSerializer, StatusUpdateSerializer,
+)
+from .models import DataEntrega, UploadSession
+from .beneficiaries import DuplicateEntrega, history
+from .catalog import get_catalog
+from .filters import date_range, filter_entregas
+from .pagination import EntregaCursorPagination
+from .search import RANK_WINDOW, search_ids
+from .stats import PERIODOS, get_stats, schedule_refresh
+from .transitions import TRANSITIONS, entrega_transitions, transition, transition_stats
+from .uploads import UploadError, append_chunk, start_upload, thumbnail_name
+from core.cache import cache_response
+from core.streaming import EXPORT_CONTENT_TYPES, export_fields, export_response, file_response
+from django.conf import settings
+from django.core.files.storage import default_storage
 
+# Parámetros que activan el modo paginado del listado de entregas
+PAGINATION_PARAMS = ('paginated', 'cursor', 'page_size')
+
+# Resultados por página de la búsqueda de texto (?limit=)
+SEARCH_DEFAULT_LIMIT = 25
+SEARCH_MAX_LIMIT = 100
+
+# Entregas que se leen por cada viaje del cursor al exportar (los items se precargan por lote)
+EXPORT_CHUNK_SIZE = 500
 
 
 
 
 @api_view(['POST', 'GET'])
+@cache_response('entregas')
 def crear_entrega(request):
     if request.method == 'GET':
-        entregas = DataEntrega.objects.all().order_by('-fecha')
-        serializer = DataEntregaSerializer(entregas, many=True)
+        # Filtros: status, state, municipality, parish, identification, fecha_desde, fecha_hasta.
+        # Los items y su ayuda técnica se precargan: 3 consultas por página en total.
+        entregas = filter_entregas(
+            DataEntrega.objects.prefetch_related('items__ayuda_tecnica').order_by('-fecha', '-id'),
+            request.query_params
+        )
+        if any(param in request.query_params for param in PAGINATION_PARAMS):
+            paginator = EntregaCursorPagination()
+            page = paginator.paginate_queryset(entregas, request)
+            serializer = DataEntregaSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+        serializer = DataEntregaSerializer(entregas, many=True, context={'request': request})
         return Response(serializer.data)
     try:
-        # Log de información de la solicitud recibida
-        logging.info(f"Solicitud recibida: Content-Type: {request.content_type}")
-        logging.info(f"Datos recibidos en request.data: {type(request.data)}")
+        # Log de depuración de la solicitud recibida (argumentos diferidos: no se
+        # formatean si el nivel DEBUG está desactivado)
+        logging.debug("Solicitud recibida: Content-Type: %s", request.content_type)
         
         # Extraer datos JSON del campo 'data' del FormData
         data_json = request.data.get('data')
         
         # Log del contenido del campo 'data'
-        logging.info(f"Campo data: {type(data_json)}")
+        logging.debug("Campo data: %s", type(data_json))
         if data_json:
             # Si es una cadena JSON, convertirla a diccionario
             if isinstance(data_json, str):
                 try:
                     # Intentar decodificar con manejo explícito de codificación
                     data_dict = json.loads(data_json)
-                    logging.info(f"JSON decodificado correctamente: {type(data_dict)}")
                 except json.JSONDecodeError as json_err:
                     logging.error(f"Error al decodificar JSON: {str(json_err)}")
                     # Intentar con diferentes codificaciones si hay error
@@ -56,26 +89,31 @@ def crear_entrega(request):
             else:
                 # Ya es un objeto (dict, etc.)
                 data_dict = data_json
-                logging.info(f"Usando data_json como objeto directamente: {type(data_dict)}")
         else:
             # Si no hay campo 'data', usar request.data directamente
             data_dict = request.data
-            logging.info(f"Usando request.data directamente: {type(data_dict)}")
         
-        # Log del contenido final de data_dict
-        logging.info(f"Estructura de datos a procesar: {data_dict}")
-            
         # Procesar archivo adjunto si existe
         if 'archivo_adjunto' in request.FILES:
             data_dict['archivo_adjunto'] = request.FILES['archivo_adjunto']
-            logging.info(f"Archivo adjunto procesado: {request.FILES['archivo_adjunto'].name}")
             
         # Validar y guardar los datos
         serializer = DataEntregaSerializer(data=data_dict)
         
         if serializer.is_valid():
-            entrega = serializer.save()
-            logging.info(f"Entrega creada con ID: {entrega.id}")
+            try:
+                entrega = serializer.save()
+            except DuplicateEntrega as e:
+                return Response(
+                    {'duplicado_de': e.entrega_id, 'non_field_errors': [str(e)]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            except UploadError as e:
+                # upload_id usado por otra solicitud al mismo tiempo
+                return Response({'error': str(e)}, status=e.status)
+            logging.info("Entrega creada con ID: %s", entrega.id)
+            # Trabajo no crítico fuera de la petición: los workers de jobs lo ejecutan
+            schedule_refresh()
             return Response({'id': entrega.id}, status=status.HTTP_201_CREATED)
         
         # Log de errores de validación
@@ -99,27 +137,255 @@ def crear_entrega(request):
         )
 
 
-@api_view(['PATCH'])
+@api_view(['GET'])
+@cache_response('ayudas')
+def listar_ayudas_tecnicas(request):
+    """
+    Catálogo de ayudas técnicas (id y nombre), ordenado por nombre. Solo las
+    canónicas: las variantes sin tildes se resuelven a ellas (form.catalog).
+    """
+    return Response(AyudaTecnicaSerializer(get_catalog().ayudas, many=True).data)
+
+
+@api_view(['GET', 'PATCH'])
+@permission_classes([IsAuthenticated])
 def actualizar_estado(request, entrega_id):
+    """
+    GET: status actual, status a los que puede pasar y registro de transiciones.
+    PATCH {"status": ...}: cambiar el status; 409 si el status actual no lo permite
+    (ver form.transitions.TRANSITIONS).
+    """
     try:
-        entrega = DataEntrega.objects.get(pk=entrega_id)
+        entrega = DataEntrega.objects.only('id', 'status').get(pk=entrega_id)
     except DataEntrega.DoesNotExist:
         return Response(
             {"error": "Entrega no encontrada"}, 
             status=status.HTTP_404_NOT_FOUND
         )
 
+    if request.method == 'GET':
+        return Response({
+            'status': entrega.status,
+            'permitidos': TRANSITIONS[entrega.status],
+            'transiciones': entrega_transitions(entrega.pk),
+        })
+
     serializer = StatusUpdateSerializer(
         entrega, 
         data=request.data, 
         partial=True
     )
-    
-    if serializer.is_valid():
-        serializer.save()
-        return Response(serializer.data)
-    
-    return Response(
-        serializer.errors, 
-        status=status.HTTP_400_BAD_REQUEST
+    if not serializer.is_valid():
+        return Response(
+            serializer.errors, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    nuevo = serializer.validated_data.get('status', entrega.status)
+    if nuevo != entrega.status:
+        moved, errors = transition([entrega.pk], nuevo, user=request.user)
+        if not moved:
+            return Response(
+                {'error': errors[entrega.pk], 'status': entrega.status, 'permitidos': TRANSITIONS[entrega.status]},
+                status=status.HTTP_409_CONFLICT
+            )
+        entrega.status = nuevo
+        schedule_refresh()
+    return Response(StatusUpdateSerializer(entrega).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def actualizar_estados(request):
+    """
+    Cambiar el status de varias entregas: {"ids": [...], "status": ...} (máx. 500 ids).
+    Las entregas cuyo status no permite el cambio no se modifican y se
+    informan en "errores".
+    """
+    serializer = StatusBulkUpdateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    moved, errors = transition(serializer.validated_data['ids'], serializer.validated_data['status'], user=request.user)
+    if moved:
+        schedule_refresh()
+    return Response({'status': serializer.validated_data['status'], 'actualizadas': moved, 'errores': errors})
+
+
+@api_view(['GET'])
+def exportar_entregas(request):
+    """
+    Exportar las entregas en streaming como CSV (?formato=csv, por defecto) o NDJSON (?formato=ndjson).
+    Acepta los mismos filtros que el listado: status, state, municipality, parish,
+    identification, fecha_desde y fecha_hasta.
+    """
+    export_format = request.query_params.get('formato', 'csv')
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return Response(
+            {'error': f"formato debe ser uno de: {', '.join(EXPORT_CONTENT_TYPES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    queryset = filter_entregas(
+        DataEntrega.objects.prefetch_related('items__ayuda_tecnica').order_by('-fecha'),
+        request.query_params
     )
+    serializer = DataEntregaSerializer(context={'request': request})
+    records = (
+        serializer.to_representation(entrega)
+        for entrega in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return export_response(records, export_fields(serializer), export_format, 'entregas')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cache_response('entregas')
+def buscar_entregas(request):
+    """
+    Búsqueda de texto en nombre y apellido del beneficiario y del solicitante,
+    referentes, diagnóstico, observación y dirección (?q=). Sin distinguir
+    mayúsculas ni tildes, la última palabra como prefijo ("jose per" encuentra
+    "José Pérez"), ordenada por relevancia entre las `window` coincidencias
+    más recientes (`total` no pasa de ese número). Acepta los filtros del
+    listado, ?limit= (máx. 100) y ?offset= (menor que `window`).
+    """
+    q = request.query_params.get('q', '').strip()
+    if not q:
+        return Response({'error': 'Indique el texto a buscar en ?q='}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT)
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response({'error': 'limit y offset deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+    if limit < 1 or not 0 <= offset < RANK_WINDOW:
+        return Response(
+            {'error': f'limit debe ser positivo y offset estar entre 0 y {RANK_WINDOW - 1}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    ids, total = search_ids(q, filter_entregas(DataEntrega.objects.all(), request.query_params), limit, offset)
+    entregas = DataEntrega.objects.prefetch_related('items__ayuda_tecnica').in_bulk(ids)
+    serializer = DataEntregaSerializer([entregas[pk] for pk in ids if pk in entregas], many=True,
+                                       context={'request': request})
+    # total llega como máximo a window: se ordenan las `window` coincidencias más recientes
+    return Response({
+        'q': q, 'limit': limit, 'offset': offset, 'total': total, 'window': RANK_WINDOW,
+        'results': serializer.data,
+    })
+
+
+@api_view(['GET'])
+def estadisticas_entregas(request):
+    """
+    Estadísticas de solicitudes para los tableros de la OAC:
+    - conteo por status
+    - conteo por periodo (?periodo=day|week|month, por defecto month) con desglose por status
+    - total de ItemEntregado.cantidad por ayuda técnica
+    - conteo por state/municipality
+    Acepta los mismos filtros que el listado de entregas. Los resultados se guardan en caché.
+    """
+    periodo = request.query_params.get('periodo', 'month')
+    if periodo not in PERIODOS:
+        return Response(
+            {'error': f"periodo debe ser uno de: {', '.join(PERIODOS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(get_stats(request.query_params, periodo))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cache_response('entregas')
+def estadisticas_transiciones(request):
+    """
+    Embudo y tiempos de atención a partir del registro de cambios de status,
+    para las transiciones hechas entre ?fecha_desde y ?fecha_hasta (YYYY-MM-DD):
+    - entradas: veces que las solicitudes entraron a cada status
+    - tiempos: segundos que pasaron en cada status antes de salir (promedio y máximo)
+    - revisores: transiciones hechas por cada usuario
+    """
+    return Response(transition_stats(*date_range(request.query_params)))
+
+
+def _upload_state(upload):
+    return {
+        'id': upload.id,
+        'offset': upload.received,
+        'size': upload.size,
+        'complete': upload.completed is not None,
+        'chunk_size': settings.UPLOAD_CHUNK_MAX_SIZE,
+    }
+
+
+@api_view(['POST'])
+def iniciar_subida(request):
+    """
+    Iniciar una subida por partes de un archivo adjunto: {"filename": ..., "size": bytes}.
+    Devuelve el id de la subida y el offset (0) desde el que enviar la primera parte.
+    """
+    try:
+        upload = start_upload(request.data.get('filename'), request.data.get('size'))
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status)
+    return Response(_upload_state(upload), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PATCH'])
+def subida_detalle(request, upload_id):
+    """
+    GET: estado de la subida (offset desde el que continuar tras un corte).
+    PATCH: enviar la siguiente parte; el cuerpo son los bytes crudos y la
+    cabecera Upload-Offset indica su posición en el archivo.
+    """
+    try:
+        upload = UploadSession.objects.get(pk=upload_id)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Subida no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'PATCH':
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({'error': 'Upload-Offset y Content-Length son requeridos'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # request.stream lee el cuerpo sin pasarlo por los parsers de DRF
+            append_chunk(upload, offset, request.stream, length)
+        except UploadError as e:
+            return Response({'error': str(e), **_upload_state(upload)}, status=e.status)
+
+    return Response(_upload_state(upload))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def descargar_adjunto(request, entrega_id):
+    """
+    Descargar el archivo adjunto de una entrega (?miniatura=1 para la miniatura de una imagen).
+    Soporta peticiones Range; con ATTACHMENT_SERVE_MODE=x-accel/x-sendfile el
+    archivo lo envía el servidor web.
+    """
+    name = DataEntrega.objects.filter(pk=entrega_id).values_list('archivo_adjunto', flat=True).first()
+    if not name:
+        return Response({'error': 'La entrega no tiene archivo adjunto'}, status=status.HTTP_404_NOT_FOUND)
+    if request.query_params.get('miniatura') in ('1', 'true', 'True'):
+        name = thumbnail_name(name)
+    if not default_storage.exists(name):
+        return Response({'error': 'Archivo no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    return file_response(request, name)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cache_response('entregas')
+def historial_beneficiario(request, identificacion):
+    """
+    Solicitudes en las que aparece una cédula (como beneficiario, solicitante o
+    referente), de la más reciente a la más antigua. La cédula se normaliza:
+    "V-12.345.678" y "12345678" son la misma persona.
+    """
+    key, entregas = history(identificacion)
+    if not key:
+        return Response({'error': 'Cédula inválida'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'identification': key, 'total': len(entregas), 'entregas': entregas})
@@ -0,0 +1,67 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.models import Job
+from jobs.queue import retry_failed, work
+
+
+class Command(BaseCommand):
+    help = (
+        'Procesa la cola de trabajos en segundo plano (jobs.queue). Con --processes N inicia N '
+        'workers en procesos separados; SIGTERM/Ctrl+C termina el trabajo en curso y sale.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Procesos worker')
+        parser.add_argument('--burst', action='store_true', help='Salir cuando no queden trabajos listos')
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Volver a encolar los trabajos fallidos (con intentos nuevos) y salir'
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            self.stdout.write(self.style.SUCCESS(f'Trabajos reencolados: {retry_failed()}'))
+            return
+
+        if options['processes'] <= 1:
+            self.run_worker(options['burst'])
+            return
+
+        # Cada hijo abre su propia conexión; no deben heredar la del padre
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=self.run_worker, args=(options['burst'],), name=f'jobs-{i}')
+            for i in range(options['processes'])
+        ]
+        for process in workers:
+            process.start()
+
+        def terminate(signum, frame):
+            for process in workers:
+                process.terminate()
+
+        signal.signal(signal.SIGTERM, terminate)
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            # Los hijos reciben el mismo SIGINT y terminan su trabajo actual
+            for process in workers:
+                process.join()
+
+    def run_worker(self, burst):
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        processed = work(burst=burst, stop=stop)
+        failed = Job.objects.filter(status=Job.FAILED).count()
+        self.stdout.write(f'Trabajos procesados: {processed} (fallidos en la cola: {failed})')
@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano (ver jobs.queue). Los trabajos terminados se
+    eliminan; solo quedan los pendientes, los que están en ejecución y los
+    fallidos (con el error del último intento).
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En ejecución'),
+        (FAILED, 'Fallido'),
+    ]
+
+    task = models.CharField(max_length=200)  # Ruta de la función, p. ej. 'form.stats.refresh_stats'
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # Pendiente: cuándo puede ejecutarse. En ejecución: cuándo vence el timeout de visibilidad.
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)  # Worker que lo reclamó
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'Job'
+        indexes = [
+            # Búsqueda del siguiente trabajo listo en claim()
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} [{self.status}]"
@@ -0,0 +1,148 @@
+"""
+Cola de trabajos en segundo plano sobre la base de datos (tabla Job), sin
+servicios externos.
+
+- enqueue() guarda el trabajo en la misma transacción que los datos que lo
+  originan: si la transacción se revierte, el trabajo no existe.
+- Los workers (`manage.py run_jobs`) reclaman trabajos con claim(). Un trabajo
+  reclamado queda oculto durante JOBS_VISIBILITY_TIMEOUT; si el worker muere
+  sin terminarlo, otro worker lo vuelve a reclamar al vencer ese plazo.
+- Si la tarea lanza una excepción se reintenta con espera exponencial
+  (JOBS_RETRY_DELAY, 2x, 4x, ...) hasta max_attempts; luego queda 'failed'.
+
+Las tareas son funciones importables que reciben solo argumentos con nombre
+serializables en JSON, y deben tolerar ejecutarse más de una vez.
+"""
+import datetime
+import logging
+import os
+import socket
+import threading
+import traceback
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.db import write_transaction
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def task_path(task):
+    return task if isinstance(task, str) else f'{task.__module__}.{task.__qualname__}'
+
+
+def enqueue(task, *, delay=0, max_attempts=None, unique=False, **kwargs):
+    """
+    Queue `task(**kwargs)`. With unique=True nothing is queued if the same
+    task with the same arguments is already waiting to run. Returns the Job,
+    or None when it was deduplicated.
+    """
+    path = task_path(task)
+    if unique and Job.objects.filter(task=path, kwargs=kwargs, status=Job.PENDING).exists():
+        return None
+    return Job.objects.create(
+        task=path,
+        kwargs=kwargs,
+        run_after=timezone.now() + datetime.timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, limit=1, now=None):
+    """
+    Mark up to `limit` ready jobs as running for `worker` and return them.
+
+    A job is ready when it is pending and due, or running with an expired
+    visibility timeout (its worker died or hung). With SQLite the
+    transaction starts with BEGIN IMMEDIATE, so two workers never claim the
+    same job; on other databases the rows are locked with SKIP LOCKED.
+    """
+    now = now or timezone.now()
+    with write_transaction():
+        ready = Job.objects.filter(status__in=[Job.PENDING, Job.RUNNING], run_after__lte=now)
+        # Se quedaron sin intentos por timeouts de visibilidad, sin llegar a fallar
+        ready.filter(attempts__gte=F('max_attempts')).update(
+            status=Job.FAILED, last_error='Visibility timeout expired on the last attempt'
+        )
+        ids = list(
+            ready.filter(attempts__lt=F('max_attempts'))
+            .select_for_update(skip_locked=True)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            attempts=F('attempts') + 1,
+            run_after=now + datetime.timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT),
+        )
+    return list(Job.objects.filter(id__in=ids, locked_by=worker).order_by('run_after', 'id'))
+
+
+def run_job(job, worker):
+    """
+    Run a claimed job. Successful jobs are deleted; failed ones are
+    rescheduled or marked as failed. Returns True on success.
+    """
+    # Solo si el trabajo sigue siendo de este worker (no venció su visibilidad)
+    owned = Job.objects.filter(pk=job.pk, locked_by=worker, attempts=job.attempts)
+    try:
+        import_string(job.task)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error(f"Job {job.pk} ({job.task}) failed after {job.attempts} attempts:\n{error}")
+            owned.update(status=Job.FAILED, last_error=error, locked_by='')
+        else:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            logger.warning(f"Job {job.pk} ({job.task}) failed, retrying in {delay}s:\n{error}")
+            owned.update(
+                status=Job.PENDING, last_error=error, locked_by='',
+                run_after=timezone.now() + datetime.timedelta(seconds=delay),
+            )
+        return False
+    owned.delete()
+    return True
+
+
+def work(worker=None, burst=False, stop=None, poll_interval=None):
+    """
+    Worker loop: claim and run jobs one at a time until `stop` (a
+    threading.Event) is set. With burst=True it returns as soon as there is
+    nothing ready to run. Returns the number of jobs processed.
+    """
+    worker = worker or worker_name()
+    stop = stop or threading.Event()
+    poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while not stop.is_set():
+        jobs = claim(worker)
+        if not jobs:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        for job in jobs:
+            run_job(job, worker)
+            processed += 1
+    return processed
+
+
+def retry_failed(queryset=None):
+    """
+    Put failed jobs back in the queue with a fresh set of attempts
+    """
+    queryset = Job.objects.all() if queryset is None else queryset
+    return queryset.filter(status=Job.FAILED).update(
+        status=Job.PENDING, attempts=0, run_after=timezone.now(), locked_by=''
+    )
@@ -0,0 +1,76 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim, enqueue, retry_failed, run_job, work
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def fail():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS_RETRY_DELAY=10, JOBS_VISIBILITY_TIMEOUT=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_work_runs_and_deletes_jobs(self):
+        enqueue(record, value=1)
+        enqueue('jobs.tests.record', value=2)
+        enqueue(record, value=3, delay=3600)
+
+        self.assertEqual(work(worker='w1', burst=True), 2)
+        self.assertEqual(calls, [1, 2])
+        # Solo queda el programado para más tarde
+        self.assertEqual(list(Job.objects.values_list('status', flat=True)), [Job.PENDING])
+
+    def test_unique_skips_pending_duplicates(self):
+        self.assertIsNotNone(enqueue(record, unique=True, value=1))
+        self.assertIsNone(enqueue(record, unique=True, value=1))
+        self.assertIsNotNone(enqueue(record, unique=True, value=2))
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_retries_with_backoff_then_fails(self):
+        job = enqueue(fail, max_attempts=2)
+
+        [claimed] = claim('w1')
+        self.assertFalse(run_job(claimed, 'w1'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + datetime.timedelta(seconds=5))
+
+        later = timezone.now() + datetime.timedelta(seconds=60)
+        [claimed] = claim('w1', now=later)
+        run_job(claimed, 'w1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+        self.assertEqual(retry_failed(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 0))
+
+    def test_visibility_timeout(self):
+        job = enqueue(record, value=1)
+        [claimed] = claim('w1')
+        # Oculto mientras el primer worker lo tiene reclamado
+        self.assertEqual(claim('w2'), [])
+
+        # El primer worker murió: al vencer el timeout otro worker lo reclama
+        later = timezone.now() + datetime.timedelta(seconds=120)
+        [reclaimed] = claim('w2', now=later)
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (job.pk, 2))
+
+        # El worker original ya no es dueño del trabajo y no lo toca
+        run_job(claimed, 'w1')
+        self.assertTrue(Job.objects.filter(pk=job.pk, locked_by='w2').exists())
+        self.assertTrue(run_job(reclaimed, 'w2'))
+        self.assertFalse(Job.objects.exists())